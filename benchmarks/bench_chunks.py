@@ -0,0 +1,107 @@
+"""
+Compare read/write throughput of MetaArray HDF5 files across chunk layouts.
+
+Writes a (Time, Signal) array with several chunk layouts and reports the time to write it,
+read it back whole, read single columns, and read short windows along the Time axis.
+
+    python benchmarks/bench_chunks.py --samples 2000000 --channels 16 --compression gzip
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import h5py
+import numpy as np
+
+from MetaArray import MetaArray, axis
+
+
+def legacyChunks(shape):
+    # chunk shape chosen by writeHDF5 before chunkBytes/access were added
+    return (min(100000, shape[0]), 1)
+
+
+def makeArray(samples, channels):
+    t = np.arange(samples) * 1e-4
+    data = np.cumsum(np.random.normal(size=(samples, channels)), axis=0).astype(np.float32)
+    info = [
+        axis("Time", values=t, units="s"),
+        axis("Signal", cols=[("ch%d" % i, "V") for i in range(channels)]),
+    ]
+    return MetaArray(data, info=info)
+
+
+def timeit(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench(ma, fileName, writeOpts, repeat, windowLen):
+    nbytes = ma.asarray().nbytes
+    results = {}
+    results["write"] = nbytes / timeit(lambda: ma.write(fileName, **writeOpts), repeat)
+    results["size"] = os.stat(fileName).st_size / nbytes
+    results["read all"] = nbytes / timeit(lambda: MetaArray(file=fileName, readAllData=True), repeat)
+
+    lazy = MetaArray(file=fileName, readAllData=False)
+    nCols = min(4, ma.shape[1])
+    colBytes = nbytes // ma.shape[1] * nCols
+
+    def readColumns():
+        for i in range(nCols):
+            lazy[:, i]
+
+    results["read column"] = colBytes / timeit(readColumns, repeat)
+
+    starts = np.random.randint(0, ma.shape[0] - windowLen, size=20)
+    winBytes = 20 * windowLen * ma.shape[1] * ma.dtype.itemsize
+
+    def readWindows():
+        for s in starts:
+            lazy[s : s + windowLen]
+
+    results["read window"] = winBytes / timeit(readWindows, repeat)
+    lazy._openFile.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--samples", type=int, default=1000000)
+    parser.add_argument("--channels", type=int, default=16)
+    parser.add_argument("--compression", default=None)
+    parser.add_argument("--window", type=int, default=1000, help="window length (samples) for windowed reads")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ma = makeArray(args.samples, args.channels)
+    layouts = [("legacy", {"chunks": legacyChunks(ma.shape)})]
+    for kb in (64, 256, 1024):
+        for access in ("column", "window"):
+            layouts.append((f"{access} {kb}k", {"access": access, "chunkBytes": kb * 1024}))
+
+    print(f"array {ma.shape} {ma.dtype} ({ma.asarray().nbytes / 1e6:.1f} MB), compression={args.compression}")
+    cols = ["write", "read all", "read column", "read window"]
+    print(f"{'layout':<14}{'chunks':>16}" + "".join(f"{c + ' MB/s':>18}" for c in cols) + f"{'size':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        fileName = os.path.join(tmp, "bench.ma")
+        for name, opts in layouts:
+            opts["compression"] = args.compression
+            res = bench(ma, fileName, opts, args.repeat, args.window)
+            with h5py.File(fileName, "r") as f:
+                chunks = f["data"].chunks
+            print(
+                f"{name:<14}{str(chunks):>16}"
+                + "".join(f"{res[c] / 1e6:>18.1f}" for c in cols)
+                + f"{res['size']:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measure how gzip-compressed MetaArray HDF5 writes and reads scale with the number of worker threads.
+
+    python benchmarks/bench_parallel.py --samples 4000000 --channels 16 --level 4
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from MetaArray import MetaArray, axis
+
+
+def makeArray(samples, channels):
+    data = np.cumsum(np.random.normal(size=(samples, channels)), axis=0).astype(np.float32)
+    info = [
+        axis("Time", values=np.arange(samples) * 1e-4, units="s"),
+        axis("Signal", cols=[("ch%d" % i, "V") for i in range(channels)]),
+    ]
+    return MetaArray(data, info=info)
+
+
+def timeit(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--samples", type=int, default=2000000)
+    parser.add_argument("--channels", type=int, default=16)
+    parser.add_argument("--level", type=int, default=4, help="gzip compression level")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    MetaArray.defaultCompression = ("gzip", args.level)
+    ma = makeArray(args.samples, args.channels)
+    nbytes = ma.asarray().nbytes
+    cpus = os.cpu_count() or 1
+    workerCounts = [1] + [n for n in (2, 4, 8, 16, 32) if n <= cpus]
+
+    print(f"array {ma.shape} {ma.dtype} ({nbytes / 1e6:.1f} MB), gzip level {args.level}, {cpus} cpus")
+    print(f"{'workers':>8}{'write MB/s':>14}{'speedup':>10}{'read MB/s':>14}{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        fileName = os.path.join(tmp, "bench.ma")
+        baseWrite = baseRead = None
+        for n in workerCounts:
+            # workers=1 uses HDF5's own (serial) gzip filter
+            opts = {"workers": n} if n > 1 else {}
+            tw = timeit(lambda: ma.write(fileName, **opts), args.repeat)
+            tr = timeit(lambda: MetaArray(file=fileName, readAllData=True, **opts), args.repeat)
+            baseWrite = baseWrite or tw
+            baseRead = baseRead or tr
+            write = f"{nbytes / tw / 1e6:>14.1f}{baseWrite / tw:>10.2f}"
+            read = f"{nbytes / tr / 1e6:>14.1f}{baseRead / tr:>10.2f}"
+            print(f"{n:>8}{write}{read}")
+
+
+if __name__ == "__main__":
+    main()
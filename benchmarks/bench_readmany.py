@@ -0,0 +1,80 @@
+"""
+Compare reading many MetaArray HDF5 files serially, from threads, and with MetaArray.readMany().
+
+    python benchmarks/bench_readmany.py --files 32 --samples 500000 --channels 8 --compression gzip
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from MetaArray import MetaArray, axis
+from MetaArray.readpool import ReaderPool
+
+
+def makeArray(samples, channels):
+    data = np.cumsum(np.random.normal(size=(samples, channels)), axis=0).astype(np.float32)
+    info = [
+        axis("Time", values=np.arange(samples) * 1e-4, units="s"),
+        axis("Signal", cols=[("ch%d" % i, "V") for i in range(channels)]),
+    ]
+    return MetaArray(data, info=info)
+
+
+def timeit(fn, repeat):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--files", type=int, default=16)
+    parser.add_argument("--samples", type=int, default=500000)
+    parser.add_argument("--channels", type=int, default=8)
+    parser.add_argument("--compression", default="gzip")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ma = makeArray(args.samples, args.channels)
+    nbytes = ma.asarray().nbytes * args.files
+    print(
+        f"{args.files} files of {ma.shape} {ma.dtype} ({nbytes / 1e6:.1f} MB total), "
+        f"compression={args.compression}, {args.workers} workers"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [os.path.join(tmp, f"bench{i}.ma") for i in range(args.files)]
+        for fn in files:
+            ma.write(fn, compression=args.compression)
+
+        def serial():
+            return [MetaArray(file=fn, readAllData=True) for fn in files]
+
+        def threaded():
+            with ThreadPoolExecutor(args.workers) as pool:
+                return list(pool.map(lambda fn: MetaArray(file=fn, readAllData=True), files))
+
+        with ReaderPool(workers=args.workers) as pool:
+            pool.readMany(files[:1])  # start the worker processes before timing
+
+            results = {
+                "serial": timeit(serial, args.repeat),
+                "threads": timeit(threaded, args.repeat),
+                "readMany": timeit(lambda: pool.readMany(files), args.repeat),
+            }
+
+    print(f"{'method':<10}{'MB/s':>10}{'speedup':>10}")
+    for name, t in results.items():
+        print(f"{name:<10}{nbytes / t / 1e6:>10.1f}{results['serial'] / t:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Measure the throughput of slicing one lazily opened MetaArray from several threads at once.
+
+Compares a lazily read chunked file sharing one handle (readAllData=False), the same file
+with per-thread handles (threadSafe=True), and a contiguous file, which threadSafe=True
+memory-maps.
+
+    python benchmarks/bench_threads.py --samples 2000000 --channels 16 --window 10000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from MetaArray import MetaArray, axis
+
+
+def makeArray(samples, channels):
+    data = np.cumsum(np.random.normal(size=(samples, channels)), axis=0).astype(np.float32)
+    info = [
+        axis("Time", values=np.arange(samples) * 1e-4, units="s"),
+        axis("Signal", cols=[("ch%d" % i, "V") for i in range(channels)]),
+    ]
+    return MetaArray(data, info=info)
+
+
+def readWindows(ma, starts, window):
+    for s in starts:
+        ma[s : s + window].asarray().sum()
+
+
+def bench(ma, threads, reads, window):
+    # each thread reads its own set of random windows
+    starts = np.random.randint(0, ma.shape[0] - window, size=(threads, reads // threads))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(readWindows, [ma] * threads, starts, [window] * threads))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--samples", type=int, default=2000000)
+    parser.add_argument("--channels", type=int, default=16)
+    parser.add_argument("--window", type=int, default=10000, help="samples per slice")
+    parser.add_argument("--reads", type=int, default=256, help="total number of slices read")
+    parser.add_argument("--compression", default="gzip")
+    args = parser.parse_args()
+
+    ma = makeArray(args.samples, args.channels)
+    sliceBytes = args.window * args.channels * ma.dtype.itemsize
+    cpus = os.cpu_count() or 1
+    threadCounts = [1] + [n for n in (2, 4, 8, 16, 32) if n <= max(cpus, 4)]
+
+    print(f"array {ma.shape} {ma.dtype}, {args.reads} slices of {sliceBytes / 1e6:.2f} MB, {cpus} cpus")
+    with tempfile.TemporaryDirectory() as tmp:
+        chunked = os.path.join(tmp, "chunked.ma")
+        contiguous = os.path.join(tmp, "contiguous.ma")
+        ma.write(chunked, compression=args.compression)
+        ma.write(contiguous, mappable=True)
+        modes = [
+            ("shared handle", chunked, {"readAllData": False}),
+            ("threadSafe", chunked, {"threadSafe": True}),
+            ("threadSafe mmap", contiguous, {"threadSafe": True}),
+        ]
+        print(f"{'threads':>8}" + "".join(f"{name + ' MB/s':>22}" for name, _, _ in modes))
+        for n in threadCounts:
+            row = f"{n:>8}"
+            for name, fileName, opts in modes:
+                with MetaArray(file=fileName, **opts) as lazy:
+                    t = bench(lazy, n, args.reads, args.window)
+                row += f"{args.reads * sliceBytes / t / 1e6:>22.1f}"
+            print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,9 @@ new methods for slicing and indexing the array based on this meta data.
 Based on https://scipy-cookbook.readthedocs.io/items/MetaArray.html
 """
 
+import io
+import itertools
+import mmap
 import os
 import pickle
 from copy import deepcopy
@@ -90,6 +93,13 @@ class MetaArray(object):
     # May also be a tuple (filter, opts), such as ('gzip', 3)
     defaultCompression = None
 
+    # Approximate size (bytes) of the HDF5 chunks chosen when writing, unless a chunk shape is given.
+    # Chunks of 256 kB - 1 MB compress well and keep the cost of reading a partial chunk low.
+    defaultChunkBytes = 512 * 1024
+
+    # Approximate size (bytes) of the blocks used by writeMa to write non-contiguous or lazily read data
+    writeBlockSize = 16 * 1024**2
+
     # Types allowed as axis or column names
     nameTypes = [str, tuple]
 
@@ -100,9 +110,21 @@ class MetaArray(object):
     # methods to wrap from embedded ndarray / HDF5
     wrapMethods = {"__eq__", "__ne__", "__le__", "__lt__", "__ge__", "__gt__"}
 
+    # Defaults for instance attributes added since the first release, so that MetaArrays
+    # unpickled from an older pickle (which restores only the instance __dict__) still work.
+    _isHDF = False
+    _readWorkers = None
+    _chunkCacheKey = None
+    _handles = None
+    _scaling = None
+
     def __init__(self, data=None, info=None, dtype=None, file=None, copy=False, **kwargs):
         object.__init__(self)
         self._isHDF = False
+        self._readWorkers = None
+        self._chunkCacheKey = None
+        self._handles = None
+        self._scaling = None
 
         if file is not None:
             self._data = None
@@ -148,7 +170,7 @@ class MetaArray(object):
                 if i < self.ndim and "values" in info[i]:
                     if type(info[i]["values"]) is list:
                         info[i]["values"] = np.array(info[i]["values"])
-                    elif type(info[i]["values"]) is not np.ndarray:
+                    elif not isinstance(info[i]["values"], np.ndarray):
                         raise ValueError("Axis values must be specified as list or ndarray")
                     if info[i]["values"].ndim != 1 or info[i]["values"].shape[0] != self.shape[i]:
                         raise ValueError(
@@ -172,10 +194,37 @@ class MetaArray(object):
         else:
             return name == "MetaArray"
 
+    def _read(self, nInd):
+        # Return data[nInd], reading through the per-thread handles, chunk cache or parallel
+        # chunk reader if this array was opened with them
+        if self._handles is None:
+            out = self._readFrom(self._data, nInd)
+        else:
+            with self._handles.dataset() as data:
+                out = self._readFrom(data, nInd)
+        if self._scaling is not None:
+            # scaled integers are decoded one block at a time (see MetaArray.scaled)
+            from . import scaled
+
+            shape = self._data.shape
+            out = scaled.decodeData(out, *[np.broadcast_to(x, shape)[nInd] for x in self._scaling])
+        return out
+
+    def _readFrom(self, data, nInd):
+        if self._chunkCacheKey is not None:
+            from . import chunkcache
+
+            return chunkcache.readCached(data, nInd, self._chunkCacheKey)
+        if self._readWorkers is not None:
+            from . import parallel
+
+            return parallel.readChunks(data, nInd, workers=self._readWorkers)
+        return data[nInd]
+
     def __getitem__(self, ind):
         nInd = self._interpretIndexes(ind)
 
-        a = self._data[nInd]
+        a = self._read(nInd)
         if len(nInd) == self.ndim:
             if np.all(
                     [not isinstance(ind, (slice, np.ndarray)) for ind in nInd]
@@ -233,6 +282,8 @@ class MetaArray(object):
 
     @property
     def dtype(self):
+        if self._scaling is not None:
+            return np.dtype(np.float64)
         return self._data.dtype
 
     def __len__(self):
@@ -251,10 +302,95 @@ class MetaArray(object):
 
     def __getattr__(self, attr):
         if attr in self.wrapMethods:
-            return getattr(self._data, attr)
+            return getattr(self._decoded(), attr)
         else:
             raise AttributeError(attr)
 
+    def __copy__(self):
+        # a new MetaArray sharing the data and info, as for any object without __reduce_ex__
+        cp = self.__class__.__new__(self.__class__)
+        cp.__dict__.update(self.__dict__)
+        return cp
+
+    def __deepcopy__(self, memo):
+        # copy the values into memory; file-backed data is never copied as a second reference to the file
+        return MetaArray(np.array(self.asarray(), copy=True), info=deepcopy(self._info, memo))
+
+    def __reduce_ex__(self, protocol):
+        # Arrays backed by a file are pickled as a reference to the file, which is reopened on unpickling.
+        # Scaled integers are only referenced in the form the file is reopened in: memory maps as
+        # raw integers, HDF5 data sets decoded (see MetaArray.scaled).
+        ref = self._memmapReference() if self._scaling is None else None
+        if ref is not None:
+            return (MetaArray._unpickleMemmap, ref + (self._info,))
+        if HAVE_HDF5 and isinstance(self._data, h5py.Dataset) and not self._isRawScaled():
+            if self._data.name == "/data":
+                return (MetaArray._unpickleHDF5, (self._data.file.filename, self._readWorkers))
+            # data sets elsewhere in a file (eg. in a MetaArrayStore) carry their info with them
+            return (MetaArray._unpickleHDF5, (self._data.file.filename, self._readWorkers, self._data.name, self._info))
+
+        # Otherwise pickle the data and info directly. With protocol 5, numpy passes contiguous
+        # arrays (the data and any axis values) as out-of-band PickleBuffers, so they are not copied.
+        data = self._decoded()
+        if protocol >= 5 and not (data.flags.c_contiguous or data.flags.f_contiguous):
+            data = np.ascontiguousarray(data)
+        return (MetaArray, (np.asarray(data), self._info))
+
+    def _decoded(self):
+        # The data, or the decoded values of scaled integers that are decoded on read
+        if self.__dict__.get("_scaling") is None:
+            return self._data
+        return self.asarray()
+
+    def _isRawScaled(self):
+        # True for scaled integers that are not decoded on read (opened with raw=True)
+        if self._scaling is not None:
+            return False
+        from . import scaled
+
+        return scaled.scaling(self._info, self.shape, self.dtype) is not None
+
+    def _memmapReference(self):
+        # Return (fileName, dtype, shape, offset, mode) locating a contiguous memory-mapped array
+        # in its file, or None if the data is not memory-mapped in a way that can be reopened.
+        data = self._data
+        if not isinstance(data, np.ndarray) or not data.flags.c_contiguous:
+            return None
+        # slices of a memory-mapped MetaArray are views whose base is the original memmap
+        mapped = data
+        while mapped is not None and not isinstance(mapped, np.memmap):
+            mapped = getattr(mapped, "base", None)
+        if mapped is None or mapped.mode not in ("r", "r+"):
+            return None
+        mm = getattr(mapped, "_mmap", None)
+        if mm is None or mapped.filename is None:
+            return None
+        try:
+            base = np.frombuffer(mm, dtype=np.uint8).ctypes.data
+        except (ValueError, TypeError):
+            return None  # mapping was closed
+        # the mapping begins at the last allocation boundary before mapped.offset
+        start = mapped.offset - mapped.offset % mmap.ALLOCATIONGRANULARITY
+        offset = start + (data.ctypes.data - base)
+        return (mapped.filename, data.dtype.str, data.shape, offset, mapped.mode)
+
+    @staticmethod
+    def _unpickleMemmap(fileName, dtype, shape, offset, mode, info):
+        data = np.memmap(fileName, dtype=np.dtype(dtype), mode=mode, offset=offset, shape=shape)
+        return MetaArray(data, info=info)
+
+    @staticmethod
+    def _unpickleHDF5(fileName, workers, path="/data", info=None):
+        if path == "/data":
+            return MetaArray(file=fileName, readAllData=False, workers=workers)
+        f = h5py.File(fileName, "r")
+        dataset = f[path]
+        ma = MetaArray(np.broadcast_to(np.zeros((), dtype=dataset.dtype), dataset.shape), info=info)
+        ma._data = dataset
+        ma._isHDF = True
+        ma._openFile = f
+        return ma
+
     def __eq__(self, b):
         return self._binop("__eq__", b)
 
@@ -296,11 +432,73 @@ class MetaArray(object):
         c = getattr(a, op)()
         return MetaArray(c, info=self.infoCopy())
 
+    def refresh(self):
+        """Pick up frames appended to a file opened with swmr=True since it was opened or last refreshed.
+
+        The data set and the appended axis info (values and appendKeys) are refreshed in place;
+        only the new entries of the axis info are read. Returns the number of new frames.
+        """
+        f = self.__dict__.get("_openFile")
+        if f is None or not f.swmr_mode:
+            raise Exception("refresh() is only available for arrays opened with swmr=True")
+        oldShape = self._data.shape
+        self._data.refresh()
+        newShape = self._data.shape
+        if self._chunkCacheKey is not None and newShape != oldShape:
+            # the last chunks along the appended axis may have changed; don't reuse their cached copies
+            from . import chunkcache
+
+            self._chunkCacheKey = chunkcache.fileKey(f.filename) + (newShape,)
+        added = 0
+        for i, (n0, n1) in enumerate(zip(oldShape, newShape)):
+            if n1 == n0:
+                continue
+            added += n1 - n0
+            group = f["info"].get(str(i))
+            if not isinstance(group, h5py.Group):
+                continue
+            for key in group:
+                ds = group[key]
+                if not isinstance(ds, h5py.Dataset) or key not in self._info[i]:
+                    continue
+                ds.refresh()
+                n = len(self._info[i][key])
+                if ds.shape[0] > n:
+                    # never read past the data, which the writer extends last
+                    new = ds[n : min(ds.shape[0], n1)]
+                    self._info[i][key] = np.concatenate([np.asarray(self._info[i][key]), new])
+        return added
+
+    def close(self):
+        """Close the file held open by a lazily read (readAllData=False) or writable HDF5 array.
+
+        Reading from this array afterward raises an exception; arrays already sliced from it hold
+        their own data and are unaffected. Arrays read into memory or memory-mapped need no
+        closing, and close() does nothing for them. MetaArrays may also be used as context managers
+        that close the file on exit.
+        """
+        if self._handles is not None:
+            self._handles.close()
+        openFile = self.__dict__.get("_openFile")
+        if openFile is not None:
+            openFile.close()
+            self._openFile = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
     def asarray(self):
+        if self._scaling is not None:
+            return self._read(())
         if isinstance(self._data, np.ndarray):
             return self._data
         elif isinstance(self._data, h5py.Dataset):
-            return self._data[:]
+            if self._handles is None and self._chunkCacheKey is None and self._readWorkers is None:
+                return self._data[:]
+            return self._read(())
         else:
             return np.array(self._data)
 
@@ -317,6 +515,20 @@ class MetaArray(object):
         else:
             raise TypeError(f"invalid view type: {typ}")
 
+    def summaryStats(self):
+        """Return the statistics stored when the file was written with stats=True, without reading
+        any data: {column name: stats dict} for arrays with columns, otherwise one stats dict
+        for the whole array. Returns None if no statistics are stored. (see MetaArray.stats)"""
+        from . import stats
+
+        ax = stats.statsAxis(self._info, self.ndim)
+        if ax is None:
+            return self._info[-1].get("stats")
+        cols = self._info[ax]["cols"]
+        if len(cols) == 0 or not all("stats" in c for c in cols):
+            return None
+        return {c.get("name", j): c["stats"] for j, c in enumerate(cols)}
+
     def axisValues(self, axis):
         """Return the list of values for an axis"""
         ax = self._interpretAxis(axis)
@@ -429,7 +641,7 @@ class MetaArray(object):
             return deepcopy(self._info[self._interpretAxis(axis)])
 
     def copy(self):
-        return MetaArray(self._data.copy(), info=self.infoCopy())
+        return MetaArray(self._decoded().copy(), info=self.infoCopy())
 
     def _interpretIndexes(self, ind):
         if not isinstance(ind, tuple):
@@ -606,7 +818,7 @@ class MetaArray(object):
         return self.__repr__()
 
     def axisCollapsingFn(self, fn, axis=None, *args, **kargs):
-        fn = getattr(self._data, fn)
+        fn = getattr(self._decoded(), fn)
         if axis is None:
             return fn(axis, *args, **kargs)
         else:
@@ -637,33 +849,78 @@ class MetaArray(object):
 
         try:
             if self._isHDF:
-                return MetaArray(np.array(self._data).transpose(order), info=info)
+                return MetaArray(self.asarray().transpose(order), info=info)
             else:
-                return MetaArray(self._data.transpose(order), info=info)
+                return MetaArray(self._decoded().transpose(order), info=info)
         except:
             print(order)
             raise
 
     ### File I/O Routines
-    def readFile(self, filename, **kwargs):
+    def readFile(self, filename, select=None, **kwargs):
         """Load the data and meta info stored in *filename*
+
+        *select* may be a dict {axis: selection} (axes given by name or index) to read only part
+        of the array. The names and axis values stored in the file are used to find the region
+        to read, and only that region is read from disk. Each selection may be:
+
+            * a column name or int (the axis is removed, as with ma[..., 'Vm'])
+            * a list of column names and/or ints
+            * a slice of indexes
+            * a tuple (start, stop) of axis values; selects values >= start and < stop
+              (either may be None)
+
         Different arguments are allowed depending on the type of file.
         For HDF5 files:
         
             *writable* (bool) if True, then any modifications to data in the array will be stored to disk.
+                          Contiguous datasets (written with mappable=True) are memory-mapped read-write;
+                          chunked or compressed datasets are modified through h5py instead.
+            *workers* (int) if > 1, gzip-compressed chunks are decompressed in parallel using this many
+                          threads, both when reading all data and when slicing a lazily read array
+                          (see MetaArray.parallel). Other filters are decoded by HDF5 as usual.
+            *mmap* (bool) if True and the dataset is contiguous (written with mappable=True), the data
+                          and any axis values are memory-mapped directly from the file rather than copied
+                          into memory. Chunked or compressed datasets fall back to a normal read.
             *readAllData* (bool) if True, then all data in the array is immediately read from disk
                           and the file is closed (this is the default for files < 500MB). Otherwise, the file will
                           be left open and data will be read only as requested (this is 
                           the default for files >= 500MB).
-        
-        
+            *chunkCache* (bool) if True and readAllData is False, decoded chunks are kept in a
+                          process-wide LRU cache shared by all open arrays, so that slicing the same
+                          region again does not re-read and decompress it (see MetaArray.chunkcache).
+            *threadSafe* (bool) if True, the array is read lazily and may be sliced from many threads at
+                          once. Contiguous datasets are memory-mapped; otherwise each thread reads
+                          through its own file handle (see MetaArray.handles). close() closes all
+                          handles once reads in progress have finished.
+            *swmr* (bool) if True, open a file that is being appended to by a MetaArrayWriter with
+                          swmr=True (HDF5 single-writer / multiple-reader mode). The array is read
+                          lazily; call refresh() to see frames appended since it was opened. With
+                          *select*, the selection is read once and can not be refreshed.
+            *rdcc_nbytes*, *rdcc_nslots*, *rdcc_w0* set the size, number of hash slots and eviction
+                          policy of HDF5's own raw chunk cache for this file (passed to h5py.File).
+            *raw* (bool) for files written with quantize=..., return the stored integers instead of
+                          decoding them to float64 (see MetaArray.scaled). Decoding otherwise happens
+                          on read; lazily read arrays decode each block as it is read.
+
+        For .ma files:
+
+            *mmap* (bool) if True, the data is memory-mapped rather than read into memory.
+            *writable* (bool) if True, the data is memory-mapped read-write so that modifications are
+                          stored to disk (not available for files with a dynamic axis).
+            *subset* (tuple of slices) for files with a dynamic (appendable) axis, read only this
+                          region of the array. Only the blocks of frames that overlap the subset
+                          are read from disk.
+            *cacheIndex* (bool) for files with a dynamic axis, store the table of frame offsets
+                          in a sidecar file (fileName + '.idx.npz') so that later reads do not
+                          need to scan the file. The sidecar is rebuilt when the file changes.
         """
         # decide which read function to use
         with open(filename, "rb") as fd:
             magic = fd.read(8)
             if magic == b"\x89HDF\r\n\x1a\n":
                 fd.close()
-                self._readHDF5(filename, **kwargs)
+                self._readHDF5(filename, select=select, **kwargs)
                 self._isHDF = True
             else:
                 fd.seek(0)
@@ -678,9 +935,102 @@ class MetaArray(object):
                 if not hasattr(MetaArray, rFuncName):
                     raise Exception("This MetaArray library does not support array version '%s'" % ver)
                 rFunc = getattr(self, rFuncName)
-                rFunc(fd, meta, **kwargs)
+                rFunc(fd, meta, select=select, **kwargs)
                 self._isHDF = False
 
+    @staticmethod
+    def _resolveSelect(info, shape, select):
+        # Convert a select dict {axis: selection} (see readFile) into a tuple holding an int, slice
+        # or list of indexes for each axis
+        template = MetaArray(np.broadcast_to(np.zeros((), dtype=np.uint8), shape), info=info)
+        index = [slice(None)] * len(shape)
+        for axis, sel in select.items():
+            i = template._interpretAxis(axis)
+            n = shape[i]
+            isRange = (
+                isinstance(sel, tuple)
+                and len(sel) == 2
+                and all(v is None or isinstance(v, (int, float, np.number)) for v in sel)
+            )
+            if isRange:
+                if "values" not in template._info[i]:
+                    raise Exception(f"Axis {axis!r} has no values to select a range from")
+                start, stop = sel
+                values = np.asarray(template._info[i]["values"])
+                if values.ndim == 1 and np.all(values[1:] >= values[:-1]):
+                    a = 0 if start is None else int(np.searchsorted(values, start, side="left"))
+                    b = n if stop is None else int(np.searchsorted(values, stop, side="left"))
+                    index[i] = slice(a, max(a, b))
+                else:
+                    mask = np.ones(len(values), dtype=bool)
+                    if start is not None:
+                        mask &= values >= start
+                    if stop is not None:
+                        mask &= values < stop
+                    index[i] = np.nonzero(mask)[0].tolist()
+            elif MetaArray.isNameType(sel):
+                index[i] = template._getIndex(i, sel)
+            elif isinstance(sel, (int, np.integer)):
+                index[i] = int(sel)
+            elif isinstance(sel, slice):
+                index[i] = sel
+            elif isinstance(sel, (list, np.ndarray)):
+                index[i] = [template._getIndex(i, c) if MetaArray.isNameType(c) else int(c) % n for c in sel]
+            else:
+                raise TypeError(f"Unsupported selection for axis {axis!r}: {sel!r}")
+        return tuple(index)
+
+    @staticmethod
+    def _readSelection(data, index, workers=None):
+        # Return data[index] for an index from _resolveSelect, where lists on several axes select
+        # their outer product. For an h5py dataset, one read is made covering the selection (the
+        # bounding range of all lists but the first, which h5py can read directly).
+        first = []
+        post = []  # reordering applied to each remaining axis after the read
+        listUsed = False
+        for ind in index:
+            if isinstance(ind, list):
+                arr = np.asarray(ind, dtype=np.intp)
+                if len(arr) == 0:
+                    first.append(slice(0, 0))
+                    post.append(None)
+                    continue
+                uniq, inverse = np.unique(arr, return_inverse=True)
+                if not listUsed and len(uniq) > 1:
+                    listUsed = True
+                    first.append(uniq.tolist())  # h5py requires increasing indexes
+                    post.append(inverse)
+                else:
+                    first.append(slice(int(uniq[0]), int(uniq[-1]) + 1))
+                    post.append(arr - uniq[0])
+            elif isinstance(ind, slice):
+                first.append(ind)
+                post.append(None)
+            else:
+                first.append(ind)  # int; the axis is removed
+        if workers is not None:
+            from . import parallel
+
+            out = parallel.readChunks(data, tuple(first), workers=workers)
+        else:
+            out = data[tuple(first)]
+        for axis, p in enumerate(post):
+            if p is not None and not np.array_equal(p, np.arange(out.shape[axis])):
+                out = np.take(out, p, axis=axis)
+        return out
+
+    def _setSelection(self, data, info, index, workers=None):
+        # Set this array to data[index] with axis info sliced to match
+        template = MetaArray(np.broadcast_to(np.zeros((), dtype=np.uint8), data.shape), info=info)
+        if all(not isinstance(ind, (slice, list)) for ind in index):
+            raise Exception("select must leave at least one axis")
+        # one axis at a time (last first, so that removing an axis does not renumber the rest)
+        for axis in reversed(range(len(index))):
+            if index[axis] != slice(None):
+                template = template[(slice(None),) * axis + (index[axis],)]
+        self._info = template._info
+        self._data = MetaArray._readSelection(data, index, workers)
+
     @staticmethod
     def _readMeta(fd):
         """Read meta array from the top of a file. Read lines until a blank line is reached.
@@ -696,7 +1046,7 @@ class MetaArray(object):
         ret = eval(meta)
         return ret
 
-    def _readData1(self, fd, meta, mmap=False, **kwds):
+    def _readData1(self, fd, meta, mmap=False, select=None, **kwds):
         # Read array data from the file descriptor for MetaArray v1 files
         # read in axis values for any axis that specifies a length
         frameSize = 1
@@ -710,18 +1060,24 @@ class MetaArray(object):
         if not kwds.get("readAllData", True):
             return
         # the remaining data is the actual array
+        if select is not None:
+            # map the file so that only the pages holding the selection are read
+            subarr = np.memmap(fd, dtype=meta["type"], mode="r", offset=fd.tell(), shape=meta["shape"])
+            self._setSelection(subarr, meta["info"], MetaArray._resolveSelect(meta["info"], meta["shape"], select))
+            if not mmap:
+                self._data = np.array(self._data)
+            return
         if mmap:
-            subarr = np.memmap(fd, dtype=meta["type"], mode="r", shape=meta["shape"])
+            subarr = np.memmap(fd, dtype=meta["type"], mode="r", offset=fd.tell(), shape=meta["shape"])
         else:
             subarr = np.frombuffer(fd.read(), dtype=meta["type"])
             subarr.shape = meta["shape"]
         self._data = subarr
 
-    def _readData2(self, fd, meta, mmap=False, subset=None, **kwds):
-        # read in axis values
+    @staticmethod
+    def _readAxisValues2(fd, meta):
+        # read in axis values for any axis that specifies a length; return the index of the dynamic axis (or None)
         dynAxis = None
-        frameSize = 1
-        # read in axis values for any axis that specifies a length
         for i in range(len(meta["info"])):
             ax = meta["info"][i]
             if "values_len" in ax:
@@ -731,99 +1087,287 @@ class MetaArray(object):
                     dynAxis = i
                 else:
                     ax["values"] = np.frombuffer(fd.read(ax["values_len"]), dtype=ax["values_type"])
-                    frameSize *= ax["values_len"]
                     del ax["values_len"]
                     del ax["values_type"]
+        return dynAxis
+
+    def _readData2(self, fd, meta, mmap=False, subset=None, cacheIndex=False, writable=False, select=None, **kwds):
+        dynAxis = MetaArray._readAxisValues2(fd, meta)
         self._info = meta["info"]
-        if not kwds.get("readAllData", True):
-            return
+        if select is not None and (writable or subset is not None):
+            raise ValueError("select can not be combined with writable or subset")
 
         # No axes are dynamic, just read the entire array in at once
         if dynAxis is None:
+            if not kwds.get("readAllData", True):
+                return
             if meta["type"] == "object":
-                if mmap:
+                if mmap or writable:
                     raise Exception("memmap not supported for arrays with dtype=object")
                 subarr = pickle.loads(fd.read())
+            elif select is not None:
+                # map the file so that only the pages holding the selection are read
+                subarr = np.memmap(fd, dtype=meta["type"], mode="r", offset=fd.tell(), shape=meta["shape"])
+                self._setSelection(subarr, meta["info"], MetaArray._resolveSelect(meta["info"], meta["shape"], select))
+                if not mmap:
+                    self._data = np.array(self._data)
+                return
             else:
-                if mmap:
-                    subarr = np.memmap(fd, dtype=meta["type"], mode="r", shape=meta["shape"])
+                if writable:
+                    # fd is read-only; map the file by name instead
+                    subarr = np.memmap(fd.name, dtype=meta["type"], mode="r+", offset=fd.tell(), shape=meta["shape"])
+                elif mmap:
+                    subarr = np.memmap(fd, dtype=meta["type"], mode="r", offset=fd.tell(), shape=meta["shape"])
                 else:
                     subarr = np.frombuffer(fd.read(), dtype=meta["type"])
             subarr.shape = meta["shape"]
-        # One axis is dynamic, read in a frame at a time
+            self._data = subarr
+            return
+
+        # One axis is dynamic; locate all frames, then read only those that are needed
+        if writable:
+            raise Exception("writable=True is not supported for arrays with a dynamic axis.")
+        ax = meta["info"][dynAxis]
+        index = MetaArray._readFrameIndex(fd, cacheIndex)
+        nFrames = int(index["numFrames"].sum())
+        shape = list(meta["shape"])
+        shape[dynAxis] = nFrames
+        xVals = index["xVals"]
+        if xVals is not None:
+            xVals = xVals.astype(ax["values_type"])
+
+        sel = None
+        if select is not None:
+            subset, sel = MetaArray._selectToSubset(meta["info"], shape, dynAxis, xVals, select)
+        if subset is None:
+            subset = (slice(None),) * len(shape)
         else:
-            if mmap:
-                raise Exception("memmap not supported for non-contiguous arrays. Use rewriteContiguous() to convert.")
-            ax = meta["info"][dynAxis]
-            xVals = []
-            frames = []
-            frameShape = list(meta["shape"])
-            frameShape[dynAxis] = 1
-            frameSize = np.prod(frameShape)
-            n = 0
+            subset = tuple(subset) + (slice(None),) * (len(shape) - len(subset))
+        dStart, dStop, dStep = subset[dynAxis].indices(nFrames)
+        if dStep != 1:
+            raise ValueError("subset slices along the dynamic axis may not have a step")
+        dStop = max(dStart, dStop)
+
+        # slice axis info to match the subset
+        for i, sl in enumerate(subset):
+            if i == dynAxis:
+                if xVals is not None:
+                    ax["values"] = xVals[dStart:dStop]
+                continue
+            axInfo = meta["info"][i]
+            if "values" in axInfo:
+                axInfo["values"] = axInfo["values"][sl]
+            if "cols" in axInfo:
+                axInfo["cols"] = axInfo["cols"][sl]
+        del ax["values_len"]
+        ax.pop("values_type", None)
+
+        if not kwds.get("readAllData", True):
+            shape = [len(range(*sl.indices(n))) for sl, n in zip(subset, shape)]
+            shape[dynAxis] = dStop - dStart
+            self._data = np.empty(shape, dtype=meta["type"])
+            return
+
+        frames = []
+        starts = index["starts"]
+        for i in range(len(starts)):
+            n0 = int(starts[i])
+            n1 = n0 + int(index["numFrames"][i])
+            if n1 <= dStart or n0 >= dStop:
+                continue
+            data = MetaArray._readFrameBlock(fd, meta, dynAxis, index, i, mmap)
+            frameSubset = list(subset)
+            frameSubset[dynAxis] = slice(max(0, dStart - n0), min(n1, dStop) - n0)
+            frames.append(data[tuple(frameSubset)])
+
+        if len(frames) == 1:
+            # a single block needs no copy (this keeps memory-mapped reads zero-copy)
+            subarr = frames[0]
+        elif len(frames) == 0:
+            subarr = np.empty(
+                [0 if i == dynAxis else len(range(*sl.indices(n))) for i, (sl, n) in enumerate(zip(subset, shape))],
+                dtype=meta["type"],
+            )
+        else:
+            subarr = np.concatenate(frames, axis=dynAxis)
+        self._data = subarr
+        if sel is not None:
+            self._setSelection(subarr, self._info, sel)
+
+    @staticmethod
+    def _selectToSubset(info, shape, dynAxis, xVals, select):
+        # For a dynamic-axis file, split a select dict into a subset of slices (read block by block)
+        # and the remaining per-axis index to apply to the data that was read
+        info = [dict(ax) for ax in info]
+        info[dynAxis].pop("values_len", None)
+        info[dynAxis].pop("values_type", None)
+        if xVals is not None:
+            info[dynAxis]["values"] = xVals
+        index = list(MetaArray._resolveSelect(info, shape, select))
+        subset = [slice(None)] * len(shape)
+        for i, ind in enumerate(index):
+            if isinstance(ind, slice) and i != dynAxis:
+                subset[i] = ind
+                index[i] = slice(None)
+        # read the range of frames spanning the selection along the dynamic axis
+        pos = np.arange(shape[dynAxis])[index[dynAxis]]
+        if pos.size == 0:
+            subset[dynAxis] = slice(0, 0)
+            index[dynAxis] = slice(None)
+        else:
+            lo = int(pos.min())
+            hi = int(pos.max()) + 1
+            subset[dynAxis] = slice(lo, hi)
+            if pos.ndim == 0:
+                index[dynAxis] = 0
+            elif np.array_equal(pos, np.arange(lo, hi)):
+                index[dynAxis] = slice(None)
+            else:
+                index[dynAxis] = (pos - lo).tolist()
+        return tuple(subset), tuple(index)
+
+    @staticmethod
+    def _scanFrames(fd):
+        # Read frame headers from the current position to the end of the file, skipping over the frame data.
+        offsets = []
+        lengths = []
+        numFrames = []
+        xVals = []
+        while True:
+            # Extract one non-blank line
             while True:
-                # Extract one non-blank line
-                while True:
-                    line = fd.readline().decode("utf-8")
-                    if line != "\n":
-                        break
-                if line == "":
+                line = fd.readline().decode("utf-8")
+                if line != "\n":
                     break
+            if line == "":
+                break
+            inf = eval(line)
+            offsets.append(fd.tell())
+            lengths.append(inf["len"])
+            numFrames.append(inf["numFrames"])
+            if "xVals" in inf:
+                xVals.extend(inf["xVals"])
+            fd.seek(inf["len"], 1)
+        numFrames = np.array(numFrames, dtype=np.int64)
+        return {
+            "offsets": np.array(offsets, dtype=np.int64),
+            "lengths": np.array(lengths, dtype=np.int64),
+            "numFrames": numFrames,
+            "starts": np.concatenate([[0], np.cumsum(numFrames)[:-1]]).astype(np.int64),
+            "xVals": np.array(xVals) if len(xVals) > 0 else None,
+        }
 
-                # evaluate line
-                inf = eval(line)
+    @staticmethod
+    def _readFrameIndex(fd, cacheIndex=False):
+        """Return the table of frame offsets for a dynamic-axis .ma file, with *fd* positioned
+        at the first frame. If *cacheIndex* is True, the table is stored in (and reused from)
+        a sidecar file named fileName + '.idx.npz', which is rebuilt whenever the size or
+        modification time of the .ma file changes.
+        """
+        fileName = getattr(fd, "name", None)
+        if not cacheIndex or not isinstance(fileName, str):
+            return MetaArray._scanFrames(fd)
 
-                # read data block
-                if meta["type"] == "object":
-                    data = pickle.loads(fd.read(inf["len"]))
-                else:
-                    data = np.frombuffer(fd.read(inf["len"]), dtype=meta["type"])
-
-                if data.size != frameSize * inf["numFrames"]:
-                    raise Exception("Wrong frame size in MetaArray file! (frame %d)" % n)
-
-                # read in data block
-                shape = list(frameShape)
-                shape[dynAxis] = inf["numFrames"]
-                data.shape = shape
-                if subset is not None:
-                    dSlice = subset[dynAxis]
-                    if dSlice.start is None:
-                        dStart = 0
-                    else:
-                        dStart = max(0, dSlice.start - n)
-                    if dSlice.stop is None:
-                        dStop = data.shape[dynAxis]
-                    else:
-                        dStop = min(data.shape[dynAxis], dSlice.stop - n)
-                    newSubset = list(subset[:])
-                    newSubset[dynAxis] = slice(dStart, dStop)
-                    if dStop > dStart:
-                        frames.append(data[tuple(newSubset)].copy())
-                else:
-                    frames.append(data)
+        idxFile = fileName + ".idx.npz"
+        stat = os.stat(fileName)
+        if os.path.exists(idxFile):
+            try:
+                with np.load(idxFile, allow_pickle=False) as cached:
+                    if int(cached["size"]) == stat.st_size and int(cached["mtime"]) == stat.st_mtime_ns:
+                        index = {k: cached[k] for k in ("offsets", "lengths", "numFrames", "starts")}
+                        index["xVals"] = cached["xVals"] if "xVals" in cached else None
+                        return index
+            except (OSError, ValueError, KeyError):
+                pass  # unreadable index; rebuild it
+
+        index = MetaArray._scanFrames(fd)
+        arrays = {k: v for k, v in index.items() if v is not None}
+        try:
+            with open(idxFile, "wb") as fh:
+                np.savez(fh, size=stat.st_size, mtime=stat.st_mtime_ns, **arrays)
+        except OSError:
+            pass  # read-only location; the index is still usable for this read
+        return index
 
-                n += inf["numFrames"]
-                if "xVals" in inf:
-                    xVals.extend(inf["xVals"])
-            subarr = np.concatenate(frames, axis=dynAxis)
-            if len(xVals) > 0:
-                ax["values"] = np.array(xVals, dtype=ax["values_type"])
-            del ax["values_len"]
-            del ax["values_type"]
-        self._info = meta["info"]
-        self._data = subarr
+    @staticmethod
+    def _readFrameBlock(fd, meta, dynAxis, index, i, mmap=False):
+        # Read block *i* of a dynamic-axis .ma file, using the offsets in *index*
+        offset = int(index["offsets"][i])
+        length = int(index["lengths"][i])
+        shape = list(meta["shape"])
+        shape[dynAxis] = int(index["numFrames"][i])
+        if meta["type"] == "object":
+            if mmap:
+                raise Exception("memmap not supported for arrays with dtype=object")
+            fd.seek(offset)
+            data = pickle.loads(fd.read(length))
+        elif mmap:
+            dtype = np.dtype(meta["type"])
+            data = np.memmap(fd, dtype=dtype, mode="r", offset=offset, shape=(length // dtype.itemsize,))
+        else:
+            fd.seek(offset)
+            data = np.frombuffer(fd.read(length), dtype=meta["type"])
+        if data.size != np.prod(shape):
+            raise Exception("Wrong frame size in MetaArray file! (frame %d)" % i)
+        return data.reshape(shape)
 
-    def _readHDF5(self, fileName, readAllData=None, writable=False, **kargs):
+    @staticmethod
+    def iterFrames(fileName, mmap=False, cacheIndex=False):
+        """Iterate over the blocks of frames in a dynamic-axis .ma file (written with appendAxis),
+        yielding one MetaArray per block as it was appended. Only one block is read at a time.
+        """
+        with open(fileName, "rb") as fd:
+            meta = MetaArray._readMeta(fd)
+            dynAxis = MetaArray._readAxisValues2(fd, meta)
+            if dynAxis is None:
+                raise Exception(f"{fileName} does not have a dynamic (appendable) axis.")
+            ax = meta["info"][dynAxis]
+            del ax["values_len"]
+            valuesType = ax.pop("values_type", None)
+            index = MetaArray._readFrameIndex(fd, cacheIndex)
+            for i in range(len(index["offsets"])):
+                data = MetaArray._readFrameBlock(fd, meta, dynAxis, index, i, mmap)
+                info = deepcopy(meta["info"])
+                if index["xVals"] is not None:
+                    n0 = int(index["starts"][i])
+                    info[dynAxis]["values"] = index["xVals"][n0 : n0 + data.shape[dynAxis]].astype(valuesType)
+                yield MetaArray(data, info=info)
+
+    def _readHDF5(
+        self,
+        fileName,
+        readAllData=None,
+        writable=False,
+        mmap=False,
+        workers=None,
+        select=None,
+        chunkCache=False,
+        threadSafe=False,
+        swmr=False,
+        raw=False,
+        **kargs,
+    ):
         if "close" in kargs and readAllData is None:  # for backward compatibility
             readAllData = kargs["close"]
 
         if readAllData is True and writable is True:
-            raise ArgumentError("Incompatible arguments: readAllData=True and writable=True")
+            raise ValueError("Incompatible arguments: readAllData=True and writable=True")
+        if select is not None and writable:
+            raise ValueError("Incompatible arguments: select and writable=True")
+        if threadSafe:
+            if writable:
+                raise ValueError("Incompatible arguments: threadSafe=True and writable=True")
+            readAllData = False
+        if swmr:
+            if writable or threadSafe:
+                raise ValueError("swmr=True can not be combined with writable or threadSafe")
+            readAllData = False
 
         if not HAVE_HDF5:
             try:
                 assert not writable
+                assert select is None
+                assert not mmap
                 assert readAllData
                 self._readHDF5Remote(fileName)
                 return
@@ -841,7 +1385,11 @@ class MetaArray(object):
             mode = "r+"
         else:
             mode = "r"
-        f = h5py.File(fileName, mode)
+        cacheOpts = {k: kargs[k] for k in ("rdcc_nbytes", "rdcc_nslots", "rdcc_w0") if kargs.get(k) is not None}
+        if swmr:
+            f = h5py.File(fileName, "r", libver="latest", swmr=True, **cacheOpts)
+        else:
+            f = h5py.File(fileName, mode, **cacheOpts)
 
         ver = f.attrs["MetaArray"]
         try:
@@ -853,19 +1401,76 @@ class MetaArray(object):
                 f"Warning: This file was written with MetaArray version {ver}, but you are using "
                 f"version {MetaArray.version}. (Will attempt to read anyway)"
             )
-        meta = MetaArray.readHDF5Meta(f["info"])
+        meta = MetaArray.readHDF5Meta(f["info"], mmap=mmap)
         self._info = meta
 
         dataset = f["data"]
-        if writable:
-            self._data = np.memmap(f.filename, dtype=dataset.dtype, shape=dataset.shape, mode="r+")
+        if swmr:
+            # the writer extends the axis info before the data; ignore entries past the last frame
+            for axInfo, n in zip(meta, dataset.shape):
+                for key, v in axInfo.items():
+                    if isinstance(v, np.ndarray) and v.ndim > 0 and v.shape[0] > n:
+                        axInfo[key] = v[:n]
+        scaling = None
+        if not raw:
+            from . import scaled
+
+            scaling = scaled.scaling(meta, dataset.shape, dataset.dtype)
+            if scaling is not None and writable:
+                f.close()
+                raise ValueError("Scaled-integer data can only be opened writable with raw=True")
+        if select is not None:
+            # read only the hyperslab holding the selection
+            index = MetaArray._resolveSelect(meta, dataset.shape, select)
+            if mmap and MetaArray.isHDF5Mappable(dataset):
+                self._setSelection(MetaArray.mapHDF5Array(dataset), meta, index)
+            else:
+                from . import parallel
+
+                if workers is None or workers <= 1 or not parallel.canCompressChunks(dataset):
+                    workers = None
+                self._setSelection(dataset, meta, index, workers=workers)
+            if scaling is not None:
+                sc = [MetaArray._readSelection(np.broadcast_to(x, dataset.shape), index) for x in scaling]
+                self._data = scaled.decodeData(self._data, *sc)
+            f.close()
+        elif (mmap or writable or threadSafe) and MetaArray.isHDF5Mappable(dataset):
+            # np.memmap keeps its own handle on the file, so h5py is no longer needed
+            self._data = MetaArray.mapHDF5Array(dataset, writable=writable)
+            self._scaling = scaling
+            f.close()
+        elif writable:
+            # chunked / compressed data can not be mapped; modifications go through h5py
+            self._data = dataset
             self._openFile = f
         elif readAllData:
-            self._data = dataset[:]
+            if workers is not None and workers > 1:
+                from . import parallel
+
+                self._data = parallel.readChunks(dataset, workers=workers)
+            else:
+                self._data = dataset[:]
+            if scaling is not None:
+                self._data = scaled.decodeData(self._data, *scaling)
             f.close()
         else:
             self._data = dataset
-            self._openFile = f
+            self._scaling = scaling
+            if threadSafe:
+                from .handles import HandlePool
+
+                self._handles = HandlePool(fileName, mainFile=f, **cacheOpts)
+            else:
+                self._openFile = f
+            if chunkCache and dataset.chunks is not None:
+                from . import chunkcache
+
+                self._chunkCacheKey = chunkcache.fileKey(fileName)
+            if workers is not None and workers > 1:
+                from . import parallel
+
+                if parallel.canCompressChunks(dataset):
+                    self._readWorkers = workers
 
     def _readHDF5Remote(self, fileName):
         # Used to read HDF5 files via remote process.
@@ -885,6 +1490,11 @@ class MetaArray(object):
         self._data = ma.asarray()._getValue()
         self._info = ma._info._getValue()
 
+    @staticmethod
+    def isHDF5Mappable(data):
+        """Return True if the HDF5 dataset *data* is stored contiguously and can be memory-mapped."""
+        return data.id.get_offset() is not None
+
     @staticmethod
     def mapHDF5Array(data, writable=False):
         off = data.id.get_offset()
@@ -899,7 +1509,8 @@ class MetaArray(object):
         return np.memmap(filename=data.file.filename, offset=off, dtype=data.dtype, shape=data.shape, mode=mode)
 
     @staticmethod
-    def readHDF5Meta(root, mmap=False):
+    def readHDF5Meta(root, mmap=False, skip=()):
+        # *skip* names children of root that are not read
         data = {}
         numstrs = list(map(str, range(10)))
         # Pull list of values from attributes and child objects
@@ -913,11 +1524,13 @@ class MetaArray(object):
                 val = eval(val)
             data[k] = val
         for k in root:
+            if k in skip:
+                continue
             obj = root[k]
             if isinstance(obj, h5py.Group):
-                val = MetaArray.readHDF5Meta(obj)
+                val = MetaArray.readHDF5Meta(obj, mmap=mmap)
             elif isinstance(obj, h5py.Dataset):
-                if mmap:
+                if mmap and MetaArray.isHDF5Mappable(obj):
                     val = MetaArray.mapHDF5Array(obj)
                 else:
                     val = obj[:]
@@ -951,6 +1564,24 @@ class MetaArray(object):
             appendKeys: a list of keys (other than "values") for metadata to append to on the appendable axis.
             compression: None, 'gzip' (good compression), 'lzf' (fast compression), etc.
             chunks: bool or tuple specifying chunk shape
+            chunkBytes: approximate chunk size in bytes when chunks is not given (default defaultChunkBytes)
+            access: the expected access pattern, used to choose the chunk shape (see guessChunkShape):
+                'column' (read one column at a time), 'window' (read ranges along accessAxis),
+                or 'append'. By default 'append' is used when appendAxis is given, 'column'
+                when any axis has columns.
+            accessAxis: the name (or index) of the axis the access pattern refers to
+            workers: if > 1, gzip-compress chunks in parallel using this many threads (new files only;
+                see MetaArray.parallel)
+            quantize: store the data as integers of this dtype (eg. 'int16') with a scale and offset for
+                each column, kept in the column info (see MetaArray.scaled). Blocks appended to such a
+                file are encoded with the same scales and offsets.
+            quantizeAxis: the name (or index) of the axis whose columns are scaled (default: the
+                first axis with columns)
+            stats: if True, store the min, max, mean, count and nanCount of each column in the column
+                info (see MetaArray.stats). Blocks appended to such a file update them.
+            pyramid: True, or a list of bin sizes: also store min / max / mean of the data over bins of
+                each size along pyramidAxis (default: appendAxis, or the first axis with values), kept
+                up to date on append. See MetaArray.readOverview().
         """
         if USE_HDF5 is False:
             return self.writeMa(fileName, **opts)
@@ -960,20 +1591,88 @@ class MetaArray(object):
             raise Exception("h5py is required for writing .ma hdf5 files, but it could not be imported."
                             " (set MetaArray.USE_HDF5=False to write in legacy .ma format)") from h5py_import_error
 
-    def writeMeta(self, fileName):
+    @staticmethod
+    def create(fileName, shape, dtype=float, info=None, format="hdf5"):
+        """Create a file holding an uninitialized array of the given shape and dtype, and return a
+        writable MetaArray that is memory-mapped to it.
+
+        The data is allocated contiguously on disk (as with write(..., mappable=True)), so regions of
+        the array can be filled directly with __setitem__ as data arrives, and the file can later be
+        opened with MetaArray(file=fileName, mmap=True) without copying. *format* may be 'hdf5'
+        or 'ma' (legacy format). As with np.empty, the initial contents are undefined.
+        """
+        dtype = np.dtype(dtype)
+        if dtype == object:
+            raise TypeError("Cannot create a file-backed MetaArray with dtype=object")
+        # a zero-stride view lets us validate info against the shape without allocating any data
+        template = MetaArray(np.broadcast_to(np.zeros((), dtype=dtype), shape), info=info)
+
+        if format == "hdf5":
+            if not HAVE_HDF5:
+                raise Exception("h5py is required for creating hdf5 files, but it could not be imported.")
+            # allocate contiguous storage immediately (so it can be mapped) but don't spend time filling it
+            dcpl = h5py.h5p.create(h5py.h5p.DATASET_CREATE)
+            dcpl.set_alloc_time(h5py.h5d.ALLOC_TIME_EARLY)
+            dcpl.set_fill_time(h5py.h5d.FILL_TIME_NEVER)
+            with h5py.File(fileName, "w") as f:
+                f.attrs["MetaArray"] = MetaArray.version
+                f.create_dataset("data", shape=template.shape, dtype=dtype, dcpl=dcpl)
+                template.writeHDF5Meta(f, "info", template._info, chunks=None, compression=None, maxshape=None)
+        elif format == "ma":
+            meta, axValues, _ = template._maMeta()
+            with open(fileName, "wb") as fd:
+                fd.write("{0}\n\n".format(str(meta)).encode())
+                for values in axValues:
+                    MetaArray._writeArrayData(fd, values)
+                fd.truncate(fd.tell() + int(np.prod(template.shape)) * dtype.itemsize)
+        else:
+            raise ValueError(f"Unknown file format {format!r} (expected 'hdf5' or 'ma')")
+
+        return MetaArray(file=fileName, writable=True)
+
+    def writeMeta(self, fileName, repack=False):
         """Used to re-write meta info to the given file.
-        This feature is only available for HDF5 files."""
+        This feature is only available for HDF5 files.
+
+        Only the attributes and data sets that differ from the meta info already in the file are
+        changed; arrays such as axis values are rewritten in place and, if they were created
+        extendable, grown or shrunk in place. Objects that are deleted or replaced leave unused
+        space in the file; if *repack* is True, the file is rewritten afterward to reclaim it
+        (see repackHDF5).
+        """
         f = h5py.File(fileName, "r+")
-        if f.attrs["MetaArray"] != MetaArray.version:
-            raise Exception(
-                f"The file {fileName} was created with a different version of MetaArray. Will not modify."
-            )
-        del f["info"]
+        MetaArray._checkHDF5Version(f, fileName)
+        try:
+            self._updateHDF5Meta(f, "info", self._info)
+        finally:
+            f.close()
+        if repack:
+            MetaArray.repackHDF5(fileName)
 
-        self.writeHDF5Meta(f, "info", self._info)
-        f.close()
+    @staticmethod
+    def repackHDF5(fileName):
+        """Rewrite the HDF5 file *fileName*, reclaiming the space left by deleted or resized objects."""
+        tmpName = fileName + ".repack"
+        try:
+            with h5py.File(fileName, "r") as src, h5py.File(tmpName, "w", libver=src.libver) as dst:
+                for k, v in src.attrs.items():
+                    dst.attrs[k] = v
+                for name in src:
+                    src.copy(src[name], dst, name=name)
+            os.replace(tmpName, fileName)
+        finally:
+            if os.path.exists(tmpName):
+                os.remove(tmpName)
 
-    def writeHDF5(self, fileName, **opts):
+    @staticmethod
+    def _checkHDF5Version(f, fileName):
+        # refuse to modify files written by a different version of MetaArray
+        if f.attrs["MetaArray"] != MetaArray.version:
+            f.close()
+            raise Exception(f"The file {fileName} was created with a different version of MetaArray. Will not modify.")
+
+    def _hdf5DatasetOptions(self, opts):
+        """Return (dsOpts, appendAxis) describing how the data set should be created for the given write options."""
         # default options for writing datasets
         comp = self.defaultCompression
         if isinstance(comp, tuple):
@@ -988,22 +1687,33 @@ class MetaArray(object):
         if copts is not None:
             dsOpts["compression_opts"] = copts
 
-        # if there is an appendable axis, then we can guess the desired chunk shape (optimized for appending)
+        # guess the chunk shape from the expected access pattern
         appAxis = opts.get("appendAxis", None)
         if appAxis is not None:
             appAxis = self._interpretAxis(appAxis)
-            cs = [min(100000, x) for x in self.shape]
-            cs[appAxis] = 1
-
-        # if there are columns, then we can guess a different chunk shape
-        # (read one column at a time)
+        access = opts.get("access", None)
+        accessAxis = opts.get("accessAxis", None)
+        colAxes = [i for i in range(self.ndim) if "cols" in self._info[i]]
+        if access is None:
+            if appAxis is not None:
+                access = "append"
+            elif len(colAxes) > 0:
+                access = "column"
+        if accessAxis is not None:
+            axes = [self._interpretAxis(accessAxis)]
+        elif access == "append" and appAxis is not None:
+            axes = [appAxis]
+        elif access == "column":
+            axes = colAxes
+        elif access in ("window", "append"):
+            # ranges are usually requested along an axis with values (eg. time)
+            valueAxes = [i for i in range(self.ndim) if "values" in self._info[i]]
+            axes = valueAxes[:1] or [0]
         else:
-            cs = [min(100000, x) for x in self.shape]
-            for i in range(self.ndim):
-                if "cols" in self._info[i]:
-                    cs[i] = 1
-
-        dsOpts["chunks"] = tuple(cs)
+            axes = []
+        dsOpts["chunks"] = MetaArray.guessChunkShape(
+            self.shape, self.dtype.itemsize, opts.get("chunkBytes", None), access, axes
+        )
 
         # update options if they were passed in
         for k in dsOpts:
@@ -1015,67 +1725,206 @@ class MetaArray(object):
             dsOpts = {"chunks": None, "compression": None}
 
         # set maximum shape to allow expansion along appendAxis
-        append = False
         if appAxis is not None:
             maxShape = list(self.shape)
-            ax = self._interpretAxis(appAxis)
-            maxShape[ax] = None
-            if os.path.exists(fileName):
-                append = True
+            maxShape[appAxis] = None
             dsOpts["maxshape"] = tuple(maxShape)
         else:
             dsOpts["maxshape"] = None
 
-        if append:
-            f = h5py.File(fileName, "r+")
-            if f.attrs["MetaArray"] != MetaArray.version:
-                raise Exception(
-                    f"The file {fileName} was created with a different version of MetaArray. Will not modify."
-                )
+        return dsOpts, appAxis
+
+    @staticmethod
+    def guessChunkShape(shape, itemsize, chunkBytes=None, access=None, axes=()):
+        """Return a chunk shape of roughly *chunkBytes* bytes (default defaultChunkBytes) for an array
+        of the given shape and item size, laid out for the expected access pattern:
+
+            None      -- balanced chunks, with all axes reduced in proportion
+            'column'  -- chunks are one index wide along each of *axes*, so that a single column
+                         can be read without touching the others
+            'window'  -- chunks span the full extent of all other axes (as far as the size
+                         allows), so that a range along axes[0] reads the fewest chunks
+            'append'  -- like 'window', but the array grows along axes[0], so the chunk length
+                         along that axis is not limited by its current size
+        """
+        if chunkBytes is None:
+            chunkBytes = MetaArray.defaultChunkBytes
+        ndim = len(shape)
+        budget = max(1, int(chunkBytes // itemsize))  # number of elements per chunk
+        limits = [max(1, int(x)) for x in shape]
+        axes = [a for a in axes if a is not None]
+
+        if access is None:
+            cs = list(limits)
+            while np.prod(cs) > budget and max(cs) > 1:
+                i = int(np.argmax(cs))
+                cs[i] = (cs[i] + 1) // 2
+            return tuple(cs)
+
+        if access == "column":
+            fixed = axes
+            grow = [i for i in reversed(range(ndim)) if i not in axes]
+        elif access in ("window", "append"):
+            fixed = []
+            grow = [i for i in reversed(range(ndim)) if i not in axes[:1]] + axes[:1]
+            if access == "append" and len(axes) > 0:
+                limits[axes[0]] = budget
+        else:
+            raise ValueError(f"Unknown access pattern {access!r} (expected None, 'column', 'window' or 'append')")
+
+        # fill the chunk one axis at a time, starting from the last (fastest-varying) axis
+        cs = [1] * ndim
+        for i in grow:
+            rest = int(np.prod([cs[j] for j in range(ndim) if j != i]))
+            cs[i] = max(1, min(limits[i], budget // rest))
+        for i in fixed:
+            cs[i] = 1
+        return tuple(cs)
 
-            # resize data and write in new values
-            data = f["data"]
-            shape = list(data.shape)
-            shape[ax] += self.shape[ax]
-            data.resize(tuple(shape))
-            sl = [slice(None)] * len(data.shape)
-            sl[ax] = slice(-self.shape[ax], None)
-            data[tuple(sl)] = self.view(np.ndarray)
+    def writeHDF5(self, fileName, **opts):
+        if opts.get("appendAxis", None) is None or not os.path.exists(fileName):
+            ma, pyramid = self._prepareHDF5(opts)
+            dsOpts, _ = ma._hdf5DatasetOptions(opts)
+            f = h5py.File(fileName, "w")
+            try:
+                ma._writeHDF5Data(f, dsOpts, workers=opts.get("workers", None))
+                if pyramid is not None:
+                    from . import pyramid as pyr
+
+                    pyr.writeLevels(f, pyramid, dsOpts)
+            finally:
+                f.close()
+        else:
+            # scales, statistics and pyramid levels already stored in the file are used / updated
+            dsOpts, appAxis = self._hdf5DatasetOptions(opts)
+            f = h5py.File(fileName, "r+")
+            MetaArray._checkHDF5Version(f, fileName)
 
             # add axis values if they are present.
             axKeys = ["values"]
             axKeys.extend(opts.get("appendKeys", []))
-            axInfo = f["info"][str(ax)]  # ax is e.g. 0
-            for key in axKeys:
-                if key not in axInfo:
-                    raise TypeError(
-                        f'Cannot append to axis info key "{key}"; this key is not present in the target file.'
-                    )
-                v = axInfo[key]
-                v2 = self._info[ax][key]
-                shape = list(v.shape)  # only possible if v is a Dataset (not a Group)
-                shape[0] += v2.shape[0]
-                v.resize(shape)
-                v[-v2.shape[0]:] = v2
+            axValues = {key: self._info[appAxis][key] for key in axKeys}
+            try:
+                MetaArray._appendHDF5(f, appAxis, self.view(np.ndarray), axValues)
+            finally:
+                f.close()
+
+    def _prepareHDF5(self, opts):
+        """Apply the stats, pyramid and quantize options of a new HDF5 file (removing them from
+        *opts*). Returns the MetaArray to write and the pyramid levels to store (or None)."""
+        ma = self
+        if opts.pop("stats", False):
+            from . import stats
+
+            ma = MetaArray(ma.view(np.ndarray), info=stats.withStats(ma))
+        factors = opts.pop("pyramid", None)
+        pyramidAxis = opts.pop("pyramidAxis", None)
+        levels = None
+        if factors:
+            from . import pyramid
+
+            if pyramidAxis is None:
+                pyramidAxis = opts.get("appendAxis", None)
+            levels = pyramid.buildLevels(ma, factors, pyramidAxis)
+        quantize = opts.pop("quantize", None)
+        quantizeAxis = opts.pop("quantizeAxis", None)
+        if quantize is not None:
+            # statistics and pyramid levels hold the values before encoding
+            from . import scaled
+
+            ma = scaled.encode(ma, quantize, quantizeAxis)
+        return ma, levels
+
+    def _writeHDF5Data(self, f, dsOpts, workers=None):
+        # write data and meta info into a newly created HDF5 file
+        f.attrs["MetaArray"] = MetaArray.version
+        data = self.view(np.ndarray)
+        if workers is not None and workers > 1 and dsOpts.get("compression", None) == "gzip":
+            from . import parallel
+
+            dataset = f.create_dataset("data", shape=data.shape, dtype=data.dtype, **dsOpts)
+            if parallel.canCompressChunks(dataset):
+                parallel.writeChunks(dataset, data, workers=workers)
+            else:
+                dataset[...] = data
         else:
-            f = h5py.File(fileName, "w")
-            f.attrs["MetaArray"] = MetaArray.version
-            f.create_dataset("data", data=self.view(np.ndarray), **dsOpts)
+            f.create_dataset("data", data=data, **dsOpts)
+
+        # dsOpts is used when storing meta data whenever an array is encountered
+        # however, 'chunks' will no longer be valid for these arrays if it specifies a chunk shape.
+        # 'maxshape' is right-out.
+        dsOpts = dsOpts.copy()
+        if isinstance(dsOpts["chunks"], tuple):
+            dsOpts["chunks"] = True
+            if "maxshape" in dsOpts:
+                del dsOpts["maxshape"]
+        self.writeHDF5Meta(f, "info", self._info, **dsOpts)
 
-            # dsOpts is used when storing meta data whenever an array is encountered
-            # however, 'chunks' will no longer be valid for these arrays if it specifies a chunk shape.
-            # 'maxshape' is right-out.
-            if isinstance(dsOpts["chunks"], tuple):
-                dsOpts["chunks"] = True
-                if "maxshape" in dsOpts:
-                    del dsOpts["maxshape"]
-            self.writeHDF5Meta(f, "info", self._info, **dsOpts)
+    @staticmethod
+    def _appendHDF5(f, ax, data, axValues):
+        """Append *data* along axis *ax* of the open HDF5 file *f*.
+        *axValues* is a dict of {key: array} to append to the matching datasets in the axis info.
+        """
+        # Axis info is extended before the data, so that a reader in SWMR mode (which refreshes
+        # the data first) never sees frames without their axis values.
+        from . import pyramid, stats
 
-        f.close()
+        # check everything before the first write, so that a rejected block leaves the file as it was
+        swmr = f.swmr_mode
+        dataset = f["data"]
+        axInfo = f["info"][str(ax)]  # ax is e.g. 0
+        n = data.shape[ax]
+        if data.ndim != dataset.ndim or any(
+            a != b for i, (a, b) in enumerate(zip(data.shape, dataset.shape)) if i != ax
+        ):
+            raise ValueError(
+                f"Can not append data of shape {data.shape} along axis {ax} to data of shape {dataset.shape}"
+            )
+        for key, v2 in axValues.items():
+            if key not in axInfo:
+                raise TypeError(f'Cannot append to axis info key "{key}"; this key is not present in the target file.')
+            if v2.shape[0] != n:
+                raise ValueError(f'Axis info "{key}" has {v2.shape[0]} entries for {n} appended frames')
+        pyramid.checkAppend(f, ax)
+
+        for key, v2 in axValues.items():
+            v = axInfo[key]
+            shape = list(v.shape)  # only possible if v is a Dataset (not a Group)
+            shape[0] += v2.shape[0]
+            v.resize(shape)
+            v[-v2.shape[0] :] = v2
+            if swmr:
+                v.flush()
+
+        # statistics and pyramid levels describe decoded values; scaled files store raw integers
+        values = data
+        if np.issubdtype(dataset.dtype, np.integer):
+            from . import scaled
+
+            scaling = scaled.fileScaling(f)
+            if scaling is not None:
+                if np.issubdtype(data.dtype, np.integer):
+                    values = scaled.decodeData(data, *scaling)
+                else:
+                    data = scaled.encodeData(data, *scaling, dataset.dtype)
+        stats.updateFile(f, values)
+        pyramid.appendLevels(f, ax, values, axValues.get("values", None))
+
+        # resize data and write in new values
+        shape = list(dataset.shape)
+        shape[ax] += n
+        dataset.resize(tuple(shape))
+        sl = [slice(None)] * len(dataset.shape)
+        sl[ax] = slice(-n, None)
+        dataset[tuple(sl)] = data
+        if swmr:
+            dataset.flush()
 
     def writeHDF5Meta(self, root, name, data, **dsOpts):
         if isinstance(data, np.ndarray):
-            dsOpts["maxshape"] = (None,) + data.shape[1:]
+            if dsOpts.get("chunks", True) is not None:
+                # allow arrays to be extended along with an appendable axis
+                dsOpts["maxshape"] = (None,) + data.shape[1:]
             root.create_dataset(name, data=data, **dsOpts)
         elif isinstance(data, (list, tuple)):
             gr = root.create_group(name)
@@ -1100,10 +1949,134 @@ class MetaArray(object):
                 print(f"Can not store meta data of type '{type(data)}' in HDF5. (key is '{name}')")
                 raise
 
+    def _updateHDF5Meta(self, root, name, data):
+        # Make root[name] (or the attribute root.attrs[name]) hold *data* as writeHDF5Meta would
+        # store it, changing only what differs from what is already stored.
+        if isinstance(data, np.ndarray):
+            if name in root.attrs:
+                del root.attrs[name]
+            old = root.get(name)
+            if isinstance(old, h5py.Dataset) and old.dtype == data.dtype and old.shape[1:] == data.shape[1:]:
+                if old.shape == data.shape:
+                    if not MetaArray._sameArray(old[()], data):
+                        old[...] = data
+                    return
+                if data.ndim > 0 and old.maxshape[0] is None:
+                    # extend (or shrink) in place; only the part that changed is written
+                    n = min(old.shape[0], data.shape[0])
+                    old.resize(data.shape[0], axis=0)
+                    if n > 0 and not MetaArray._sameArray(old[:n], data[:n]):
+                        old[:n] = data[:n]
+                    if data.shape[0] > n:
+                        old[n:] = data[n:]
+                    return
+            if old is not None:
+                del root[name]
+            self.writeHDF5Meta(root, name, data)
+        elif isinstance(data, (list, tuple, dict)):
+            if name in root.attrs:
+                del root.attrs[name]
+            typ = "dict" if isinstance(data, dict) else type(data).__name__
+            old = root.get(name)
+            oldTyp = old.attrs.get("_metaType_") if isinstance(old, h5py.Group) else None
+            if isinstance(oldTyp, bytes):
+                oldTyp = oldTyp.decode("utf-8")
+            if oldTyp != typ:
+                if old is not None:
+                    del root[name]
+                self.writeHDF5Meta(root, name, data)
+                return
+            items = data.items() if isinstance(data, dict) else ((str(i), v) for i, v in enumerate(data))
+            keys = set()
+            for k, v in items:
+                keys.add(str(k))
+                self._updateHDF5Meta(old, k, v)
+            for k in list(old.attrs):
+                if k != "_metaType_" and k not in keys:
+                    del old.attrs[k]
+            for k in list(old):
+                if k not in keys:
+                    del old[k]
+        else:
+            if name in root:
+                del root[name]
+            if isinstance(data, (int, float, np.integer, np.floating)):
+                value = data
+            else:
+                value = repr(data)  # as in writeHDF5Meta
+            if name in root.attrs and MetaArray._sameAttr(root.attrs[name], value):
+                return
+            root.attrs[name] = value
+
+    @staticmethod
+    def _sameArray(a, b):
+        try:
+            return np.array_equal(a, b, equal_nan=True)
+        except TypeError:
+            return np.array_equal(a, b)
+
+    @staticmethod
+    def _sameAttr(old, new):
+        if isinstance(new, str):
+            if isinstance(old, bytes):
+                old = old.decode("utf-8")
+            return isinstance(old, str) and old == new
+        old = np.asarray(old)
+        new = np.asarray(new)
+        return old.dtype == new.dtype and old.shape == new.shape and MetaArray._sameArray(old, new)
+
     def writeMa(self, fileName, appendAxis=None, newFile=False):
-        """Write an old-style .ma file"""
-        meta = {"shape": self.shape, "type": str(self.dtype), "info": self.infoCopy(), "version": MetaArray.version}
-        axstrs = []
+        """Write an old-style .ma file
+
+        Array data and axis values are streamed to the file from their own buffers; data that is
+        not contiguous in memory (or is read lazily from an HDF5 file) is written in blocks of
+        about writeBlockSize bytes, so no full copy of the array is made.
+        """
+        meta, axValues, dynXVals = self._maMeta(appendAxis)
+        if appendAxis is not None and MetaArray.isNameType(appendAxis):
+            appendAxis = self._interpretAxis(appendAxis)
+
+        # Decide whether to output the meta block for a new file
+        if not newFile:
+            # If the file does not exist or its size is 0, then we must write the header
+            newFile = (not os.path.exists(fileName)) or (os.stat(fileName).st_size == 0)
+
+        # write data to file
+        if appendAxis is None or newFile:
+            fd = open(fileName, "wb")
+            fd.write("{0}\n\n".format(str(meta)).encode())
+            for values in axValues:
+                MetaArray._writeArrayData(fd, values)
+        else:
+            fd = open(fileName, "ab")
+
+        try:
+            if self.dtype != object:
+                dataStr = None
+                dataLen = int(np.prod(self.shape)) * self.dtype.itemsize
+            else:
+                dataStr = pickle.dumps(self.view(np.ndarray))
+                dataLen = len(dataStr)
+            if appendAxis is not None:
+                frameInfo = {"len": dataLen, "numFrames": self.shape[appendAxis]}
+                if dynXVals is not None:
+                    frameInfo["xVals"] = list(dynXVals)
+                fd.write("\n{0}\n".format(str(frameInfo)).encode())
+            if dataStr is None:
+                MetaArray._writeArrayData(fd, self._decoded())
+            else:
+                fd.write(dataStr)
+        finally:
+            fd.close()
+
+    def _maMeta(self, appendAxis=None):
+        # Return (meta, axValues, dynXVals): the header dict for a .ma file, the list of axis values
+        # arrays to write after it, and the values of the dynamic axis (if any)
+
+        # copy the info structure, but not the (potentially large) axis values arrays
+        info = [{k: (v if k == "values" else deepcopy(v)) for k, v in ax.items()} for ax in self._info]
+        meta = {"shape": self.shape, "type": str(self.dtype), "info": info, "version": MetaArray.version}
+        axValues = []
         dynXVals = None
 
         # copy out axis values for dynamic axis if requested
@@ -1118,62 +2091,185 @@ class MetaArray(object):
                 dynXVals = ax["values"]
                 del ax["values"]
 
-        # Generate axis data string, modify axis info so we know how to read it back in later
+        # Collect axis value arrays, modify axis info so we know how to read it back in later
         for ax in meta["info"]:
             if "values" in ax:
-                axstrs.append(ax["values"].tostring())
-                ax["values_len"] = len(axstrs[-1])
-                ax["values_type"] = str(ax["values"].dtype)
+                values = np.asarray(ax["values"])
+                axValues.append(values)
+                ax["values_len"] = values.nbytes
+                ax["values_type"] = str(values.dtype)
                 del ax["values"]
+        return meta, axValues, dynXVals
 
-        # Decide whether to output the meta block for a new file
-        if not newFile:
-            # If the file does not exist or its size is 0, then we must write the header
-            newFile = (not os.path.exists(fileName)) or (os.stat(fileName).st_size == 0)
+    @staticmethod
+    def _writeArrayData(fd, data):
+        # Write the raw bytes of *data* in C order to the file *fd*, without copying contiguous arrays
+        if isinstance(data, np.ndarray) and data.flags.c_contiguous:
+            fd.write(data.reshape(-1).view(np.uint8))
+            return
+        if len(data.shape) == 0:
+            fd.write(np.ascontiguousarray(data[()]).reshape(-1).view(np.uint8))
+            return
+        rowBytes = max(1, int(np.prod(data.shape[1:])) * data.dtype.itemsize)
+        rows = max(1, MetaArray.writeBlockSize // rowBytes)
+        for i in range(0, data.shape[0], rows):
+            block = np.ascontiguousarray(data[i : i + rows])
+            fd.write(block.reshape(-1).view(np.uint8))
+
+    def toShared(self):
+        """Copy this array into a named shared memory segment and return a SharedMetaArray handle.
+
+        The handle owns the segment and removes it when unlink() is called (or when the handle is
+        garbage collected). It is small to pickle, so it can be passed to other processes, which
+        view the data without copying by calling MetaArray.fromShared(handle).
+        """
+        from . import shared
 
-        # write data to file
-        if appendAxis is None or newFile:
-            fd = open(fileName, "wb")
-            fd.write("{0}\n\n".format(str(meta)).encode())
-            for ax in axstrs:
-                fd.write(ax)
-        else:
-            fd = open(fileName, "ab")
+        return shared.SharedMetaArray.create(self)
 
-        if self.dtype != object:
-            dataStr = self.view(np.ndarray).tostring()
-        else:
-            dataStr = pickle.dumps(self.view(np.ndarray))
-        if appendAxis is not None:
-            frameInfo = {"len": len(dataStr), "numFrames": self.shape[appendAxis]}
-            if dynXVals is not None:
-                frameInfo["xVals"] = list(dynXVals)
-            fd.write("\n{0}\n".format(str(frameInfo)).encode())
-        fd.write(dataStr)
-        fd.close()
-
-    def writeCsv(self, fileName=None):
-        """Write 2D array to CSV file or return the string if no filename is given"""
+    @staticmethod
+    def fromShared(handle):
+        """Return a MetaArray viewing the shared memory segment created by toShared().
+
+        *handle* is the SharedMetaArray returned by toShared(), or the name of its segment.
+        """
+        from . import shared
+
+        if isinstance(handle, str):
+            handle = shared.SharedMetaArray(handle)
+        return handle.attach()
+
+    @staticmethod
+    def readOverview(fileName, start=None, stop=None, resolution=None, minPoints=None, swmr=False):
+        """Read the coarsest stored pyramid level of *fileName* that has bins no wider than *resolution*
+        and at least *minPoints* bins between *start* and *stop*. Returns (factor, {'min', 'max',
+        'mean': MetaArray}). See MetaArray.pyramid.readOverview."""
+        from . import pyramid
+
+        return pyramid.readOverview(fileName, start, stop, resolution=resolution, minPoints=minPoints, swmr=swmr)
+
+    @staticmethod
+    def readMany(fileNames, subset=None, workers=None, **kwds):
+        """Read many files in parallel worker processes and return a list of MetaArrays in the same order.
+
+        Each file is read (and decompressed) in one of *workers* processes, which avoids h5py's
+        global lock, and returned through shared memory. If *subset* is given, only that region
+        of each array is read. The process pool is kept for later calls; see MetaArray.readpool
+        for a pool with an explicit lifetime. Extra arguments are passed to readFile().
+        """
+        from . import readpool
+
+        return readpool.readMany(fileNames, subset=subset, workers=workers, **kwds)
+
+    def toArrow(self):
+        """Return a pyarrow.Table with one column per column of this 2D array (see MetaArray.arrow)."""
+        from . import arrow
+
+        return arrow.toArrow(self)
+
+    @staticmethod
+    def fromArrow(table):
+        """Return a MetaArray built from a pyarrow.Table (see MetaArray.arrow)."""
+        from . import arrow
+
+        return arrow.fromArrow(table)
+
+    def writeParquet(self, fileName, **kwds):
+        """Write this 2D array to a Parquet file (see MetaArray.arrow)."""
+        from . import arrow
+
+        arrow.writeParquet(self, fileName, **kwds)
+
+    @staticmethod
+    def readParquet(fileName, columns=None, **kwds):
+        """Read a MetaArray from a Parquet file written by writeParquet() (see MetaArray.arrow)."""
+        from . import arrow
+
+        return arrow.readParquet(fileName, columns=columns, **kwds)
+
+    # Number of rows formatted at once by writeCsv
+    csvBlockRows = 10000
+
+    def writeCsv(self, fileName=None, axisValues=False, fmt="%g"):
+        """Write 2D array to CSV file or return the string if no filename is given.
+
+        Each line holds the values along axis 0 for one index of axis 1, preceded by a header line
+        of column names if axis 0 has columns. *fileName* may also be an open text file. If
+        *axisValues* is True, the values of axis 1 are written as the first column. *fmt* is the
+        %-format used for each value. Rows are formatted and written in blocks of csvBlockRows.
+        """
         if self.ndim > 2:
             raise Exception("CSV Export is only for 2D arrays")
-        fh = None if fileName is None else open(fileName, "w")
-        ret = ""
+        if fileName is None:
+            fh = io.StringIO()
+            self._writeCsv(fh, axisValues, fmt)
+            return fh.getvalue()
+        elif isinstance(fileName, (str, os.PathLike)):
+            with open(fileName, "w") as fh:
+                self._writeCsv(fh, axisValues, fmt)
+        else:
+            self._writeCsv(fileName, axisValues, fmt)
+
+    def _writeCsv(self, fh, axisValues, fmt):
+        data = self._decoded()
+        if self.ndim == 1:
+            data = np.asarray(data).reshape(self.shape[0], 1)
+        nRows = data.shape[1]
+        if axisValues:
+            xvals = np.asarray(self.axisValues(1)) if self.ndim == 2 else np.zeros(1)
+
         if "cols" in self._info[0]:
-            s = ",".join([x["name"] for x in self._info[0]["cols"]]) + "\n"
-            if fileName is not None:
-                fh.write(s)
-            else:
-                ret += s
-        for row in range(0, self.shape[1]):
-            s = ",".join(["%g" % x for x in self[:, row]]) + "\n"
-            if fileName is not None:
-                fh.write(s)
-            else:
-                ret += s
-        if fileName is not None:
-            fh.close()
+            names = [str(x["name"]) for x in self._info[0]["cols"]]
+            if axisValues:
+                names.insert(0, str(self._info[1].get("name", "values")) if self.ndim == 2 else "values")
+            fh.write(",".join(names) + "\n")
+
+        nCols = data.shape[0] + (1 if axisValues else 0)
+        lineFmt = ",".join([fmt] * nCols) + "\n"
+        for start in range(0, nRows, self.csvBlockRows):
+            block = np.asarray(data[:, start : start + self.csvBlockRows]).T
+            if axisValues:
+                block = np.column_stack([xvals[start : start + self.csvBlockRows], block])
+            # one string formatting operation per block rather than one per value
+            fh.write((lineFmt * block.shape[0]) % tuple(block.ravel().tolist()))
+
+    @staticmethod
+    def readCsv(fileName, axisValues=False, dtype=float):
+        """Read a CSV file written by writeCsv() and return a MetaArray.
+
+        If the first line holds column names, they become the columns of axis 0. If *axisValues*
+        is True, the first column is used as the values of axis 1 (and its header as the axis name).
+        """
+        if isinstance(fileName, (str, os.PathLike)):
+            fh = open(fileName, "r")
         else:
-            return ret
+            fh = fileName
+        try:
+            first = fh.readline()
+            fields = [f.strip() for f in first.strip().split(",")]
+            try:
+                [float(f) for f in fields]
+                names = None
+                rows = [first]
+            except ValueError:
+                names = fields
+                rows = []
+            data = np.loadtxt(itertools.chain(rows, fh), delimiter=",", dtype=dtype, ndmin=2)
+        finally:
+            if fh is not fileName:
+                fh.close()
+
+        if data.size == 0:
+            data = data.reshape(0, len(fields))
+        info = [{}, {}]
+        if axisValues:
+            info[1]["values"] = data[:, 0].copy()
+            data = data[:, 1:]
+            if names is not None:
+                info[1]["name"] = names.pop(0)
+        if names is not None:
+            info[0]["cols"] = [{"name": n} for n in names]
+        return MetaArray(np.ascontiguousarray(data.T), info=info)
 
 
 def axis(name=None, cols=None, values=None, units=None):
@@ -0,0 +1,195 @@
+"""
+arrow.py -  Conversion between MetaArray and Apache Arrow tables / Parquet files
+Distributed under MIT/X11 license. See license.txt for more information.
+
+A 2D MetaArray with columns on one axis maps naturally to a table: each column becomes an
+Arrow array, the values of the other axis (if any) become an index column, and the
+remaining meta info is stored as JSON in the schema metadata so that the MetaArray can be
+rebuilt. Arrays in the meta info are stored as lists tagged with their dtype; other values
+that JSON can not hold (eg. dates) are stored as their repr().
+"""
+
+import ast
+import json
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    raise ImportError("MetaArray Arrow support requires pyarrow: pip install pyarrow")
+
+from . import MetaArray
+
+# schema metadata key holding the MetaArray info
+META_KEY = b"MetaArray"
+
+
+def _columnAxis(ma):
+    if ma.ndim != 2:
+        raise ValueError("Arrow conversion is only for 2D arrays")
+    for i in (0, 1):
+        if "cols" in ma._info[i]:
+            return i
+    raise ValueError("Arrow conversion requires an axis with columns")
+
+
+def _plainInfo(obj):
+    # convert meta info into objects that JSON can store; arrays become tagged lists
+    if isinstance(obj, np.ndarray):
+        return {"__ndarray__": obj.tolist(), "dtype": obj.dtype.str}
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, dict):
+        return {str(k): _plainInfo(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_plainInfo(v) for v in obj]
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    return {"__repr__": repr(obj)}
+
+
+def _restoreInfo(obj):
+    # inverse of _plainInfo
+    if isinstance(obj, dict):
+        if "__ndarray__" in obj:
+            return np.array(obj["__ndarray__"], dtype=np.dtype(obj["dtype"]))
+        if "__repr__" in obj:
+            # values that are not literals (eg. datetime.date) are returned as their repr string
+            try:
+                return ast.literal_eval(obj["__repr__"])
+            except (ValueError, SyntaxError):
+                return obj["__repr__"]
+        return {k: _restoreInfo(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_restoreInfo(v) for v in obj]
+    return obj
+
+
+def _readMeta(schemaMeta):
+    # the MetaArray meta info stored in Arrow schema metadata (parsed as data, never evaluated)
+    return _restoreInfo(json.loads(schemaMeta[META_KEY].decode()))
+
+
+def _field(name, arr, desc):
+    # units are also stored with each field so that other Arrow consumers can find them
+    meta = None
+    if "units" in desc:
+        meta = {b"units": str(desc["units"]).encode()}
+    return pa.field(name, arr.type, metadata=meta)
+
+
+def toArrow(ma):
+    """Return a pyarrow.Table holding one column per column of the 2D MetaArray *ma*.
+
+    Columns that are contiguous in memory (those of axis 0) share the MetaArray's buffer
+    without copying. The values of the other axis, if any, are stored as the first column
+    of the table, and all meta info is stored in the schema metadata.
+    """
+    colAxis = _columnAxis(ma)
+    rowAxis = 1 - colAxis
+    data = ma.asarray()
+    info = ma.infoCopy()
+    cols = info[colAxis]["cols"]
+
+    arrays = []
+    fields = []
+    index = None
+    if "values" in info[rowAxis]:
+        index = str(info[rowAxis].get("name", "index"))
+        arrays.append(pa.array(np.asarray(info[rowAxis]["values"])))
+        fields.append(_field(index, arrays[-1], info[rowAxis]))
+        del info[rowAxis]["values"]
+
+    fieldNames = []
+    for i, col in enumerate(cols):
+        name = str(col.get("name", i))
+        column = data[i] if colAxis == 0 else data[:, i]
+        arrays.append(pa.array(column))  # zero-copy when the column is contiguous
+        fields.append(_field(name, arrays[-1], col))
+        fieldNames.append(name)
+
+    meta = {"info": info, "colAxis": colAxis, "index": index, "fields": fieldNames}
+    schema = pa.schema(fields, metadata={META_KEY: json.dumps(_plainInfo(meta)).encode()})
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def fromArrow(table):
+    """Return a 2D MetaArray built from the pyarrow.Table *table*.
+
+    Tables written by toArrow() are restored with their original layout and meta info (a table
+    holding only some of the original columns is also accepted). For other tables, each
+    table column becomes a column of axis 1, with rows along axis 0.
+    """
+    schemaMeta = table.schema.metadata or {}
+    if META_KEY in schemaMeta:
+        meta = _readMeta(schemaMeta)
+        info = meta["info"]
+        colAxis = meta["colAxis"]
+        index = meta["index"]
+        allCols = info[colAxis]["cols"]
+        colNames = meta["fields"]
+    else:
+        info = [{}, {"cols": []}, {}]
+        colAxis = 1
+        index = None
+        allCols = None
+        colNames = None
+    rowAxis = 1 - colAxis
+
+    # Columns are taken by position, since names may repeat or match the index. toArrow() puts
+    # the index column first; a table holding only some of the columns is matched up by name.
+    names = table.column_names
+    first = 1 if index is not None and len(names) > 0 and names[0] == index else 0
+    if first:
+        info[rowAxis]["values"] = table.column(0).to_numpy()
+    unused = None if allCols is None or names[first:] == colNames else list(range(len(colNames)))
+    columns = []
+    cols = []
+    for i in range(first, len(names)):
+        name = names[i]
+        columns.append(table.column(i).to_numpy())
+        if allCols is None:
+            col = {"name": name}
+            units = table.schema.field(i).metadata or {}
+            if b"units" in units:
+                col["units"] = units[b"units"].decode()
+        elif unused is None:
+            col = allCols[i - first]
+        else:
+            j = next(j for j in unused if colNames[j] == name)
+            unused.remove(j)
+            col = allCols[j]
+        cols.append(col)
+    info[colAxis]["cols"] = cols
+
+    nRows = table.num_rows
+    if len(columns) == 0:
+        data = np.empty((0, nRows) if colAxis == 0 else (nRows, 0))
+    else:
+        data = np.stack(columns, axis=colAxis)
+    return MetaArray(data, info=info)
+
+
+def writeParquet(ma, fileName, **kwds):
+    """Write the 2D MetaArray *ma* to a Parquet file. Extra arguments are passed to pyarrow.parquet.write_table."""
+    pq.write_table(toArrow(ma), fileName, **kwds)
+
+
+def readParquet(fileName, columns=None, **kwds):
+    """Read a MetaArray from a Parquet file written by writeParquet().
+
+    *columns* may list a subset of the column names to read; the index column is always read.
+    """
+    schema = pq.read_schema(fileName)
+    if columns is not None:
+        schemaMeta = schema.metadata or {}
+        if META_KEY in schemaMeta:
+            index = _readMeta(schemaMeta)["index"]
+            if index is not None and index not in columns:
+                columns = [index] + list(columns)
+    if len(set(schema.names)) < len(schema.names):
+        # the dataset reader behind read_table() rejects repeated column names
+        return fromArrow(pq.ParquetFile(fileName).read(columns=columns, **kwds))
+    return fromArrow(pq.read_table(fileName, columns=columns, **kwds))
@@ -0,0 +1,295 @@
+"""
+catalog.py -  Searchable index of the MetaArray files in a directory tree
+Distributed under MIT/X11 license. See license.txt for more information.
+
+Finding the files that have a given axis, column or shape normally means opening every file
+and parsing its meta info. A MetaArrayCatalog reads the meta info of each file once and
+stores a summary (shape, dtype, axis names, units, columns, axis value ranges and extra info
+keys) in a SQLite database next to the data. Later updates only re-read files whose size or
+modification time has changed, and queries are answered from the database alone.
+"""
+
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import MetaArray
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, format TEXT,
+    ndim INTEGER, shape TEXT, dtype TEXT, error TEXT
+);
+CREATE TABLE IF NOT EXISTS axes (
+    path TEXT, axis INTEGER, name TEXT, units TEXT, length INTEGER, vmin REAL, vmax REAL
+);
+CREATE TABLE IF NOT EXISTS columns (
+    path TEXT, axis INTEGER, col INTEGER, name TEXT, units TEXT
+);
+CREATE TABLE IF NOT EXISTS info (
+    path TEXT, key TEXT, value TEXT
+);
+CREATE INDEX IF NOT EXISTS axes_path ON axes (path);
+CREATE INDEX IF NOT EXISTS axes_name ON axes (name);
+CREATE INDEX IF NOT EXISTS columns_path ON columns (path);
+CREATE INDEX IF NOT EXISTS columns_name ON columns (name);
+CREATE INDEX IF NOT EXISTS info_path ON info (path);
+CREATE INDEX IF NOT EXISTS info_key ON info (key);
+"""
+
+# longest repr() of an extra info value that is stored in the catalog
+MAX_VALUE_LENGTH = 1000
+
+
+def _str(value):
+    return None if value is None else str(value)
+
+
+def _valueRange(values):
+    try:
+        values = np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return None, None
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return None, None
+    return float(values.min()), float(values.max())
+
+
+def readFileMeta(fileName):
+    """Return (format, shape, dtype, info) for a MetaArray file without reading its data."""
+    with open(fileName, "rb") as fd:
+        fmt = "hdf5" if fd.read(8) == b"\x89HDF\r\n\x1a\n" else "ma"
+    ma = MetaArray(file=fileName, readAllData=False)
+    try:
+        return fmt, tuple(ma.shape), str(ma.dtype), ma._info
+    finally:
+        openFile = getattr(ma, "_openFile", None)
+        if openFile is not None:
+            openFile.close()
+
+
+def scanFile(root, relPath):
+    """Return the catalog rows for one file as a dict of {table: [rows]}.
+
+    Files that can not be read get a row in the files table recording the error, so that they
+    are not read again until they change.
+    """
+    fileName = os.path.join(root, relPath)
+    stat = os.stat(fileName)
+    rows = {"files": [], "axes": [], "columns": [], "info": []}
+    try:
+        fmt, shape, dtype, info = readFileMeta(fileName)
+    except Exception as exc:
+        rows["files"].append((relPath, stat.st_size, stat.st_mtime_ns, None, None, None, None, repr(exc)))
+        return rows
+
+    rows["files"].append((relPath, stat.st_size, stat.st_mtime_ns, fmt, len(shape), repr(shape), dtype, None))
+    for i, ax in enumerate(info[: len(shape)]):
+        vmin, vmax = _valueRange(ax["values"]) if "values" in ax else (None, None)
+        rows["axes"].append((relPath, i, _str(ax.get("name")), _str(ax.get("units")), shape[i], vmin, vmax))
+        for j, col in enumerate(ax.get("cols", [])):
+            rows["columns"].append((relPath, i, j, _str(col.get("name")), _str(col.get("units"))))
+    if len(info) > len(shape):
+        for key, value in info[-1].items():
+            rows["info"].append((relPath, str(key), repr(value)[:MAX_VALUE_LENGTH]))
+    return rows
+
+
+class MetaArrayCatalog(object):
+    """Index of the meta info of all MetaArray files below *directory*.
+
+    The index is stored in a SQLite database, by default ``.metaarray-catalog.sqlite`` in
+    *directory*. Files are those whose names end with one of *extensions*. update() must be
+    called to bring the index up to date with the files on disk; after that, find() and
+    fileInfo() answer queries without opening any data files.
+
+    Example::
+
+        cat = MetaArrayCatalog('/data/recordings')
+        cat.update(workers=8)
+        for path in cat.find(axis='Time', column='Vm', ndim=2):
+            ...
+    """
+
+    def __init__(self, directory, indexFile=None, extensions=(".ma",)):
+        self.directory = os.path.abspath(directory)
+        if indexFile is None:
+            indexFile = os.path.join(self.directory, ".metaarray-catalog.sqlite")
+        self.indexFile = indexFile
+        self.extensions = tuple(extensions)
+        self._db = sqlite3.connect(indexFile)
+        self._db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def listFiles(self):
+        """Return {relative path: (size, mtime_ns)} for all matching files currently on disk."""
+        files = {}
+        for dirPath, dirNames, fileNames in os.walk(self.directory):
+            dirNames.sort()
+            for name in sorted(fileNames):
+                if not name.endswith(self.extensions):
+                    continue
+                fullPath = os.path.join(dirPath, name)
+                if os.path.abspath(fullPath) == os.path.abspath(self.indexFile):
+                    continue
+                stat = os.stat(fullPath)
+                files[os.path.relpath(fullPath, self.directory)] = (stat.st_size, stat.st_mtime_ns)
+        return files
+
+    def update(self, workers=None):
+        """Bring the index up to date with the files on disk.
+
+        New files and files whose size or modification time changed are (re)read, and files
+        that no longer exist are removed. If *workers* > 1, files are read in that many worker
+        processes. Returns (number of files read, number of files removed).
+        """
+        onDisk = self.listFiles()
+        indexed = {row[0]: (row[1], row[2]) for row in self._db.execute("SELECT path, size, mtime FROM files")}
+        stale = [path for path in indexed if path not in onDisk]
+        changed = [path for path, stat in onDisk.items() if indexed.get(path) != stat]
+
+        with self._db:
+            self._delete(stale + [path for path in changed if path in indexed])
+        if workers is not None and workers > 1 and len(changed) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                chunkSize = max(1, len(changed) // (workers * 8))
+                results = pool.map(scanFile, [self.directory] * len(changed), changed, chunksize=chunkSize)
+                self._insert(results)
+        else:
+            self._insert(scanFile(self.directory, path) for path in changed)
+        return len(changed), len(stale)
+
+    def rebuild(self, workers=None):
+        """Discard the index and read all files again."""
+        with self._db:
+            for table in ("files", "axes", "columns", "info"):
+                self._db.execute(f"DELETE FROM {table}")
+        return self.update(workers=workers)
+
+    def _delete(self, paths):
+        for path in paths:
+            for table in ("files", "axes", "columns", "info"):
+                self._db.execute(f"DELETE FROM {table} WHERE path = ?", (path,))
+
+    def _insert(self, results):
+        # commit in batches so that an interrupted update keeps the files read so far
+        batch = 0
+        for rows in results:
+            self._db.execute("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows["files"][0])
+            self._db.executemany("INSERT INTO axes VALUES (?, ?, ?, ?, ?, ?, ?)", rows["axes"])
+            self._db.executemany("INSERT INTO columns VALUES (?, ?, ?, ?, ?)", rows["columns"])
+            self._db.executemany("INSERT INTO info VALUES (?, ?, ?)", rows["info"])
+            batch += 1
+            if batch >= 1000:
+                self._db.commit()
+                batch = 0
+        self._db.commit()
+
+    def find(
+        self,
+        axis=None,
+        column=None,
+        units=None,
+        shape=None,
+        ndim=None,
+        dtype=None,
+        infoKey=None,
+        valueRange=None,
+        format=None,
+    ):
+        """Return the sorted paths (relative to the catalog directory) of files matching all criteria.
+
+        *axis* / *column*: an axis / column with this name exists
+        *units*: an axis or column has these units
+        *shape*: the shape matches; axes given as None match any length
+        *ndim*, *dtype*, *format*: equal to the given value (format is 'hdf5' or 'ma')
+        *infoKey*: the extra info dict holds this key
+        *valueRange*: {axisName: (start, stop)}; the values of the named axis overlap [start, stop]
+
+        Files that could not be read never match; see errors().
+        """
+        where = ["error IS NULL"]
+        params = []
+        if axis is not None:
+            where.append("path IN (SELECT path FROM axes WHERE name = ?)")
+            params.append(axis)
+        if column is not None:
+            where.append("path IN (SELECT path FROM columns WHERE name = ?)")
+            params.append(column)
+        if units is not None:
+            where.append(
+                "(path IN (SELECT path FROM axes WHERE units = ?)"
+                " OR path IN (SELECT path FROM columns WHERE units = ?))"
+            )
+            params.extend([units, units])
+        if shape is not None:
+            where.append("ndim = ?")
+            params.append(len(shape))
+            for i, n in enumerate(shape):
+                if n is not None:
+                    where.append("path IN (SELECT path FROM axes WHERE axis = ? AND length = ?)")
+                    params.extend([i, n])
+        for field, value in (("ndim", ndim), ("dtype", dtype), ("format", format)):
+            if value is not None:
+                where.append(f"{field} = ?")
+                params.append(str(value) if field == "dtype" else value)
+        if infoKey is not None:
+            where.append("path IN (SELECT path FROM info WHERE key = ?)")
+            params.append(infoKey)
+        for name, (start, stop) in (valueRange or {}).items():
+            where.append("path IN (SELECT path FROM axes WHERE name = ? AND vmin <= ? AND vmax >= ?)")
+            params.extend([name, stop, start])
+
+        sql = "SELECT path FROM files WHERE " + " AND ".join(where) + " ORDER BY path"
+        return [row[0] for row in self._db.execute(sql, params)]
+
+    def fileInfo(self, path):
+        """Return a dict summarizing the indexed meta info for one file (path relative to the catalog directory)."""
+        row = self._db.execute(
+            "SELECT format, shape, dtype, size, mtime, error FROM files WHERE path = ?", (path,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(path)
+        fmt, shape, dtype, size, mtime, error = row
+        ret = {
+            "format": fmt,
+            "shape": None if shape is None else eval(shape),
+            "dtype": dtype,
+            "size": size,
+            "mtime": mtime,
+            "error": error,
+            "axes": [],
+        }
+        for i, name, units, length, vmin, vmax in self._db.execute(
+            "SELECT axis, name, units, length, vmin, vmax FROM axes WHERE path = ? ORDER BY axis", (path,)
+        ):
+            cols = [
+                {"name": cName, "units": cUnits}
+                for cName, cUnits in self._db.execute(
+                    "SELECT name, units FROM columns WHERE path = ? AND axis = ? ORDER BY col", (path, i)
+                )
+            ]
+            ret["axes"].append({"name": name, "units": units, "length": length, "range": (vmin, vmax), "cols": cols})
+        ret["info"] = dict(self._db.execute("SELECT key, value FROM info WHERE path = ?", (path,)).fetchall())
+        return ret
+
+    def errors(self):
+        """Return {path: error message} for files that could not be read."""
+        return dict(self._db.execute("SELECT path, error FROM files WHERE error IS NOT NULL ORDER BY path"))
+
+    def query(self, sql, params=()):
+        """Run a SQL query against the index tables (files, axes, columns, info) and return all rows."""
+        return self._db.execute(sql, params).fetchall()
@@ -0,0 +1,139 @@
+"""
+chunkcache.py -  Process-wide cache of decoded HDF5 chunks for lazily read MetaArrays
+Distributed under MIT/X11 license. See license.txt for more information.
+
+HDF5 keeps a small raw chunk cache for each open data set (1 MB by default; see the rdcc_*
+options of MetaArray.readFile). Arrays opened with readAllData=False and chunkCache=True
+instead keep decoded (decompressed) chunks in a single least-recently-used cache shared by
+every open array in the process, so that repeated random access to the same region does
+not read and decompress the same chunks again. The cache holds at most maxBytes of chunk
+data; use setCacheSize(), cacheStats() and clearCache() to manage it.
+"""
+
+import collections
+import itertools
+import os
+import threading
+
+import numpy as np
+
+from .parallel import _normalizeSelection
+
+
+class ChunkCache(object):
+    """Thread-safe LRU cache of decoded chunks, limited to *maxBytes* of chunk data.
+
+    Keys identify a file (by path, size and modification time), a data set and a chunk offset.
+    """
+
+    def __init__(self, maxBytes=256 * 1024**2):
+        self.maxBytes = maxBytes
+        self._chunks = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key, load):
+        """Return the chunk stored under *key*, calling load() to read it on a miss."""
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk is not None:
+                self._chunks.move_to_end(key)
+                self._stats["hits"] += 1
+                return chunk
+            self._stats["misses"] += 1
+        # read outside the lock so that other threads can use the cache meanwhile
+        chunk = load()
+        chunk.setflags(write=False)
+        with self._lock:
+            if key not in self._chunks and chunk.nbytes <= self.maxBytes:
+                self._chunks[key] = chunk
+                self._bytes += chunk.nbytes
+                self._evict()
+        return chunk
+
+    def _evict(self):
+        while self._bytes > self.maxBytes:
+            _, chunk = self._chunks.popitem(last=False)
+            self._bytes -= chunk.nbytes
+            self._stats["evictions"] += 1
+
+    def resize(self, maxBytes):
+        with self._lock:
+            self.maxBytes = maxBytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._chunks.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return a dict with hits, misses, evictions, hitRate, bytes, maxBytes and chunks."""
+        with self._lock:
+            stats = self._stats.copy()
+            stats["bytes"] = self._bytes
+            stats["maxBytes"] = self.maxBytes
+            stats["chunks"] = len(self._chunks)
+        total = stats["hits"] + stats["misses"]
+        stats["hitRate"] = stats["hits"] / total if total > 0 else 0.0
+        return stats
+
+    def resetStats(self):
+        with self._lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+
+# the cache shared by all MetaArrays in this process
+defaultCache = ChunkCache()
+
+
+def setCacheSize(maxBytes):
+    """Set the memory budget of the process-wide cache, evicting chunks if necessary."""
+    defaultCache.resize(maxBytes)
+
+
+def cacheStats():
+    """Return hit / miss statistics for the process-wide cache (see ChunkCache.stats)."""
+    return defaultCache.stats()
+
+
+def clearCache():
+    defaultCache.clear()
+
+
+def fileKey(fileName):
+    """Return the part of the cache key that identifies the current contents of *fileName*."""
+    stat = os.stat(fileName)
+    return (os.path.realpath(fileName), stat.st_size, stat.st_mtime_ns)
+
+
+def readCached(dataset, selection, key, cache=None):
+    """Read *selection* from the chunked HDF5 *dataset*, getting decoded chunks from *cache*.
+
+    *key* identifies the file (see fileKey). Selections made of ints and unit-step slices are
+    assembled from whole chunks; other selections, and data sets that are not chunked, are read
+    by h5py directly.
+    """
+    if cache is None:
+        cache = defaultCache
+    ranges = _normalizeSelection(selection, dataset.shape)
+    chunks = dataset.chunks
+    if ranges is None or chunks is None:
+        return dataset[selection]
+
+    shape = dataset.shape
+    out = np.empty(tuple(stop - start for start, stop, _ in ranges), dtype=dataset.dtype)
+    chunkRanges = [range((start // c) * c, stop, c) for (start, stop, _), c in zip(ranges, chunks)]
+    for offset in itertools.product(*chunkRanges):
+        region = tuple(slice(o, min(o + c, n)) for o, c, n in zip(offset, chunks, shape))
+        chunk = cache.get(key + (dataset.name, offset), lambda: dataset[region])
+        src = []
+        dst = []
+        for o, c, (start, stop, _) in zip(offset, chunks, ranges):
+            a = max(o, start)
+            b = min(o + c, stop)
+            src.append(slice(a - o, b - o))
+            dst.append(slice(a - start, b - start))
+        out[tuple(dst)] = chunk[tuple(src)]
+    return out[tuple(0 if isIndex else slice(None) for _, _, isIndex in ranges)]
@@ -0,0 +1,82 @@
+"""
+handles.py -  Per-thread HDF5 file handles for lazily read MetaArrays
+Distributed under MIT/X11 license. See license.txt for more information.
+
+A lazily read MetaArray normally reads through the single h5py.File it was opened with, so
+all threads share that handle, and closing it from one thread breaks reads in the others.
+Arrays opened with MetaArray(file=..., threadSafe=True) instead read through a HandlePool,
+which opens a separate handle for each thread that reads from the array and closes them
+all together, waiting for reads in progress to finish. (h5py still runs one HDF5 call at a
+time per process; for contiguous data sets threadSafe=True avoids HDF5 altogether by
+memory-mapping the data.)
+"""
+
+import contextlib
+import threading
+
+from . import h5py
+
+
+class HandlePool(object):
+    """Open one h5py.File for *fileName* per thread, on that thread's first read.
+
+    *mainFile* may be a handle that was already opened by the current thread. Extra keyword
+    arguments are passed to h5py.File.
+
+    Lifecycle: handles stay open until close() is called. close() may be called from any
+    thread; it prevents new reads, waits for reads in progress to finish, and then closes
+    every handle. Reads after close() raise an exception.
+    """
+
+    def __init__(self, fileName, datasetName="data", mainFile=None, **fileOpts):
+        self.fileName = fileName
+        self.datasetName = datasetName
+        self.fileOpts = fileOpts
+        self._local = threading.local()
+        self._files = []
+        self._active = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        if mainFile is not None:
+            self._local.file = mainFile
+            self._files.append(mainFile)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @contextlib.contextmanager
+    def dataset(self):
+        """Context manager yielding the data set as opened by the calling thread."""
+        with self._cond:
+            if self._closed:
+                raise Exception(f"Cannot read from closed file {self.fileName}")
+            self._active += 1
+        try:
+            f = getattr(self._local, "file", None)
+            if f is None:
+                f = h5py.File(self.fileName, "r", **self.fileOpts)
+                self._local.file = f
+                with self._cond:
+                    self._files.append(f)
+            yield f[self.datasetName]
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def numHandles(self):
+        """Return the number of handles opened so far."""
+        with self._cond:
+            return len(self._files)
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.wait_for(lambda: self._active == 0)
+            files = self._files
+            self._files = []
+        for f in files:
+            f.close()
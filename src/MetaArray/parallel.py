@@ -0,0 +1,178 @@
+"""
+parallel.py -  Multi-threaded compression and decompression of MetaArray HDF5 chunks
+Distributed under MIT/X11 license. See license.txt for more information.
+
+HDF5 applies compression filters one chunk at a time on a single core. For gzip-compressed
+data sets, the functions in this module do the (de)compression with zlib in a thread pool
+(zlib releases the GIL) and move the raw chunk bytes in and out of the file with h5py's
+direct chunk I/O, so the files remain readable by any HDF5 tool.
+"""
+
+import collections
+import itertools
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def canCompressChunks(dataset):
+    """Return True if the chunks of *dataset* use only filters that this module can apply (and undo) itself."""
+    return (
+        dataset.chunks is not None
+        and dataset.compression == "gzip"
+        and not dataset.shuffle
+        and not dataset.fletcher32
+        and dataset.scaleoffset is None
+    )
+
+
+def chunkOffsets(shape, chunks):
+    """Iterate over the offsets of all chunks covering an array of *shape*."""
+    ranges = [range(0, n, c) for n, c in zip(shape, chunks)]
+    return itertools.product(*ranges)
+
+
+def defaultWorkers():
+    return os.cpu_count() or 1
+
+
+def writeChunks(dataset, data, workers=None):
+    """Write *data* into the chunked, gzip-compressed HDF5 *dataset*, compressing chunks in parallel.
+
+    *dataset* must already have the shape and dtype of *data*. Chunks at the edges of the array are
+    padded to the full chunk shape, as HDF5 expects.
+    """
+    if not canCompressChunks(dataset):
+        raise ValueError("Parallel chunk writes are only supported for gzip-compressed data sets without other filters")
+    if data.shape != dataset.shape:
+        raise ValueError(f"Data shape {data.shape} does not match data set shape {dataset.shape}")
+    if workers is None:
+        workers = defaultWorkers()
+    data = np.asarray(data, dtype=dataset.dtype)
+    chunks = dataset.chunks
+    level = dataset.compression_opts
+    if level is None:
+        level = 4
+
+    def compress(offset):
+        block = data[tuple(slice(o, o + c) for o, c in zip(offset, chunks))]
+        if block.shape != chunks:
+            padded = np.zeros(chunks, dtype=data.dtype)
+            padded[tuple(slice(0, n) for n in block.shape)] = block
+            block = padded
+        return offset, zlib.compress(np.ascontiguousarray(block), level)
+
+    # h5py calls stay on this thread; only a bounded number of compressed chunks are held in memory
+    maxPending = workers * 4
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for offset in chunkOffsets(data.shape, chunks):
+            pending.append(pool.submit(compress, offset))
+            if len(pending) >= maxPending:
+                dataset.id.write_direct_chunk(*pending.popleft().result())
+        while pending:
+            dataset.id.write_direct_chunk(*pending.popleft().result())
+
+
+def _normalizeSelection(selection, shape):
+    # Return [(start, stop, isIndex), ...] for a selection made of ints and unit-step slices,
+    # or None if the selection can not be read chunk-by-chunk.
+    if not isinstance(selection, tuple):
+        selection = (selection,)
+    if len(selection) > len(shape):
+        return None
+    selection = selection + (slice(None),) * (len(shape) - len(selection))
+    ranges = []
+    for sel, n in zip(selection, shape):
+        if isinstance(sel, (int, np.integer)) and not isinstance(sel, bool):
+            i = int(sel)
+            if i < 0:
+                i += n
+            if not 0 <= i < n:
+                raise IndexError(f"index {sel} is out of bounds for axis with size {n}")
+            ranges.append((i, i + 1, True))
+        elif isinstance(sel, slice) and sel.step in (None, 1):
+            start, stop, _ = sel.indices(n)
+            ranges.append((start, max(start, stop), False))
+        else:
+            return None
+    return ranges
+
+
+def readChunks(dataset, selection=(), workers=None, out=None):
+    """Read *selection* from the chunked, gzip-compressed HDF5 *dataset*, decompressing chunks in parallel.
+
+    Raw chunks are read with read_direct_chunk and decompressed in a thread pool directly into
+    the output array. *selection* may contain ints and slices with step 1; if *out* is given,
+    it must have the shape of the selected region (including axes selected with an int) and
+    is filled in place.
+
+    Selections with other index types, and data sets with filters other than gzip, are read
+    by h5py as usual.
+    """
+    ranges = _normalizeSelection(selection, dataset.shape)
+    if ranges is None or not canCompressChunks(dataset):
+        data = dataset[selection]
+        if out is None:
+            return data
+        out[...] = data
+        return out
+    if workers is None:
+        workers = defaultWorkers()
+
+    chunks = dataset.chunks
+    boxShape = tuple(stop - start for start, stop, _ in ranges)
+    if out is None:
+        out = np.empty(boxShape, dtype=dataset.dtype)
+        box = out
+    else:
+        # view of out with the axes selected by an int restored
+        box = out[tuple(np.newaxis if isIndex else slice(None) for _, _, isIndex in ranges)]
+    fill = dataset.fillvalue
+
+    # offsets of the chunks overlapping the selection along each axis
+    chunkRanges = []
+    for (start, stop, _), c in zip(ranges, chunks):
+        chunkRanges.append(range((start // c) * c, stop, c))
+
+    def copyRegion(offset):
+        # return (slice into chunk, slice into output) for the overlap of this chunk and the selection
+        src = []
+        dst = []
+        for o, c, (start, stop, _) in zip(offset, chunks, ranges):
+            a = max(o, start)
+            b = min(o + c, stop)
+            src.append(slice(a - o, b - o))
+            dst.append(slice(a - start, b - start))
+        return tuple(src), tuple(dst)
+
+    def decompress(offset, filterMask, raw):
+        src, dst = copyRegion(offset)
+        if raw is None:
+            box[dst] = fill
+            return
+        if filterMask & 1 == 0:
+            raw = zlib.decompress(raw)
+        chunk = np.frombuffer(raw, dtype=dataset.dtype).reshape(chunks)
+        box[dst] = chunk[src]
+
+    maxPending = workers * 4
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = collections.deque()
+        for offset in itertools.product(*chunkRanges):
+            try:
+                filterMask, raw = dataset.id.read_direct_chunk(offset)
+            except (RuntimeError, KeyError):
+                # chunk was never written
+                filterMask, raw = 0, None
+            pending.append(pool.submit(decompress, offset, filterMask, raw))
+            if len(pending) >= maxPending:
+                pending.popleft().result()
+        while pending:
+            pending.popleft().result()
+
+    if out is not box:
+        return out
+    return box[tuple(0 if isIndex else slice(None) for _, _, isIndex in ranges)]
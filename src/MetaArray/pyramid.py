@@ -0,0 +1,224 @@
+"""
+pyramid.py -  Multi-resolution min / max / mean overviews stored in MetaArray HDF5 files
+Distributed under MIT/X11 license. See license.txt for more information.
+
+Drawing an overview of a long recording normally means reading all of it. Files written with
+MetaArray.write(fileName, pyramid=True) also store coarser versions of the data along one axis
+(the pyramid axis; by default the append axis, or the first axis with values):
+
+    /pyramid/<factor>/min, max, mean    data reduced over bins of <factor> samples
+    /pyramid/<factor>/values            the axis value at the start of each bin
+
+The default factors are 16, 256 and 4096. Blocks appended to the file along the pyramid axis
+(MetaArray.write with appendAxis, MetaArrayWriter) update the last partial bin of each level
+and add new bins. readOverview() picks the coarsest level that satisfies a requested
+resolution or number of points over a range, reading only that level.
+"""
+
+import numpy as np
+
+from . import MetaArray, h5py
+
+DEFAULT_FACTORS = (16, 256, 4096)
+STATS = ("min", "max", "mean")
+
+
+def _take(data, axis, sl):
+    return data[(slice(None),) * axis + (sl,)]
+
+
+def reduceBins(data, axis, factor):
+    """Return {'min', 'max', 'mean'} of *data* over consecutive bins of *factor* samples along
+    *axis* (the last bin may be shorter). NaN values are ignored by min and max."""
+    data = np.asarray(data)
+    n = data.shape[axis]
+    if n == 0:
+        shape = list(data.shape)
+        return {
+            "min": np.empty(shape, dtype=data.dtype),
+            "max": np.empty(shape, dtype=data.dtype),
+            "mean": np.empty(shape, dtype=np.float64),
+        }
+    starts = np.arange(0, n, factor)
+    counts = np.diff(np.append(starts, n))
+    countShape = [1] * data.ndim
+    countShape[axis] = len(starts)
+    return {
+        "min": np.fmin.reduceat(data, starts, axis=axis),
+        "max": np.fmax.reduceat(data, starts, axis=axis),
+        "mean": np.add.reduceat(data, starts, axis=axis, dtype=np.float64) / counts.reshape(countShape),
+    }
+
+
+def buildLevels(ma, factors=True, axis=None):
+    """Compute the pyramid levels of the MetaArray *ma*.
+
+    *factors* is a sequence of bin sizes, or True for DEFAULT_FACTORS. *axis* (name or index)
+    defaults to the first axis with values, or 0. Returns {'axis': index, 'levels': {factor:
+    {name: array}}} as used by writeLevels().
+    """
+    if factors is True:
+        factors = DEFAULT_FACTORS
+    factors = sorted(set(int(f) for f in factors))
+    if len(factors) == 0 or factors[0] < 2:
+        raise ValueError(f"Pyramid factors must be integers > 1 (got {factors})")
+    if axis is None:
+        withValues = [i for i in range(ma.ndim) if "values" in ma._info[i]]
+        axis = withValues[0] if withValues else 0
+    axis = ma._interpretAxis(axis)
+    data = ma.view(np.ndarray)
+    values = ma._info[axis].get("values")
+    levels = {}
+    for factor in factors:
+        level = reduceBins(data, axis, factor)
+        if values is not None:
+            level["values"] = np.asarray(values)[::factor]
+        levels[factor] = level
+    return {"axis": axis, "levels": levels}
+
+
+def writeLevels(f, pyramid, dsOpts):
+    """Store the levels returned by buildLevels() in the newly created HDF5 file *f*, using the
+    compression of the data set options *dsOpts*. The levels can be extended along the axis."""
+    ax = pyramid["axis"]
+    gr = f.create_group("pyramid")
+    gr.attrs["axis"] = ax
+    opts = {k: dsOpts[k] for k in ("compression", "compression_opts") if dsOpts.get(k) is not None}
+    for factor, level in pyramid["levels"].items():
+        lg = gr.create_group(str(factor))
+        lg.attrs["factor"] = factor
+        for name, arr in level.items():
+            axis = 0 if name == "values" else ax
+            maxShape = list(arr.shape)
+            maxShape[axis] = None
+            lg.create_dataset(name, data=arr, chunks=True, maxshape=tuple(maxShape), **opts)
+
+
+def checkAppend(f, ax):
+    """Raise ValueError if the open HDF5 file *f* has pyramid levels along an axis other than *ax*."""
+    gr = f.get("pyramid")
+    if gr is not None and int(gr.attrs["axis"]) != ax:
+        raise ValueError(
+            f"This file has pyramid levels along axis {int(gr.attrs['axis'])}; "
+            f"it can not be appended to along axis {ax}"
+        )
+
+
+def appendLevels(f, ax, data, values=None):
+    """Update the pyramid levels of the open HDF5 file *f* (if it has any) for *data*, which is
+    about to be appended along axis *ax*. *values* are the axis values of the new block."""
+    gr = f.get("pyramid")
+    if gr is None:
+        return
+    checkAppend(f, ax)
+    nOld = f["data"].shape[ax]
+    data = np.asarray(data)
+    n = data.shape[ax]
+    for name in gr:
+        lg = gr[name]
+        factor = int(lg.attrs["factor"])
+        nBins = lg["min"].shape[ax]
+        k = 0
+
+        # merge the start of the block into the last, partially filled bin
+        partial = nOld % factor
+        if partial > 0 and n > 0:
+            k = min(factor - partial, n)
+            head = _take(data, ax, slice(0, k))
+            last = (slice(None),) * ax + (slice(nBins - 1, nBins),)
+            lg["min"][last] = np.fmin(lg["min"][last], np.fmin.reduce(head, axis=ax, keepdims=True))
+            lg["max"][last] = np.fmax(lg["max"][last], np.fmax.reduce(head, axis=ax, keepdims=True))
+            total = lg["mean"][last] * partial + head.sum(axis=ax, keepdims=True, dtype=np.float64)
+            lg["mean"][last] = total / (partial + k)
+
+        # the rest of the block starts new bins
+        if k < n:
+            bins = reduceBins(_take(data, ax, slice(k, None)), ax, factor)
+            nNew = bins["min"].shape[ax]
+            new = (slice(None),) * ax + (slice(nBins, nBins + nNew),)
+            for stat in STATS:
+                lg[stat].resize(nBins + nNew, axis=ax)
+                lg[stat][new] = bins[stat]
+            if "values" in lg and values is not None:
+                lg["values"].resize(nBins + nNew, axis=0)
+                lg["values"][nBins:] = np.asarray(values)[k::factor]
+        if f.swmr_mode:
+            for ds in lg.values():
+                ds.flush()
+
+
+def levels(fileName):
+    """Return the sorted bin sizes of the pyramid levels stored in *fileName*."""
+    with h5py.File(fileName, "r") as f:
+        gr = f.get("pyramid")
+        return [] if gr is None else sorted(int(k) for k in gr)
+
+
+def _binRange(lg, factor, ax, hasValues, start, stop):
+    # index range of the bins of level *lg* overlapping [start, stop)
+    nBins = lg["min"].shape[ax]
+    if hasValues:
+        binStarts = lg["values"][:]
+        i0 = 0 if start is None else max(int(np.searchsorted(binStarts, start, side="right")) - 1, 0)
+        i1 = nBins if stop is None else int(np.searchsorted(binStarts, stop, side="left"))
+    else:
+        i0 = 0 if start is None else int(start) // factor
+        i1 = nBins if stop is None else -(-int(stop) // factor)
+    return i0, max(i0, min(i1, nBins))
+
+
+def readOverview(fileName, start=None, stop=None, resolution=None, minPoints=None, swmr=False):
+    """Return (factor, {'min': MetaArray, 'max': MetaArray, 'mean': MetaArray}) for the part of the
+    pyramid axis between *start* and *stop* (axis values, or indexes if the axis has no values).
+
+    The coarsest level is used whose bins are no wider than *resolution* (in axis units) and which
+    has at least *minPoints* bins in the range. The axis values of each bin are those of its first
+    sample. If no level qualifies, the data is read at full resolution and factor is 1 (min, max
+    and mean are then the same array).
+    """
+    with h5py.File(fileName, "r", **({"libver": "latest", "swmr": True} if swmr else {})) as f:
+        gr = f.get("pyramid")
+        if gr is None:
+            raise Exception(f"File {fileName} has no pyramid levels (write it with pyramid=True)")
+        ax = int(gr.attrs["axis"])
+        ndim = f["data"].ndim
+        n = f["data"].shape[ax]
+        axGroup = f["info"][str(ax)]
+        hasValues = "values" in axGroup
+        spacing = 1.0
+        if hasValues and n > 1:
+            vals = axGroup["values"]
+            spacing = float(vals[n - 1] - vals[0]) / (n - 1)
+
+        chosen = None
+        for factor in sorted((int(k) for k in gr), reverse=True):
+            if resolution is not None and factor * spacing > resolution:
+                continue
+            lg = gr[str(factor)]
+            i0, i1 = _binRange(lg, factor, ax, hasValues, start, stop)
+            if minPoints is not None and i1 - i0 < minPoints:
+                continue
+            chosen = (factor, lg, i0, i1)
+            break
+
+        if chosen is not None:
+            factor, lg, i0, i1 = chosen
+            info = [MetaArray.readHDF5Meta(f["info"][str(i)]) for i in range(ndim) if i != ax]
+            axInfo = MetaArray.readHDF5Meta(axGroup, skip=("values",))
+            if hasValues:
+                axInfo["values"] = lg["values"][i0:i1]
+            info.insert(ax, axInfo)
+            extra = MetaArray.readHDF5Meta(f["info"][str(ndim)]) if str(ndim) in f["info"] else {}
+            sl = (slice(None),) * ax + (slice(i0, i1),)
+            result = {}
+            for stat in STATS:
+                statInfo = info[:] + [dict(extra, pyramidFactor=factor, pyramidStat=stat)]
+                result[stat] = MetaArray(lg[stat][sl], info=statInfo)
+            return factor, result
+
+    # no level is fine enough; read the range at full resolution
+    if hasValues:
+        ma = MetaArray(file=fileName, select={ax: (start, stop)}, swmr=swmr)
+    else:
+        ma = MetaArray(file=fileName, select={ax: slice(start, stop)}, swmr=swmr)
+    return 1, {stat: ma for stat in STATS}
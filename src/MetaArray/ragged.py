@@ -0,0 +1,194 @@
+"""
+ragged.py -  Collections of MetaArrays that differ in length along one axis
+Distributed under MIT/X11 license. See license.txt for more information.
+
+Trials of different lengths are usually kept as a list of separate MetaArrays, padded to a
+common length, or written to separate files. A RaggedMetaArray instead concatenates them
+along the ragged axis into one buffer and keeps an array of offsets, so that:
+
+    * trial i is a view of the buffer (no copy), including its slice of the axis values
+    * per-trial reductions run as a single ufunc.reduceat() over the whole buffer
+    * the collection is written and read as one ordinary MetaArray file; the offsets and the
+      extra info of each trial are stored in the extra info of that file
+
+Files are read lazily with readAllData=False, in which case indexing a trial reads only that
+trial from disk.
+"""
+
+import numpy as np
+
+from . import MetaArray
+
+
+class RaggedMetaArray(object):
+    """A sequence of MetaArrays stored end-to-end along *axis* of the MetaArray *data*.
+
+    Trial i spans data[offsets[i]:offsets[i+1]] along *axis*; offsets has one entry more than
+    there are trials, starting at 0 and ending at data.shape[axis]. *trialInfo* is an optional
+    list of extra info dicts, one per trial. Use RaggedMetaArray.fromList() to build a
+    collection from separate arrays.
+    """
+
+    def __init__(self, data, offsets, axis=0, trialInfo=None):
+        if not (hasattr(data, "implements") and data.implements("MetaArray")):
+            data = MetaArray(data)
+        self._ma = data
+        self.axis = data._interpretAxis(axis)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if self.offsets.ndim != 1 or len(self.offsets) == 0:
+            raise ValueError("offsets must be a 1D array with one entry per trial plus one")
+        if self.offsets[0] != 0 or self.offsets[-1] != data.shape[self.axis] or np.any(np.diff(self.offsets) < 0):
+            raise ValueError(
+                f"offsets must increase from 0 to the length of axis {self.axis} ({data.shape[self.axis]})"
+            )
+        if trialInfo is not None and len(trialInfo) != len(self):
+            raise ValueError(f"trialInfo has {len(trialInfo)} entries for {len(self)} trials")
+        self.trialInfo = trialInfo
+
+    @staticmethod
+    def fromList(arrays, axis=0):
+        """Concatenate a list of MetaArrays along *axis* (name or index) into a new collection.
+
+        All arrays must have the same shape and axis info along the other axes; the info of the
+        first array is used for them. The extra info of each array is kept as its trial info.
+        """
+        if len(arrays) == 0:
+            raise ValueError("Can not build a ragged collection from an empty list")
+        first = arrays[0]
+        ax = first._interpretAxis(axis)
+        shape = list(first.shape)
+        for arr in arrays[1:]:
+            if arr.ndim != first.ndim or any(n != m for i, (n, m) in enumerate(zip(arr.shape, shape)) if i != ax):
+                raise ValueError(f"Array of shape {arr.shape} does not match {tuple(shape)} outside axis {ax}")
+        lengths = [arr.shape[ax] for arr in arrays]
+        offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(lengths)
+
+        data = np.concatenate([arr.view(np.ndarray) for arr in arrays], axis=ax)
+        info = first.infoCopy()
+        info[ax].pop("values", None)
+        if all("values" in arr._info[ax] for arr in arrays):
+            info[ax]["values"] = np.concatenate([np.asarray(arr._info[ax]["values"]) for arr in arrays])
+        info[-1] = {}
+        trialInfo = [dict(arr._info[-1]) for arr in arrays]
+        if not any(trialInfo):
+            trialInfo = None
+        return RaggedMetaArray(MetaArray(data, info=info), offsets, axis=ax, trialInfo=trialInfo)
+
+    @property
+    def data(self):
+        """The MetaArray holding all trials concatenated along the ragged axis."""
+        return self._ma
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def lengths(self):
+        """Return the length of each trial along the ragged axis."""
+        return np.diff(self.offsets)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, i):
+        """Return trial *i* as a MetaArray viewing the shared buffer, or a sub-collection for a slice."""
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                raise ValueError("Ragged collections can only be sliced with step 1")
+            stop = max(start, stop)
+            a, b = self.offsets[start], self.offsets[stop]
+            trialInfo = None if self.trialInfo is None else self.trialInfo[start:stop]
+            sub = self._ma[(slice(None),) * self.axis + (slice(int(a), int(b)),)]
+            return RaggedMetaArray(sub, self.offsets[start : stop + 1] - a, axis=self.axis, trialInfo=trialInfo)
+
+        n = len(self)
+        if i < -n or i >= n:
+            raise IndexError(f"Trial index {i} is out of range for {n} trials")
+        i = int(i) % n
+        sl = slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+        index = (slice(None),) * self.axis + (sl,) + (slice(None),) * (self._ma.ndim - self.axis - 1)
+        info = list(self._ma._info)
+        ax = dict(info[self.axis])
+        if "values" in ax:
+            ax["values"] = ax["values"][sl]
+        info[self.axis] = ax
+        info[-1] = {} if self.trialInfo is None else dict(self.trialInfo[i])
+        return MetaArray(self._ma._read(index), info=info)
+
+    def reduce(self, ufunc=np.add):
+        """Apply *ufunc*.reduceat() over each trial along the ragged axis.
+
+        Returns a MetaArray with the ragged axis replaced by a 'Trial' axis. Empty trials get the
+        identity of *ufunc* (eg. 0 for np.add), or NaN if it has none.
+        """
+        data = self._ma.view(np.ndarray)
+        nonEmpty = self.lengths() > 0
+        if nonEmpty.all():
+            return self._trialArray(ufunc.reduceat(data, self.offsets[:-1], axis=self.axis))
+
+        # reduceat() can not express empty ranges, so reduce only the non-empty trials (each of
+        # which then ends where the next non-empty trial starts) and fill in the rest
+        fill = np.nan if ufunc.identity is None else ufunc.identity
+        shape = list(data.shape)
+        shape[self.axis] = len(self)
+        reduced = ufunc.reduceat(data, self.offsets[:-1][nonEmpty], axis=self.axis) if nonEmpty.any() else None
+        dtype = data.dtype if reduced is None else reduced.dtype
+        if ufunc.identity is None:
+            dtype = np.result_type(dtype, np.float64)
+        out = np.full(shape, fill, dtype=dtype)
+        if reduced is not None:
+            out[(slice(None),) * self.axis + (nonEmpty,)] = reduced
+        return self._trialArray(out)
+
+    def _trialArray(self, data):
+        info = [dict(ax) for ax in self._ma._info[:-1]] + [{}]
+        info[self.axis] = {"name": "Trial"}
+        return MetaArray(data, info=info)
+
+    def sum(self):
+        return self.reduce(np.add)
+
+    def min(self):
+        return self.reduce(np.minimum)
+
+    def max(self):
+        return self.reduce(np.maximum)
+
+    def mean(self):
+        """Return the mean of each trial along the ragged axis (NaN for empty trials)."""
+        lengths = self.lengths().astype(float)
+        shape = [1] * self._ma.ndim
+        shape[self.axis] = len(self)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            data = self.sum().view(np.ndarray) / lengths.reshape(shape)
+        return self._trialArray(data)
+
+    def write(self, fileName, **opts):
+        """Write the collection to *fileName* as one MetaArray (see MetaArray.write for *opts*).
+
+        The offsets, the ragged axis and the trial info are stored in the extra info of the file,
+        so that RaggedMetaArray.readFile() can restore the collection.
+        """
+        info = list(self._ma._info)
+        extra = dict(info[-1])
+        extra["raggedAxis"] = self.axis
+        extra["raggedOffsets"] = self.offsets
+        if self.trialInfo is not None:
+            extra["trialInfo"] = list(self.trialInfo)
+        info[-1] = extra
+        MetaArray(self._ma.view(np.ndarray), info=info).write(fileName, **opts)
+
+    @staticmethod
+    def readFile(fileName, **kwds):
+        """Read a collection written by write(). *kwds* are passed to MetaArray(file=...);
+        with readAllData=False, only the trials that are indexed are read from disk."""
+        ma = MetaArray(file=fileName, **kwds)
+        extra = ma._info[-1]
+        if "raggedOffsets" not in extra:
+            raise Exception(f"File {fileName} does not hold a ragged collection")
+        axis = int(extra.pop("raggedAxis"))
+        offsets = np.asarray(extra.pop("raggedOffsets"))
+        trialInfo = extra.pop("trialInfo", None)
+        return RaggedMetaArray(ma, offsets, axis=axis, trialInfo=trialInfo)
@@ -0,0 +1,114 @@
+"""
+readpool.py -  Reading many MetaArray files in parallel worker processes
+Distributed under MIT/X11 license. See license.txt for more information.
+
+h5py serializes all calls into the HDF5 library behind a global lock, so reading several
+files from threads is no faster than reading them one after another. A ReaderPool keeps a
+set of worker processes, each with its own copy of the HDF5 library, that read files
+(including decompression) in parallel. Each result is placed in a shared memory segment
+(see MetaArray.shared) that the calling process attaches to, so the data is not pickled
+and copied back through a pipe.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from . import MetaArray
+from .shared import SharedMetaArray
+
+
+def _isHDF5(fileName):
+    with open(fileName, "rb") as fd:
+        return fd.read(8) == b"\x89HDF\r\n\x1a\n"
+
+
+def _readToShared(fileName, subset, kwds):
+    # Runs in a worker process: read (part of) a file into a new segment and hand it to the caller
+    if subset is not None and _isHDF5(fileName):
+        # open lazily so that only the selected region is read
+        kwds = dict(kwds, readAllData=False)
+    src = MetaArray(file=fileName, **kwds)
+    try:
+        ma = src if subset is None else src[subset]
+        handle = SharedMetaArray.create(ma)
+    finally:
+        openFile = getattr(src, "_openFile", None)
+        if openFile is not None:
+            openFile.close()
+    handle.release()
+    return handle
+
+
+class ReaderPool(object):
+    """A pool of worker processes that read MetaArray files in parallel.
+
+    The worker processes are started on first use and reused by later calls until close()
+    is called. *workers* defaults to the number of CPUs, and *mpContext* may be a
+    multiprocessing context to start the workers with (eg. multiprocessing.get_context('spawn')).
+
+    Example::
+
+        with ReaderPool(workers=8) as pool:
+            arrays = pool.readMany(fileNames, subset=(slice(0, 10000),))
+    """
+
+    def __init__(self, workers=None, mpContext=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.mpContext = mpContext
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def readMany(self, fileNames, subset=None, **kwds):
+        """Read each of *fileNames* in a worker process and return a list of MetaArrays in the same order.
+
+        If *subset* is given, only that region of each array (any index accepted by
+        MetaArray.__getitem__) is read and returned; HDF5 files are opened lazily so that only
+        the selected data is read from disk. Extra keyword arguments are passed to
+        MetaArray.readFile in the workers. The returned arrays view shared memory, which is
+        freed when they are released.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mpContext)
+        futures = [self._executor.submit(_readToShared, fileName, subset, kwds) for fileName in fileNames]
+        results = []
+        try:
+            for fut in futures:
+                results.append(fut.result().attach(unlink=True))
+        except Exception:
+            # take over any segments that were already created so they are not left behind
+            for fut in futures[len(results) :]:
+                try:
+                    fut.result().attach(unlink=True)
+                except Exception:
+                    pass
+            raise
+        return results
+
+    def close(self):
+        """Shut down the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_defaultPool = None
+
+
+def readMany(fileNames, subset=None, workers=None, **kwds):
+    """Read *fileNames* in parallel using a process pool that is kept for later calls (see ReaderPool.readMany).
+
+    The pool is restarted if *workers* differs from that of the existing pool.
+    """
+    global _defaultPool
+    workers = workers or os.cpu_count() or 1
+    if _defaultPool is not None and _defaultPool.workers != workers:
+        _defaultPool.close()
+        _defaultPool = None
+    if _defaultPool is None:
+        _defaultPool = ReaderPool(workers=workers)
+    return _defaultPool.readMany(fileNames, subset=subset, **kwds)
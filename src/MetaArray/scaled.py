@@ -0,0 +1,144 @@
+"""
+scaled.py -  Scaled-integer (quantized) storage of MetaArray data
+Distributed under MIT/X11 license. See license.txt for more information.
+
+Data that comes from a digitizer has only as many distinct values as the digitizer has
+levels, so storing it as float64 wastes space and read bandwidth. With
+MetaArray.write(fileName, quantize='int16'), each column is stored as integers together with a
+scale and offset kept in its 'cols' entry:
+
+    value = raw * col['scale'] + col['offset']
+
+Columns whose info already holds a 'scale' (eg. the gain of a digitizer channel) keep it;
+otherwise the scale and offset map the range of the column onto the range of the integer type.
+Blocks appended later (MetaArray.write with appendAxis, MetaArrayWriter) are encoded with the
+scales stored in the file, and values outside the representable range are clipped.
+
+The column axis is marked with 'encoding': 'scaleOffset'. Reading the file decodes the values
+to float64 (lazily read arrays decode each block as it is read); MetaArray(file=..., raw=True)
+returns the stored integers instead, with the scales and offsets in the column info.
+"""
+
+import numpy as np
+
+ENCODING = "scaleOffset"
+
+
+def columnAxis(info, ndim):
+    """Return the index of the axis holding the scales and offsets, or None if *info* is not encoded."""
+    for i, ax in enumerate(info[:ndim]):
+        if ax.get("encoding") == ENCODING and "cols" in ax:
+            return i
+    return None
+
+
+def scaling(info, shape, dtype):
+    """Return (scale, offset) arrays that broadcast against data of *shape*, or None if data of
+    *dtype* with this *info* does not need to be decoded."""
+    if not np.issubdtype(dtype, np.integer):
+        return None
+    ax = columnAxis(info, len(shape))
+    if ax is None:
+        return None
+    cols = info[ax]["cols"]
+    bshape = [1] * len(shape)
+    bshape[ax] = len(cols)
+    scale = np.array([c.get("scale", 1.0) for c in cols], dtype=np.float64).reshape(bshape)
+    offset = np.array([c.get("offset", 0.0) for c in cols], dtype=np.float64).reshape(bshape)
+    return scale, offset
+
+
+def decodeData(raw, scale, offset):
+    return raw * scale + offset
+
+
+def encodeData(data, scale, offset, dtype):
+    """Convert *data* to integers of *dtype*; values outside the range of *dtype* are clipped."""
+    dtype = np.dtype(dtype)
+    limits = np.iinfo(dtype)
+    data = np.asarray(data)
+    if np.issubdtype(data.dtype, np.integer):
+        return data.astype(dtype)
+    if np.isnan(data).any():
+        raise ValueError("NaN values can not be stored as scaled integers")
+    raw = np.rint((data - offset) / scale)
+    return np.clip(raw, limits.min, limits.max).astype(dtype)
+
+
+def encode(ma, dtype="int16", axis=None):
+    """Return a copy of the MetaArray *ma* holding integers of *dtype* and the per-column scale and
+    offset needed to decode them.
+
+    *axis* (name or index) is the column axis; by default the first axis with 'cols'. Columns
+    whose info already has a 'scale' (eg. the gain of a digitizer channel) keep it, along with
+    their 'offset' (default 0); for the others, the scale and offset map the range of the column's
+    values onto the full range of *dtype*. Integer data is taken to be raw values already, and
+    columns without a scale get scale 1 and offset 0.
+    """
+    from . import MetaArray
+
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.integer):
+        raise ValueError(f"Scaled values must be stored as an integer dtype (got {dtype})")
+    if axis is None:
+        axes = [i for i in range(ma.ndim) if "cols" in ma._info[i]]
+        if len(axes) == 0:
+            raise ValueError("Scaled-integer storage requires an axis with columns")
+        axis = axes[0]
+    axis = ma._interpretAxis(axis)
+    if "cols" not in ma._info[axis]:
+        raise ValueError(f"Axis {axis} has no columns to store scales and offsets in")
+
+    data = ma.view(np.ndarray)
+    isRaw = np.issubdtype(data.dtype, np.integer)
+    limits = np.iinfo(dtype)
+    info = ma.infoCopy()
+    cols = info[axis]["cols"]
+    for j, col in enumerate(cols):
+        if "scale" in col:
+            col.setdefault("offset", 0.0)
+            continue
+        if isRaw:
+            col["scale"] = 1.0
+            col["offset"] = 0.0
+            continue
+        values = np.take(data, j, axis=axis)
+        if values.size == 0:
+            lo = hi = 0.0
+        else:
+            lo = float(np.nanmin(values))
+            hi = float(np.nanmax(values))
+        scale = (hi - lo) / (float(limits.max) - float(limits.min)) if hi > lo else 1.0
+        col["scale"] = scale
+        col["offset"] = lo - limits.min * scale if hi > lo else lo
+    info[axis]["encoding"] = ENCODING
+
+    scale, offset = scaling(info, data.shape, dtype)
+    return MetaArray(encodeData(data, scale, offset, dtype), info=info)
+
+
+def decode(ma):
+    """Return the values of a MetaArray read with raw=True (or returned by encode()) as float64."""
+    from . import MetaArray
+
+    sc = scaling(ma._info, ma.shape, ma.dtype)
+    if sc is None:
+        return ma
+    return MetaArray(decodeData(ma.view(np.ndarray), *sc), info=ma.infoCopy())
+
+
+def fileScaling(f):
+    """Return (scale, offset) for the data set of an open HDF5 file holding scaled integers, or None."""
+    from . import MetaArray
+
+    dataset = f["data"]
+    if not np.issubdtype(dataset.dtype, np.integer):
+        return None
+    info = f["info"]
+    for i in range(dataset.ndim):
+        gr = info.get(str(i))
+        if gr is not None and "encoding" in gr.attrs:
+            axInfo = [{}] * dataset.ndim
+            axInfo[i] = MetaArray.readHDF5Meta(gr)
+            return scaling(axInfo, dataset.shape, dataset.dtype)
+    return None
@@ -0,0 +1,164 @@
+"""
+shared.py -  MetaArrays in named shared memory segments
+Distributed under MIT/X11 license. See license.txt for more information.
+
+MetaArray.toShared() copies an array into a segment created with multiprocessing.shared_memory.
+The segment holds a small header with the pickled shape, dtype and axis info followed by the
+data, so any process that knows the segment's name can attach to it with
+MetaArray.fromShared() and get a MetaArray that views the shared data without copying.
+"""
+
+import os
+import pickle
+import struct
+import sys
+
+import numpy as np
+from multiprocessing import shared_memory
+
+from . import MetaArray
+
+# segment layout: 8-byte header length, pickled header, padding, data
+_LENGTH = struct.Struct("<Q")
+_ALIGN = 64
+
+
+def _attach(name, track=False):
+    # Attach to an existing segment. Unless *track* is True, this process's resource tracker is
+    # kept out of it, so that the segment is not removed when this process exits (the creating
+    # process is responsible for removing it).
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=track)
+    shm = shared_memory.SharedMemory(name=name)
+    if not track:
+        _untrack(shm)
+    return shm
+
+
+def _untrack(shm):
+    # stop this process's resource tracker from removing the segment when the process exits
+    if os.name == "posix":
+        from multiprocessing import resource_tracker
+
+        resource_tracker.unregister(shm._name, "shared_memory")
+
+
+class _SharedBuffer(object):
+    # Base object for arrays viewing a segment. It keeps the SharedMemory open for as long as
+    # any array (or slice) uses it, and closes it once the last one is gone.
+    def __init__(self, shm, offset, shape, dtype):
+        self._view = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+        self.__array_interface__ = self._view.__array_interface__
+        self._shm = shm
+
+    def __del__(self):
+        self.__array_interface__ = None
+        self._view = None  # release the buffer export before closing
+        try:
+            self._shm.close()
+        except Exception:
+            pass
+
+
+class SharedMetaArray(object):
+    """A MetaArray copied into a named shared memory segment, as returned by MetaArray.toShared().
+
+    This object owns the segment: the segment is removed by unlink() (or on leaving a ``with``
+    block), and processes that are still attached keep their mapping until they release it.
+    Only the segment name is sent when this object is pickled, so it can be passed to worker
+    processes, which call MetaArray.fromShared(handle) (or handle.attach()) to view the data.
+    """
+
+    def __init__(self, name, owner=False):
+        self.name = name
+        self._owner = owner
+        self._shm = None
+
+    @classmethod
+    def create(cls, ma):
+        data = ma.asarray()
+        if data.dtype.hasobject:
+            raise Exception("Arrays with dtype=object can not be placed in shared memory")
+        header = pickle.dumps((data.shape, data.dtype.str, ma.infoCopy()), protocol=pickle.HIGHEST_PROTOCOL)
+        offset = _dataOffset(len(header))
+        shm = shared_memory.SharedMemory(create=True, size=max(offset + data.nbytes, 1))
+        try:
+            shm.buf[: _LENGTH.size] = _LENGTH.pack(len(header))
+            shm.buf[_LENGTH.size : _LENGTH.size + len(header)] = header
+            dest = np.ndarray(data.shape, dtype=data.dtype, buffer=shm.buf, offset=offset)
+            dest[...] = data
+            del dest
+        except Exception:
+            shm.close()
+            shm.unlink()
+            raise
+        handle = cls(shm.name, owner=True)
+        handle._shm = shm
+        return handle
+
+    def __del__(self):
+        if self._owner and self._shm is not None:
+            self.unlink()
+
+    def __reduce__(self):
+        return (SharedMetaArray, (self.name,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.unlink()
+
+    def __repr__(self):
+        return f"<SharedMetaArray {self.name!r}>"
+
+    def attach(self, unlink=False):
+        """Return a MetaArray viewing the shared data. Changes to its data are seen by all processes.
+
+        If *unlink* is True, the segment is removed as soon as it is attached, so that its memory
+        is freed once the returned array (and any slices of it) are released. This is how a
+        process takes over a segment that was handed to it with release().
+        """
+        shm = _attach(self.name, track=unlink)
+        try:
+            (length,) = _LENGTH.unpack(bytes(shm.buf[: _LENGTH.size]))
+            shape, dtype, info = pickle.loads(bytes(shm.buf[_LENGTH.size : _LENGTH.size + length]))
+            buf = _SharedBuffer(shm, _dataOffset(length), shape, np.dtype(dtype))
+        except Exception:
+            shm.close()
+            raise
+        if unlink:
+            shm.unlink()
+        return MetaArray(np.asarray(buf), info=info)
+
+    def release(self):
+        """Close this process's mapping without removing the segment, giving up ownership.
+
+        The process that receives the handle must then attach with unlink=True.
+        """
+        if self._shm is not None:
+            _untrack(self._shm)
+            self._shm.close()
+            self._shm = None
+        self._owner = False
+
+    def unlink(self):
+        """Remove the segment. Only the process that created it may do this."""
+        if not self._owner:
+            raise Exception("Only the process that created a shared MetaArray can unlink it.")
+        if self._shm is None:
+            return
+        shm = self._shm
+        self._shm = None
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            # already removed by another process
+            if sys.version_info < (3, 13):
+                _untrack(shm)
+
+
+def _dataOffset(headerLength):
+    n = _LENGTH.size + headerLength
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
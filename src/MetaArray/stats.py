@@ -0,0 +1,124 @@
+"""
+stats.py -  Summary statistics of MetaArray data, computed at write time
+Distributed under MIT/X11 license. See license.txt for more information.
+
+MetaArray.write(fileName, stats=True) stores the min, max, mean, count (of non-NaN values) and
+nanCount of each column in its 'cols' entry under 'stats' (or, for arrays without columns, of
+the whole array in the extra info). Blocks appended to the file later (MetaArray.write with
+appendAxis, MetaArrayWriter) update the stored values in place. Because they are part of the
+meta info, the statistics can be read with readAllData=False (see MetaArray.summaryStats)
+for autoscaling or filtering without reading any data. They describe the whole file, not
+parts of it that were read with select or sliced afterwards.
+"""
+
+import numpy as np
+
+STAT_KEYS = ("min", "max", "mean", "count", "nanCount")
+
+
+def statsAxis(info, ndim):
+    """Return the axis whose columns hold statistics (the first axis with columns), or None."""
+    for i in range(ndim):
+        if "cols" in info[i]:
+            return i
+    return None
+
+
+def computeStats(data, axis=None):
+    """Return a list with a stats dict for each index along *axis* of *data*, or a single dict
+    for the whole array if *axis* is None."""
+    data = np.asarray(data)
+    axes = tuple(i for i in range(data.ndim) if i != axis)
+    n = int(np.prod([data.shape[i] for i in axes]))
+    nCols = 1 if axis is None else data.shape[axis]
+    if n == 0:
+        empty = np.full(nCols, np.nan)
+        mins, maxs, sums, nans = empty, empty, np.zeros(nCols), np.zeros(nCols, dtype=int)
+    else:
+        # fmin / fmax ignore NaN unless every value is NaN
+        mins = np.atleast_1d(np.fmin.reduce(data, axis=axes))
+        maxs = np.atleast_1d(np.fmax.reduce(data, axis=axes))
+        if data.dtype.kind in "fc":
+            nans = np.atleast_1d(np.isnan(data).sum(axis=axes))
+            sums = np.atleast_1d(np.nansum(data, axis=axes, dtype=np.float64))
+        else:
+            nans = np.zeros(nCols, dtype=int)
+            sums = np.atleast_1d(data.sum(axis=axes, dtype=np.float64))
+    stats = []
+    for j in range(nCols):
+        count = n - int(nans[j])
+        stats.append(
+            {
+                "min": float(mins[j]),
+                "max": float(maxs[j]),
+                "mean": float(sums[j]) / count if count > 0 else float("nan"),
+                "count": count,
+                "nanCount": int(nans[j]),
+            }
+        )
+    return stats[0] if axis is None else stats
+
+
+def mergeStats(a, b):
+    """Return the stats of the values described by the two stats dicts *a* and *b* together."""
+    count = a["count"] + b["count"]
+    if a["count"] == 0:
+        mean = b["mean"]
+    elif b["count"] == 0:
+        mean = a["mean"]
+    else:
+        mean = (a["mean"] * a["count"] + b["mean"] * b["count"]) / count
+    return {
+        "min": float(np.fmin(a["min"], b["min"])),
+        "max": float(np.fmax(a["max"], b["max"])),
+        "mean": float(mean),
+        "count": int(count),
+        "nanCount": int(a["nanCount"] + b["nanCount"]),
+    }
+
+
+def withStats(ma):
+    """Return a copy of the info of *ma* with the statistics of its data added."""
+    info = ma.infoCopy()
+    ax = statsAxis(info, ma.ndim)
+    stats = computeStats(ma.view(np.ndarray), ax)
+    if ax is None:
+        info[-1]["stats"] = stats
+    else:
+        for col, colStats in zip(info[ax]["cols"], stats):
+            col["stats"] = colStats
+    return info
+
+
+def _fileStatsGroups(f):
+    # Return (axis, [stats group per column]) for an open HDF5 file holding statistics, or None
+    info = f["info"]
+    ndim = f["data"].ndim
+    for i in range(ndim):
+        axInfo = info.get(str(i))
+        if axInfo is not None and "cols" in axInfo:
+            cols = axInfo["cols"]
+            groups = [cols[str(j)].get("stats") for j in range(len(cols))]
+            if len(groups) == 0 or any(g is None for g in groups):
+                return None
+            return i, groups
+    extra = info.get(str(ndim))
+    if extra is not None and "stats" in extra:
+        return None, [extra["stats"]]
+    return None
+
+
+def updateFile(f, data):
+    """Merge the statistics of *data*, about to be appended to the open HDF5 file *f*, into the
+    statistics stored in the file (if it has any). Existing attributes are modified in place."""
+    found = _fileStatsGroups(f)
+    if found is None:
+        return
+    ax, groups = found
+    new = computeStats(data, ax)
+    if ax is None:
+        new = [new]
+    for gr, b in zip(groups, new):
+        a = {k: gr.attrs[k] for k in STAT_KEYS}
+        for k, v in mergeStats(a, b).items():
+            gr.attrs.modify(k, v)
@@ -0,0 +1,268 @@
+"""
+store.py -  Many MetaArrays in one HDF5 file, with shared meta info stored once
+Distributed under MIT/X11 license. See license.txt for more information.
+
+Writing one file per array (eg. one per trial) costs a file's worth of HDF5 overhead and a
+full copy of the meta info for every array, even when all of them share the same axes. A
+MetaArrayStore keeps any number of arrays in a single HDF5 file, each under its own key:
+
+    /arrays/<key>/data        the array data
+    /arrays/<key>/<digest>    hard links to the meta info used by the array
+    /meta/<digest>            axis descriptors, column tables and extra info dicts
+
+Each piece of meta info is stored once under the digest of its contents, and every array
+refers to the pieces it uses (attribute 'meta' of its group). The hard links let HDF5
+count the arrays using each piece, so replacing or deleting an array only checks its own
+pieces. Listing keys and reading the meta info of an array never reads array data, and
+decoded meta info is cached, so reading the info of many arrays that share their axes only
+decodes those axes once.
+"""
+
+import ast
+import copy
+import hashlib
+
+import numpy as np
+
+from . import MetaArray, HAVE_HDF5, h5py
+
+
+def _updateDigest(h, obj):
+    # feed a canonical description of a meta info object (as stored by writeHDF5Meta) to *h*
+    if isinstance(obj, np.ndarray):
+        h.update(b"a%s%r" % (obj.dtype.str.encode(), obj.shape))
+        if obj.dtype == object:
+            h.update(repr(obj.tolist()).encode())
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        h.update(b"d%d" % len(obj))
+        for k, v in obj.items():
+            h.update(repr(k).encode())
+            _updateDigest(h, v)
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"%s%d" % (type(obj).__name__.encode(), len(obj)))
+        for v in obj:
+            _updateDigest(h, v)
+    else:
+        h.update(b"v" + repr(obj).encode())
+
+
+def _digests(refs):
+    # the distinct digests in a list of (descDigest, colsDigest or None) references
+    return {d for pair in refs for d in pair if d is not None}
+
+
+def metaDigest(obj):
+    """Return the hex digest identifying the meta info object *obj* (a dict or list) in a store."""
+    h = hashlib.sha1()
+    _updateDigest(h, obj)
+    return h.hexdigest()
+
+
+class MetaArrayStore(object):
+    """A dict-like collection of MetaArrays stored in one HDF5 file.
+
+    *mode* is passed to h5py.File: 'a' (default) opens or creates the file, 'r' opens it read-only
+    and 'w' replaces any existing file.
+
+    Example::
+
+        with MetaArrayStore('trials.h5') as store:
+            for i, trial in enumerate(trials):
+                store[f'trial{i:05d}'] = trial
+            for key in store:
+                print(key, store.shape(key), store.info(key)[-1])
+            ma = store['trial00012']
+
+    Keys are strings that do not contain '/'. Arrays read with readAllData=False (see read())
+    read from the store's file handle, so they can only be used until the store is closed.
+    """
+
+    version = "1.0"
+
+    def __init__(self, fileName, mode="a"):
+        if not HAVE_HDF5:
+            raise Exception("h5py is required for MetaArrayStore, but it could not be imported.")
+        self.fileName = fileName
+        self._file = h5py.File(fileName, mode)
+        self._metaCache = {}
+        if "MetaArrayStore" not in self._file.attrs:
+            if mode == "r":
+                self.close()
+                raise Exception(f"File {fileName} is not a MetaArrayStore")
+            self._file.attrs["MetaArrayStore"] = self.version
+            self._file.create_group("arrays")
+            self._file.create_group("meta")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._metaCache = {}
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def flush(self):
+        self._file.flush()
+
+    def _arrays(self):
+        if self._file is None:
+            raise Exception(f"Store {self.fileName} is closed")
+        return self._file["arrays"]
+
+    def _group(self, key):
+        arrays = self._arrays()
+        if not isinstance(key, str) or key not in arrays:
+            raise KeyError(key)
+        return arrays[key]
+
+    def keys(self):
+        """Return the keys of all arrays in the store (sorted by name, as HDF5 lists them)."""
+        return list(self._arrays().keys())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self._arrays())
+
+    def __contains__(self, key):
+        return isinstance(key, str) and key in self._arrays()
+
+    def __getitem__(self, key):
+        return self.read(key)
+
+    def __setitem__(self, key, ma):
+        self.write(key, ma)
+
+    def __delitem__(self, key):
+        self.delete(key)
+
+    def write(self, key, ma, **opts):
+        """Store the MetaArray *ma* under *key*, replacing any array already stored there.
+
+        *opts* are the data set options accepted by MetaArray.write (compression, chunks,
+        chunkBytes, access, accessAxis, mappable); they apply to the array data. Meta info that
+        is already in the store is not written again.
+        """
+        if not isinstance(key, str) or key == "" or "/" in key:
+            raise ValueError(f"Store keys must be non-empty strings without '/' (got {key!r})")
+        if not (hasattr(ma, "implements") and ma.implements("MetaArray")):
+            ma = MetaArray(ma)
+        arrays = self._arrays()
+        old = None
+        if key in arrays:
+            old = self._unlinkMeta(arrays[key])
+            del arrays[key]
+
+        dsOpts, _ = ma._hdf5DatasetOptions(opts)
+        dsOpts.pop("maxshape", None)
+        metaOpts = dsOpts.copy()
+        if isinstance(metaOpts["chunks"], tuple):
+            metaOpts["chunks"] = True
+
+        refs = []
+        for i, ax in enumerate(ma._info):
+            if i < ma.ndim and "cols" in ax:
+                desc = {k: v for k, v in ax.items() if k != "cols"}
+                refs.append((self._writeMeta(ma, desc, metaOpts), self._writeMeta(ma, ax["cols"], metaOpts)))
+            else:
+                refs.append((self._writeMeta(ma, ax, metaOpts), None))
+
+        gr = arrays.create_group(key)
+        gr.attrs["meta"] = repr(refs)
+        meta = self._file["meta"]
+        for digest in _digests(refs):
+            gr[digest] = meta[digest]
+        gr.create_dataset("data", data=ma.view(np.ndarray), **dsOpts)
+        if old is not None:
+            self._pruneMeta(old)
+
+    def _writeMeta(self, ma, obj, dsOpts):
+        # store one piece of meta info unless an identical one is already stored; return its digest
+        digest = metaDigest(obj)
+        meta = self._file["meta"]
+        if digest not in meta:
+            ma.writeHDF5Meta(meta, digest, obj, **dsOpts.copy())
+        return digest
+
+    def _readMeta(self, digest):
+        obj = self._metaCache.get(digest)
+        if obj is None:
+            obj = MetaArray.readHDF5Meta(self._file["meta"][digest])
+            self._metaCache[digest] = obj
+        return obj
+
+    def _refs(self, key):
+        return ast.literal_eval(self._group(key).attrs["meta"])
+
+    def info(self, key):
+        """Return the meta info list of the array stored under *key*, without reading its data."""
+        info = []
+        for desc, cols in self._refs(key):
+            ax = copy.deepcopy(self._readMeta(desc))
+            if cols is not None:
+                ax["cols"] = copy.deepcopy(self._readMeta(cols))
+            info.append(ax)
+        return info
+
+    def shape(self, key):
+        return tuple(self._group(key)["data"].shape)
+
+    def dtype(self, key):
+        return self._group(key)["data"].dtype
+
+    def read(self, key, readAllData=True, select=None):
+        """Return the MetaArray stored under *key*.
+
+        *select* reads only part of the array, as for MetaArray.readFile. With readAllData=False
+        the returned array reads its data from the store's file on demand.
+        """
+        dataset = self._group(key)["data"]
+        info = self.info(key)
+        if select is not None:
+            ma = MetaArray(np.broadcast_to(np.zeros((), dtype=dataset.dtype), dataset.shape), info=info)
+            ma._setSelection(dataset, info, MetaArray._resolveSelect(info, dataset.shape, select))
+            ma._data = np.asarray(ma._data)
+            return ma
+        if readAllData:
+            return MetaArray(dataset[()], info=info)
+        ma = MetaArray(np.broadcast_to(np.zeros((), dtype=dataset.dtype), dataset.shape), info=info)
+        ma._data = dataset
+        ma._isHDF = True
+        return ma
+
+    def delete(self, key):
+        """Remove the array stored under *key*, and any meta info no other array refers to."""
+        digests = self._unlinkMeta(self._group(key))
+        del self._arrays()[key]
+        self._pruneMeta(digests)
+
+    def _unlinkMeta(self, gr):
+        # remove the links from the array group *gr* to its meta info; return the digests it used
+        digests = _digests(ast.literal_eval(gr.attrs["meta"]))
+        for digest in digests:
+            if digest in gr:
+                del gr[digest]
+        return digests
+
+    def _pruneMeta(self, digests):
+        # remove the pieces of meta info in *digests* that are no longer linked from any array
+        meta = self._file["meta"]
+        for digest in digests:
+            if digest in meta and h5py.h5o.get_info(meta[digest].id).rc <= 1:
+                del meta[digest]
+                self._metaCache.pop(digest, None)
+
+    def numMeta(self):
+        """Return the number of distinct pieces of meta info stored."""
+        return len(self._file["meta"])
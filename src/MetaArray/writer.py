@@ -0,0 +1,332 @@
+"""
+writer.py -  Incremental writing of MetaArray HDF5 files
+Distributed under MIT/X11 license. See license.txt for more information.
+
+MetaArray.write(fileName, appendAxis=...) reopens the file and resizes every data set
+each time it is called. The writers in this module keep the file open and buffer
+incoming blocks so that many small appends become a few large writes, optionally
+moving all disk access onto a background thread.
+"""
+
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from . import MetaArray, HAVE_HDF5, h5py
+
+
+class MetaArrayWriter(object):
+    """Append MetaArray blocks along one axis of an HDF5 file that is kept open between writes.
+
+    Blocks passed to write() are buffered in memory and flushed to disk once *bufferSize* bytes
+    have accumulated or *flushInterval* seconds have passed since the oldest buffered block was
+    added. Both thresholds are only checked when write() is called: if the producer pauses,
+    buffered blocks stay in memory until the next write(), flush() or close() (a
+    ThreadedMetaArrayWriter flushes them after *flushInterval* on its own). Each flush resizes
+    the data set once and writes all buffered blocks in a single operation (axis values and
+    *appendKeys* are handled the same way).
+
+    If *fileName* already exists, new data is appended to it as with
+    MetaArray.write(fileName, appendAxis=...). Otherwise the file is created from the info of
+    the first block written, using a chunk shape of roughly *chunkBytes* bytes that spans
+    many frames along the append axis. Extra keyword arguments (compression, chunks, quantize,
+    stats, pyramid) are used when creating the data set, as with MetaArray.write().
+
+    If *swmr* is True, the file is written in HDF5 single-writer / multiple-reader mode: other
+    processes may open it with MetaArray(file=fileName, swmr=True) while it is being written and
+    call refresh() to see new frames, which become visible at each flush. An existing file can
+    only be appended to in this mode if it was created with swmr=True.
+
+    Example::
+
+        with MetaArrayWriter('sweeps.ma', appendAxis='Time') as w:
+            for sweep in acquire():
+                w.write(sweep)
+    """
+
+    def __init__(
+        self,
+        fileName,
+        appendAxis,
+        appendKeys=None,
+        bufferSize=4e6,
+        flushInterval=1.0,
+        chunkBytes=None,
+        swmr=False,
+        **opts,
+    ):
+        if not HAVE_HDF5:
+            raise Exception("h5py is required for MetaArrayWriter, but it could not be imported.")
+        self.fileName = fileName
+        self.appendAxis = appendAxis
+        self.appendKeys = list(appendKeys or [])
+        self.bufferSize = bufferSize
+        self.flushInterval = flushInterval
+        self.chunkBytes = chunkBytes
+        self.swmr = swmr
+        self.opts = opts
+
+        self._blocks = []
+        self._bufferedBytes = 0
+        self._bufferStart = None
+        self._frameShape = None
+        self.blocksWritten = 0
+        self.bytesWritten = 0
+
+        # SWMR requires the latest file format
+        fileOpts = {"libver": "latest"} if swmr else {}
+        if os.path.exists(fileName):
+            self._file = h5py.File(fileName, "r+", **fileOpts)
+            MetaArray._checkHDF5Version(self._file, fileName)
+            self._created = True
+            if swmr:
+                self._file.swmr_mode = True
+        else:
+            self._file = h5py.File(fileName, "w", **fileOpts)
+            self._created = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._file is None
+
+    def write(self, data):
+        """Add a MetaArray block to the buffer, flushing to disk if a threshold has been reached."""
+        if self._file is None:
+            raise Exception("Cannot write to a closed MetaArrayWriter.")
+        if not (hasattr(data, "implements") and data.implements("MetaArray")):
+            raise TypeError("MetaArrayWriter.write() requires a MetaArray")
+
+        ax = data._interpretAxis(self.appendAxis)
+        frameShape = list(data.shape)
+        frameShape[ax] = 1
+        if self._frameShape is None:
+            self._appendAxisIndex = ax
+            self._frameShape = frameShape
+        elif frameShape != self._frameShape or ax != self._appendAxisIndex:
+            raise ValueError(
+                f"Block shape {data.shape} does not match the shape of previous blocks "
+                f"(expected {tuple(self._frameShape)} with any length along axis {self._appendAxisIndex})"
+            )
+
+        self._blocks.append(data)
+        self._bufferedBytes += data.asarray().nbytes
+        if self._bufferStart is None:
+            self._bufferStart = time.perf_counter()
+
+        if self._bufferedBytes >= self.bufferSize or time.perf_counter() - self._bufferStart >= self.flushInterval:
+            self.flush()
+
+    def _flushDelay(self):
+        # seconds until the buffered blocks are due to be flushed, or None if the buffer is empty
+        if self._bufferStart is None:
+            return None
+        return max(0.0, self._bufferStart + self.flushInterval - time.perf_counter())
+
+    def flush(self):
+        """Write all buffered blocks to disk with a single resize and write."""
+        if self._file is None or len(self._blocks) == 0:
+            return
+        blocks = self._blocks
+        ax = self._appendAxisIndex
+        self._blocks = []
+        self._bufferedBytes = 0
+        self._bufferStart = None
+
+        if len(blocks) == 1:
+            data = blocks[0].asarray()
+        else:
+            data = np.concatenate([b.asarray() for b in blocks], axis=ax)
+
+        axKeys = self.appendKeys[:]
+        if "values" in blocks[0]._info[ax]:
+            axKeys.insert(0, "values")
+        axValues = {}
+        for key in axKeys:
+            if len(blocks) == 1:
+                axValues[key] = np.asarray(blocks[0]._info[ax][key])
+            else:
+                axValues[key] = np.concatenate([np.asarray(b._info[ax][key]) for b in blocks])
+
+        if self._created:
+            MetaArray._appendHDF5(self._file, ax, data, axValues)
+        else:
+            info = blocks[0].infoCopy()
+            info[ax].update(axValues)
+            ma = MetaArray(data, info=info)
+            opts = self.opts.copy()
+            opts["appendAxis"] = ax
+            opts.setdefault("chunkBytes", self.chunkBytes)
+            ma, levels = ma._prepareHDF5(opts)
+            dsOpts, _ = ma._hdf5DatasetOptions(opts)
+            ma._writeHDF5Data(self._file, dsOpts)
+            if levels is not None:
+                from . import pyramid
+
+                pyramid.writeLevels(self._file, levels, dsOpts)
+            self._created = True
+            if self.swmr:
+                # no new objects can be created from here on; readers may now open the file
+                self._file.swmr_mode = True
+        self._file.flush()
+        self.blocksWritten += len(blocks)
+        self.bytesWritten += data.nbytes
+
+    def close(self):
+        """Flush any buffered data and close the file."""
+        if self._file is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._file.close()
+            self._file = None
+            if not self._created and os.path.exists(self.fileName):
+                # nothing was ever written; don't leave an empty, unreadable file behind
+                os.remove(self.fileName)
+
+
+class ThreadedMetaArrayWriter(object):
+    """Append MetaArray blocks to an HDF5 file from a dedicated background thread.
+
+    write() places each block on a bounded queue and returns immediately; a single worker
+    thread takes blocks off the queue in order and passes them to a MetaArrayWriter, which
+    buffers and flushes them to disk. While the worker is compressing and writing one
+    buffer, the producer keeps filling the queue (double buffering). Buffered blocks are
+    flushed *flushInterval* seconds after the oldest of them was queued, even if no further
+    blocks arrive.
+
+    If the queue already holds *maxQueueSize* blocks, write() blocks until there is room
+    (or raises queue.Full if *timeout* expires), so a slow disk applies backpressure to the
+    producer rather than growing memory without bound. Blocks are not copied unless
+    *copy* is True, so the producer must not modify a block after writing it.
+
+    An exception raised in the worker thread is re-raised by the next call to write(),
+    flush() or close(). close() waits for all queued blocks to be written before closing
+    the file. All other arguments are passed to MetaArrayWriter.
+    """
+
+    # sentinels placed on the queue to control the worker thread
+    _stop = object()
+    _flush = object()
+
+    def __init__(self, fileName, appendAxis, maxQueueSize=16, copy=False, **kwds):
+        self.copy = copy
+        self._writer = MetaArrayWriter(fileName, appendAxis, **kwds)
+        self._queue = queue.Queue(maxsize=maxQueueSize)
+        self._error = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "blocksQueued": 0,
+            "highWaterMark": 0,
+            "blockedCount": 0,
+            "blockedTime": 0.0,
+        }
+        self._thread = threading.Thread(target=self._run, name="ThreadedMetaArrayWriter", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def closed(self):
+        return self._thread is None
+
+    def write(self, data, timeout=None):
+        """Queue a MetaArray block to be written by the background thread."""
+        self._checkError()
+        if self._thread is None:
+            raise Exception("Cannot write to a closed ThreadedMetaArrayWriter.")
+        if self.copy:
+            data = data.copy()
+        try:
+            self._queue.put_nowait(data)
+        except queue.Full:
+            start = time.perf_counter()
+            try:
+                self._queue.put(data, timeout=timeout)
+            finally:
+                with self._lock:
+                    self._stats["blockedCount"] += 1
+                    self._stats["blockedTime"] += time.perf_counter() - start
+        with self._lock:
+            self._stats["blocksQueued"] += 1
+            self._stats["highWaterMark"] = max(self._stats["highWaterMark"], self._queue.qsize())
+
+    def flush(self):
+        """Wait until all queued blocks have been written to disk."""
+        if self._thread is not None:
+            self._queue.put(self._flush)
+            self._queue.join()
+        self._checkError()
+
+    def stats(self):
+        """Return a dict of queue statistics.
+
+        blocksQueued / blocksWritten: number of blocks accepted by write() / written to disk
+        bytesWritten: number of data bytes written to disk
+        queueSize / highWaterMark: current and largest observed number of blocks waiting in the queue
+        blockedCount / blockedTime: number of write() calls that had to wait for room in the queue,
+            and the total time (s) spent waiting
+        """
+        with self._lock:
+            stats = self._stats.copy()
+        # counted by the writer as blocks reach the disk
+        stats["blocksWritten"] = self._writer.blocksWritten
+        stats["bytesWritten"] = self._writer.bytesWritten
+        stats["queueSize"] = self._queue.qsize()
+        return stats
+
+    def close(self):
+        """Write all queued blocks, flush, and close the file."""
+        if self._thread is None:
+            return
+        self._queue.put(self._stop)
+        self._thread.join()
+        self._thread = None
+        self._writer.close()
+        self._checkError()
+
+    def _checkError(self):
+        if self._error is not None:
+            err = self._error
+            self._error = None
+            raise err
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self._writer._flushDelay())
+            except queue.Empty:
+                # no block arrived before the buffer was due to be flushed
+                try:
+                    if self._error is None:
+                        self._writer.flush()
+                except Exception as exc:
+                    self._error = exc
+                continue
+            try:
+                if item is self._stop:
+                    return
+                if self._error is not None:
+                    # discard remaining blocks after a failure; the error is reported to the producer
+                    continue
+                if item is self._flush:
+                    self._writer.flush()
+                    continue
+                self._writer.write(item)
+            except Exception as exc:
+                self._error = exc
+            finally:
+                self._queue.task_done()
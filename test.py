@@ -119,6 +119,7 @@ def test_metaarray():
 
     print("\nArrays are equivalent:", np.all(ma == ma2))
 
+    ma2.write(tf, mappable=True)
     del ma
     del ma2
     ma = MetaArray(file=tf, writable=True)
@@ -133,13 +134,14 @@ def test_metaarray():
 
     print("\n================append test (%s)===============" % tf)
     ma = MetaArray(file=tf)
+    os.remove(tf)
     ma["Axis2":0:2].write(tf, appendAxis="Axis2")
     for i in range(2, ma.shape[1]):
         ma["Axis2":[i]].write(tf, appendAxis="Axis2")
 
     ma2 = MetaArray(file=tf)
 
-    print("\nArrays are equivalent:", (ma == ma2).all())
+    print("\nArrays are equivalent:", np.all(ma == ma2))
 
     os.remove(tf)
 
@@ -147,7 +149,7 @@ def test_metaarray():
     print("\n==========Memmap test============")
     ma.write(tf, mappable=True)
     ma2 = MetaArray(file=tf, mmap=True)
-    print("\nArrays are equivalent:", (ma == ma2).all())
+    print("\nArrays are equivalent:", np.all(ma == ma2))
     os.remove(tf)
 
 
@@ -0,0 +1,31 @@
+"""
+Fixtures shared by the MetaArray tests.
+"""
+
+import pytest
+
+from .helpers import make_metaarray
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "sample(**kwds): make_metaarray() arguments overriding those of the sample_metaarray fixture"
+    )
+
+
+@pytest.fixture
+def sample_metaarray(request):
+    """A (Time, Signal) MetaArray of 100 random frames with three columns.
+
+    Modules needing a different array set its make_metaarray() arguments with a ``sample`` mark,
+    e.g. ``pytestmark = pytest.mark.sample(n=1000, colAxis=0)``.
+    """
+    kwds = {
+        "seed": 0,
+        "dt": 1e-2,
+        "cols": [("Voltage 0", "V"), ("Voltage 1", "V"), ("Current 0", "A")],
+        "extra": {"note": "test data"},
+    }
+    for mark in reversed(list(request.node.iter_markers("sample"))):
+        kwds.update(mark.kwargs)
+    return make_metaarray(**kwds)
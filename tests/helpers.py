@@ -0,0 +1,54 @@
+"""
+Helpers shared by the MetaArray tests.
+"""
+
+import numpy as np
+
+from MetaArray import MetaArray, axis
+
+SIGNALS = [("Vm", "V"), ("Im", "A"), ("Cmd", "V")]
+
+
+def channels(n, units="V"):
+    """Column specs for *n* channels named ch0, ch1, ..."""
+    return [("ch%d" % i, units) for i in range(n)]
+
+
+def make_metaarray(
+    data=None, n=100, start=0, block=None, dt=1e-3, cols=SIGNALS, extra=None, colAxis=1, seed=None, dtype=float
+):
+    """Create a 2D MetaArray with a Time axis and a Signal axis holding *cols*.
+
+    *cols* is a list of (name, units) tuples or names. The frames are numbered from *start*, or
+    from block * n when *block* is given, and the Time value of frame i is i * dt.
+
+    *data* defaults to sequential values counting up from the first frame, or to normal random
+    values drawn with *seed* if that is given. It may also be a function of the frame numbers
+    returning an (n, len(cols)) array of *dtype*, or an array (used as is) whose shape sets the
+    number of frames. *colAxis* = 0 puts the Signal axis first. *extra* is the extra info dict.
+    """
+    nCols = len(cols)
+    if block is not None:
+        start = block * n
+    if data is None or callable(data):
+        frames = np.arange(start, start + n)
+        if callable(data):
+            data = data(frames)
+        elif seed is not None:
+            data = np.random.default_rng(seed).normal(size=(n, nCols))
+        else:
+            data = np.arange(start * nCols, (start + n) * nCols).reshape(n, nCols)
+        data = np.asarray(data, dtype=dtype)
+        if colAxis == 0:
+            data = np.ascontiguousarray(data.T)
+    else:
+        frames = np.arange(start, start + data.shape[1 - colAxis])
+    info = [
+        axis("Time", values=frames * dt, units="s"),
+        axis("Signal", cols=list(cols)),
+    ]
+    if colAxis == 0:
+        info.reverse()
+    if extra is not None:
+        info.append(dict(extra))
+    return MetaArray(data, info=info)
@@ -0,0 +1,130 @@
+"""
+Tests for the Apache Arrow / Parquet bridge.
+"""
+
+import datetime
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray, axis
+
+from .helpers import SIGNALS
+
+pa = pytest.importorskip("pyarrow")
+
+# columns on axis 0 and values on axis 1
+pytestmark = pytest.mark.sample(cols=SIGNALS, dt=1e-3, colAxis=0, extra={"rig": 3})
+
+
+class TestArrow:
+    def test_to_arrow(self, sample_metaarray):
+        table = sample_metaarray.toArrow()
+        assert table.column_names == ["Time", "Vm", "Im", "Cmd"]
+        assert table.num_rows == 100
+        assert table.schema.field("Im").metadata[b"units"] == b"A"
+        assert table.schema.field("Time").metadata[b"units"] == b"s"
+
+    def test_zero_copy(self, sample_metaarray):
+        """Columns share memory with the MetaArray."""
+        table = sample_metaarray.toArrow()
+        data = sample_metaarray.asarray()
+        assert table.column("Im").chunk(0).buffers()[1].address == data[1].ctypes.data
+
+    def test_round_trip(self, sample_metaarray):
+        ma = MetaArray.fromArrow(sample_metaarray.toArrow())
+        assert np.all(ma.asarray() == sample_metaarray.asarray())
+        assert ma.infoCopy(0) == sample_metaarray.infoCopy(0)
+        assert np.all(ma.xvals("Time") == sample_metaarray.xvals("Time"))
+        assert ma.axisUnits("Time") == "s"
+        assert ma.infoCopy(-1) == {"rig": 3}
+
+    def test_info_arrays(self, sample_metaarray):
+        """Arrays and numpy scalars anywhere in the info survive the round trip."""
+        info = sample_metaarray.infoCopy()
+        info[-1] = {"gains": np.array([1.5, 2.0, 0.5]), "nested": {"ids": np.arange(3, dtype=np.int32)}}
+        info[0]["cols"][0]["offset"] = np.float32(0.25)
+        ma = MetaArray(sample_metaarray.asarray(), info=info)
+        ma2 = MetaArray.fromArrow(ma.toArrow())
+        extra = ma2.infoCopy(-1)
+        np.testing.assert_array_equal(extra["gains"], [1.5, 2.0, 0.5])
+        assert extra["nested"]["ids"].dtype == np.int32
+        assert ma2.infoCopy(0)["cols"][0]["offset"] == 0.25
+
+    def test_duplicate_names(self, sample_metaarray):
+        """Repeated column names, and a column named like the index, are restored by position."""
+        info = sample_metaarray.infoCopy()
+        info[0]["cols"] = [{"name": "Time", "units": "V"}, {"name": "Vm", "units": "V"}, {"name": "Vm", "units": "A"}]
+        ma = MetaArray(sample_metaarray.asarray(), info=info)
+        ma2 = MetaArray.fromArrow(ma.toArrow())
+        np.testing.assert_array_equal(ma2.asarray(), ma.asarray())
+        assert ma2.infoCopy(0) == info[0]
+        np.testing.assert_array_equal(ma2.xvals("Time"), ma.xvals("Time"))
+
+    def test_non_json_info(self, sample_metaarray):
+        """Values JSON can not hold are stored as their repr."""
+        info = sample_metaarray.infoCopy()
+        info[-1] = {"date": datetime.date(2024, 5, 1), "pair": (1, 2), "big": 10**30, "c": 1 + 2j}
+        ma2 = MetaArray.fromArrow(MetaArray(sample_metaarray.asarray(), info=info).toArrow())
+        assert ma2.infoCopy(-1) == {"date": "datetime.date(2024, 5, 1)", "pair": [1, 2], "big": 10**30, "c": 1 + 2j}
+
+    def test_metadata_not_evaluated(self, sample_metaarray):
+        table = sample_metaarray.toArrow()
+        bad = table.replace_schema_metadata({b"MetaArray": b"__import__('os').getcwd()"})
+        with pytest.raises(ValueError):
+            MetaArray.fromArrow(bad)
+
+    def test_columns_on_axis1(self):
+        ma = MetaArray(np.arange(20.0).reshape(10, 2), info=[axis("Time"), axis("Signal", cols=["a", "b"])])
+        table = ma.toArrow()
+        assert table.column_names == ["a", "b"]
+        ma2 = MetaArray.fromArrow(table)
+        assert np.all(ma2.asarray() == ma.asarray())
+        assert ma2.axisName(0) == "Time"
+        assert ma2.listColumns("Signal") == ["a", "b"]
+
+    def test_foreign_table(self):
+        table = pa.table({"x": [1.0, 2.0, 3.0], "y": [4.0, 5.0, 6.0]})
+        ma = MetaArray.fromArrow(table)
+        assert ma.shape == (3, 2)
+        assert ma.listColumns(1) == ["x", "y"]
+        assert np.all(ma[:, "y"].asarray() == [4, 5, 6])
+
+    def test_requires_columns(self):
+        with pytest.raises(ValueError):
+            MetaArray(np.zeros((3, 3))).toArrow()
+
+
+class TestParquet:
+    def test_round_trip(self, tmp_path, sample_metaarray):
+        pytest.importorskip("pyarrow.parquet")
+        fn = str(tmp_path / "data.parquet")
+        sample_metaarray.writeParquet(fn)
+        ma = MetaArray.readParquet(fn)
+        assert np.all(ma.asarray() == sample_metaarray.asarray())
+        assert np.all(ma.xvals("Time") == sample_metaarray.xvals("Time"))
+
+    def test_duplicate_names(self, tmp_path, sample_metaarray):
+        pytest.importorskip("pyarrow.parquet")
+        fn = str(tmp_path / "data.parquet")
+        info = sample_metaarray.infoCopy()
+        info[0]["cols"] = [{"name": "Time"}, {"name": "Vm", "units": "V"}, {"name": "Vm", "units": "A"}]
+        ma = MetaArray(sample_metaarray.asarray(), info=info)
+        ma.writeParquet(fn)
+        ma2 = MetaArray.readParquet(fn)
+        np.testing.assert_array_equal(ma2.asarray(), ma.asarray())
+        assert ma2.infoCopy(0) == info[0]
+        # the data column named like the index is read along with the index
+        part = MetaArray.readParquet(fn, columns=["Vm"])
+        assert part.infoCopy(0)["cols"] == info[0]["cols"]
+        np.testing.assert_array_equal(part.xvals("Time"), ma.xvals("Time"))
+
+    def test_read_columns(self, tmp_path, sample_metaarray):
+        pytest.importorskip("pyarrow.parquet")
+        fn = str(tmp_path / "data.parquet")
+        sample_metaarray.writeParquet(fn)
+        ma = MetaArray.readParquet(fn, columns=["Cmd", "Vm"])
+        assert ma.listColumns("Signal") == ["Cmd", "Vm"]
+        assert ma.columnUnits("Signal", "Vm") == "V"
+        assert np.all(ma["Signal":"Cmd"].asarray() == sample_metaarray["Signal":"Cmd"].asarray())
+        assert len(ma.xvals("Time")) == 100
@@ -0,0 +1,108 @@
+"""
+Tests for the directory catalog.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+from MetaArray.catalog import MetaArrayCatalog
+
+from .helpers import make_metaarray
+
+
+def has_h5py():
+    try:
+        import h5py  # noqa: F401
+
+        return True
+    except ImportError:
+        return False
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A directory tree with a few recordings in both formats, plus a file that is not a MetaArray."""
+    os.makedirs(tmp_path / "cell1")
+    os.makedirs(tmp_path / "cell2")
+    make_metaarray(n=100, cols=[("Vm", "V"), ("Im", "A")], dtype=np.float32, extra={"protocol": "iv"}).writeMa(
+        str(tmp_path / "cell1" / "a.ma")
+    )
+    make_metaarray(n=200, start=1000, cols=[("Vm", "V")], dtype=np.float32).writeMa(str(tmp_path / "cell1" / "b.ma"))
+    ma = make_metaarray(
+        n=300, start=2000, cols=[("Im", "A"), ("Cmd", "V"), ("Vm", "V")], dtype=np.float32, extra={"protocol": "ramp"}
+    )
+    if has_h5py():
+        ma.write(str(tmp_path / "cell2" / "c.ma"))
+    else:
+        ma.writeMa(str(tmp_path / "cell2" / "c.ma"))
+    with open(tmp_path / "cell2" / "broken.ma", "w") as fh:
+        fh.write("not a MetaArray")
+    with open(tmp_path / "notes.txt", "w") as fh:
+        fh.write("ignored")
+    return tmp_path
+
+
+class TestCatalog:
+    """Test building, updating and querying a MetaArrayCatalog."""
+
+    def test_find(self, data_dir):
+        with MetaArrayCatalog(str(data_dir)) as cat:
+            assert cat.update() == (4, 0)
+            a, b, c = "cell1/a.ma", "cell1/b.ma", "cell2/c.ma"
+            assert cat.find() == [a, b, c]
+            assert cat.find(column="Im") == [a, c]
+            assert cat.find(column="Cmd", axis="Time") == [c]
+            assert cat.find(axis="Frequency") == []
+            assert cat.find(units="A") == [a, c]
+            assert cat.find(shape=(None, 1)) == [b]
+            assert cat.find(shape=(300, None)) == [c]
+            assert cat.find(ndim=2, dtype="float32") == [a, b, c]
+            assert cat.find(infoKey="protocol") == [a, c]
+            assert cat.find(valueRange={"Time": (1.05, 1.5)}) == [b]
+            assert cat.find(valueRange={"Time": (0.05, 1.05)}) == [a, b]
+            assert list(cat.errors()) == ["cell2/broken.ma"]
+
+    def test_file_info(self, data_dir):
+        with MetaArrayCatalog(str(data_dir)) as cat:
+            cat.update()
+            info = cat.fileInfo("cell1/a.ma")
+            assert info["format"] == "ma"
+            assert info["shape"] == (100, 2)
+            assert info["axes"][0]["name"] == "Time"
+            assert info["axes"][0]["units"] == "s"
+            assert info["axes"][0]["range"] == pytest.approx((0, 0.099))
+            assert info["axes"][1]["cols"] == [{"name": "Vm", "units": "V"}, {"name": "Im", "units": "A"}]
+            assert info["info"] == {"protocol": "'iv'"}
+            with pytest.raises(KeyError):
+                cat.fileInfo("missing.ma")
+
+    def test_incremental_update(self, data_dir):
+        with MetaArrayCatalog(str(data_dir)) as cat:
+            cat.update()
+            assert cat.update() == (0, 0)
+
+            os.remove(data_dir / "cell1" / "b.ma")
+            fn = str(data_dir / "cell1" / "a.ma")
+            mtime = os.stat(fn).st_mtime_ns
+            make_metaarray(n=50, cols=[("Vm", "V"), ("Iext", "A")], dtype=np.float32).writeMa(fn)
+            os.utime(fn, ns=(mtime + 10**9, mtime + 10**9))
+            make_metaarray(n=10, cols=[("Vm", "V")], dtype=np.float32).writeMa(str(data_dir / "d.ma"))
+            assert cat.update() == (2, 1)
+            assert cat.find(column="Iext") == ["cell1/a.ma"]
+            assert cat.find(shape=(10, 1)) == ["d.ma"]
+            assert "cell1/b.ma" not in cat.find()
+
+        # the index persists between sessions
+        with MetaArrayCatalog(str(data_dir)) as cat:
+            assert cat.update() == (0, 0)
+            assert cat.find(column="Iext") == ["cell1/a.ma"]
+
+    def test_parallel_rebuild(self, data_dir):
+        with MetaArrayCatalog(str(data_dir), indexFile=str(data_dir / "cell1" / "index.db")) as cat:
+            cat.update()
+            expected = cat.query("SELECT * FROM axes ORDER BY path, axis")
+            assert cat.rebuild(workers=2) == (4, 0)
+            assert cat.query("SELECT * FROM axes ORDER BY path, axis") == expected
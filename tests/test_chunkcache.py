@@ -0,0 +1,99 @@
+"""
+Tests for HDF5 chunk cache options and the process-wide decoded chunk cache.
+"""
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+from MetaArray import chunkcache
+
+from .helpers import channels
+
+h5py = pytest.importorskip("h5py")
+
+pytestmark = pytest.mark.sample(n=10000, dt=1e-3, cols=channels(4), extra=None)
+
+
+@pytest.fixture
+def sample_file(tmp_path, sample_metaarray):
+    """Write a compressed (Time, Signal) array with 1000-sample x 1-channel chunks."""
+    fn = str(tmp_path / "test.ma")
+    sample_metaarray.write(fn, compression="gzip", chunks=(1000, 1))
+    return fn, sample_metaarray
+
+
+@pytest.fixture
+def cache():
+    chunkcache.clearCache()
+    chunkcache.defaultCache.resetStats()
+    yield chunkcache.defaultCache
+    chunkcache.setCacheSize(256 * 1024**2)
+    chunkcache.clearCache()
+
+
+class TestChunkCache:
+    """Test reading lazily opened arrays through the decoded chunk cache."""
+
+    def test_rdcc_options(self, sample_file):
+        fn, _ = sample_file
+        ma = MetaArray(file=fn, readAllData=False, rdcc_nbytes=4 * 1024**2, rdcc_nslots=1009, rdcc_w0=0.5)
+        _, nslots, nbytes, w0 = ma._openFile.id.get_access_plist().get_cache()
+        assert (nslots, nbytes, w0) == (1009, 4 * 1024**2, 0.5)
+        ma._openFile.close()
+
+    def test_hits(self, sample_file, cache):
+        fn, orig = sample_file
+        ma = MetaArray(file=fn, readAllData=False, chunkCache=True)
+        part = ma[1500:2500, 1:3]
+        assert np.all(part.asarray() == orig.asarray()[1500:2500, 1:3])
+        assert np.all(part.xvals("Time") == orig.xvals("Time")[1500:2500])
+        stats = chunkcache.cacheStats()
+        assert (stats["hits"], stats["misses"], stats["chunks"]) == (0, 4, 4)
+
+        assert np.all(ma[2100:2200, 2].asarray() == orig.asarray()[2100:2200, 2])
+        assert ma[1999, 1] == orig[1999, 1]
+        stats = chunkcache.cacheStats()
+        assert (stats["hits"], stats["misses"]) == (2, 4)
+        assert stats["bytes"] == 4 * 1000 * 8
+
+        # the cache is shared by all arrays opened from the same file
+        ma2 = MetaArray(file=fn, readAllData=False, chunkCache=True)
+        ma2[1500:2500, 1:3]
+        assert chunkcache.cacheStats()["hits"] == 6
+        ma._openFile.close()
+        ma2._openFile.close()
+
+    def test_eviction(self, sample_file, cache):
+        fn, orig = sample_file
+        chunkcache.setCacheSize(3 * 1000 * 8)
+        ma = MetaArray(file=fn, readAllData=False, chunkCache=True)
+        for i in range(4):
+            assert np.all(ma[:, i].asarray() == orig.asarray()[:, i])
+        stats = chunkcache.cacheStats()
+        assert stats["chunks"] == 3
+        assert stats["evictions"] == 37
+        assert stats["bytes"] <= stats["maxBytes"]
+        ma._openFile.close()
+
+    def test_file_changed(self, sample_file, cache, tmp_path):
+        """Chunks cached for a file are not used once the file has been rewritten."""
+        fn, orig = sample_file
+        ma = MetaArray(file=fn, readAllData=False, chunkCache=True)
+        ma[:1000]
+        ma._openFile.close()
+
+        orig2 = MetaArray(orig.asarray() * 2, info=orig.infoCopy())
+        orig2.write(fn, compression="gzip", chunks=(1000, 1))
+        ma = MetaArray(file=fn, readAllData=False, chunkCache=True)
+        assert np.all(ma[:1000].asarray() == orig2.asarray()[:1000])
+        ma._openFile.close()
+
+    def test_unchunked(self, tmp_path, cache):
+        """Contiguous data sets are read by h5py as usual."""
+        fn = str(tmp_path / "test.ma")
+        MetaArray(np.arange(100.0)).write(fn, mappable=True)
+        ma = MetaArray(file=fn, readAllData=False, chunkCache=True)
+        assert np.all(ma[10:20].asarray() == np.arange(10.0, 20.0))
+        assert chunkcache.cacheStats()["misses"] == 0
+        ma._openFile.close()
@@ -0,0 +1,59 @@
+"""
+Tests for CSV export and import.
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+
+from .helpers import SIGNALS
+
+# columns on axis 0 and values on axis 1
+pytestmark = pytest.mark.sample(
+    data=np.arange(30, dtype=float).reshape(3, 10) / 4.0, dt=0.5, cols=SIGNALS, colAxis=0, extra=None
+)
+
+
+class TestWriteCsv:
+    def test_string(self, sample_metaarray):
+        lines = sample_metaarray.writeCsv().splitlines()
+        assert lines[0] == "Vm,Im,Cmd"
+        assert lines[1] == "0,2.5,5"
+        assert lines[2] == "0.25,2.75,5.25"
+        assert len(lines) == 11
+
+    def test_axis_values(self, sample_metaarray):
+        lines = sample_metaarray.writeCsv(axisValues=True).splitlines()
+        assert lines[0] == "Time,Vm,Im,Cmd"
+        assert lines[3] == "1,0.5,3,5.5"
+
+    def test_blocks(self, sample_metaarray, monkeypatch):
+        """Output does not depend on the number of rows formatted at once."""
+        expected = sample_metaarray.writeCsv(axisValues=True)
+        monkeypatch.setattr(MetaArray, "csvBlockRows", 3)
+        assert sample_metaarray.writeCsv(axisValues=True) == expected
+
+    def test_file_handle(self, sample_metaarray):
+        fh = io.StringIO()
+        sample_metaarray.writeCsv(fh, fmt="%.3f")
+        assert fh.getvalue().splitlines()[2] == "0.250,2.750,5.250"
+
+
+class TestReadCsv:
+    def test_round_trip(self, tmp_path, sample_metaarray):
+        fn = str(tmp_path / "data.csv")
+        sample_metaarray.writeCsv(fn, axisValues=True)
+        ma = MetaArray.readCsv(fn, axisValues=True)
+        assert ma.shape == (3, 10)
+        assert np.all(ma.asarray() == sample_metaarray.asarray())
+        assert ma.listColumns(0) == ["Vm", "Im", "Cmd"]
+        assert ma.axisName(1) == "Time"
+        assert np.all(ma.xvals(1) == sample_metaarray.xvals("Time"))
+
+    def test_no_header(self):
+        ma = MetaArray.readCsv(io.StringIO("1,2\n3,4\n5,6\n"))
+        assert np.all(ma.asarray() == [[1, 3, 5], [2, 4, 6]])
+        assert not ma.axisHasColumns(0)
@@ -0,0 +1,182 @@
+"""
+Tests for reading and writing MetaArray HDF5 files.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+
+h5py = pytest.importorskip("h5py")
+
+
+class TestMemoryMap:
+    """Test memory-mapped reads of HDF5 files."""
+
+    def test_mmap_read(self, tmp_path, sample_metaarray):
+        """Mappable files are memory-mapped at the dataset offset."""
+        fn = str(tmp_path / "mapped.ma")
+        sample_metaarray.write(fn, mappable=True)
+        ma = MetaArray(file=fn, mmap=True)
+        assert isinstance(ma.asarray(), np.memmap)
+        assert not ma.asarray().flags.writeable
+        assert np.all(ma.asarray() == sample_metaarray.asarray())
+        assert ma.listColumns("Signal") == ["Voltage 0", "Voltage 1", "Current 0"]
+
+    def test_mmap_meta(self, tmp_path, sample_metaarray):
+        """Axis values of mappable files are memory-mapped as well."""
+        fn = str(tmp_path / "mapped.ma")
+        sample_metaarray.write(fn, mappable=True)
+        ma = MetaArray(file=fn, mmap=True)
+        assert isinstance(ma.xvals("Time"), np.memmap)
+        assert np.all(ma.xvals("Time") == sample_metaarray.xvals("Time"))
+        with h5py.File(fn, "r") as f:
+            meta = MetaArray.readHDF5Meta(f["info"], mmap=True)
+        assert isinstance(meta[0]["values"], np.memmap)
+
+    def test_mmap_fallback(self, tmp_path, sample_metaarray):
+        """Chunked or compressed files are read normally when mmap is requested."""
+        fn = str(tmp_path / "chunked.ma")
+        sample_metaarray.write(fn, compression="gzip")
+        ma = MetaArray(file=fn, mmap=True)
+        assert not isinstance(ma.asarray(), np.memmap)
+        assert np.all(ma.asarray() == sample_metaarray.asarray())
+
+    def test_writable_mmap(self, tmp_path, sample_metaarray):
+        """Writable mappable files modify the data without touching the HDF5 header."""
+        fn = str(tmp_path / "mapped.ma")
+        sample_metaarray.write(fn, mappable=True)
+        ma = MetaArray(file=fn, writable=True)
+        assert isinstance(ma.asarray(), np.memmap)
+        ma[:, 0] = 5.0
+        ma.asarray().flush()
+        del ma
+        ma2 = MetaArray(file=fn)
+        assert np.all(ma2["Signal":"Voltage 0"].asarray() == 5.0)
+        assert np.all(ma2["Signal":"Current 0"].asarray() == sample_metaarray["Signal":"Current 0"].asarray())
+
+    def test_writable_chunked(self, tmp_path, sample_metaarray):
+        """Writable chunked files are modified through h5py."""
+        fn = str(tmp_path / "chunked.ma")
+        sample_metaarray.write(fn)
+        ma = MetaArray(file=fn, writable=True)
+        ma[:, 1] = 2.0
+        ma._openFile.close()
+        ma2 = MetaArray(file=fn)
+        assert np.all(ma2["Signal":"Voltage 1"].asarray() == 2.0)
+
+
+class TestChunkShape:
+    """Test chunk shape selection when writing HDF5 files."""
+
+    def test_column_access(self):
+        """Column access gives one-column chunks of about chunkBytes."""
+        cs = MetaArray.guessChunkShape((1000000, 3), 8, chunkBytes=2**19, access="column", axes=[1])
+        assert cs == (65536, 1)
+
+    def test_window_access(self):
+        """Window access spans all other axes and cuts along the window axis."""
+        cs = MetaArray.guessChunkShape((1000000, 3), 8, chunkBytes=2**19, access="window", axes=[0])
+        assert cs[1] == 3
+        assert cs[0] * 3 * 8 <= 2**19
+        assert cs[0] * 4 * 8 > 2**19
+
+    def test_append_access(self):
+        """Append access is not limited by the current length of the append axis."""
+        cs = MetaArray.guessChunkShape((10, 3), 8, chunkBytes=2**19, access="append", axes=[0])
+        assert cs == (21845, 3)
+
+    def test_balanced(self):
+        """Without an access hint all axes are reduced until the chunk fits."""
+        cs = MetaArray.guessChunkShape((5000, 5000), 8, chunkBytes=2**19)
+        assert np.prod(cs) * 8 <= 2**19
+        assert MetaArray.guessChunkShape((10, 10), 8) == (10, 10)
+
+    def test_write_chunks(self, tmp_path, sample_metaarray):
+        """write() uses the access hint and chunkBytes to choose the chunk shape."""
+        fn = str(tmp_path / "chunked.ma")
+        sample_metaarray.write(fn, chunkBytes=800)
+        with h5py.File(fn, "r") as f:
+            assert f["data"].chunks == (100, 1)
+        sample_metaarray.write(fn, chunkBytes=800, access="window")
+        with h5py.File(fn, "r") as f:
+            assert f["data"].chunks == (33, 3)
+        assert np.all(MetaArray(file=fn).asarray() == sample_metaarray.asarray())
+
+    def test_bad_access(self):
+        with pytest.raises(ValueError):
+            MetaArray.guessChunkShape((10, 10), 8, access="diagonal")
+
+
+def object_addr(f, path):
+    return h5py.h5o.get_info(f[path].id).addr
+
+
+class TestWriteMeta:
+    def test_update_in_place(self, tmp_path, sample_metaarray):
+        """Changing one value rewrites only that attribute."""
+        fn = str(tmp_path / "meta.ma")
+        sample_metaarray.write(fn)
+        with h5py.File(fn, "r") as f:
+            addrs = {p: object_addr(f, p) for p in ("info/0/values", "info/1/cols/0", "info/1/cols/2", "info/2")}
+
+        ma = MetaArray(file=fn, readAllData=False)
+        info = ma.infoCopy()
+        ma.close()
+        info[-1]["note"] = "changed"
+        info[-1]["gain"] = 2.5
+        info[1]["cols"][2]["units"] = "pA"
+        MetaArray(sample_metaarray.asarray(), info=info).writeMeta(fn)
+
+        with h5py.File(fn, "r") as f:
+            assert {p: object_addr(f, p) for p in addrs} == addrs
+        read = MetaArray(file=fn)
+        assert read._info[-1] == {"note": "changed", "gain": 2.5}
+        assert read._info[1]["cols"][2] == {"name": "Current 0", "units": "pA"}
+        np.testing.assert_array_equal(read.xvals("Time"), sample_metaarray.xvals("Time"))
+        np.testing.assert_array_equal(read.asarray(), sample_metaarray.asarray())
+
+    def test_remove_and_retype(self, tmp_path, sample_metaarray):
+        fn = str(tmp_path / "meta.ma")
+        sample_metaarray.write(fn)
+        info = sample_metaarray.infoCopy()
+        del info[-1]["note"]
+        info[-1]["scales"] = [1, 2, 3]
+        info[1]["cols"] = info[1]["cols"][:2] + [{"name": "Current 0"}]
+        info[0]["values"] = info[0]["values"].astype(np.float32)
+        MetaArray(sample_metaarray.asarray(), info=info).writeMeta(fn)
+        read = MetaArray(file=fn)
+        assert read._info[-1] == {"scales": [1, 2, 3]}
+        assert read._info[1]["cols"][2] == {"name": "Current 0"}
+        assert read._info[0]["values"].dtype == np.float32
+
+    def test_extend_values(self, tmp_path, sample_metaarray):
+        """An extendable values data set is grown in place and only the new part is written."""
+        fn = str(tmp_path / "meta.ma")
+        sample_metaarray.write(fn, appendAxis="Time")
+        with h5py.File(fn, "r+") as f:
+            addr = object_addr(f, "info/0/values")
+            f["data"].resize(300, axis=0)
+        info = sample_metaarray.infoCopy()
+        info[0]["values"] = np.linspace(0, 1.5, 300)
+        MetaArray(np.zeros((300, 3)), info=info).writeMeta(fn)
+        with h5py.File(fn, "r") as f:
+            assert object_addr(f, "info/0/values") == addr
+        np.testing.assert_array_equal(MetaArray(file=fn).xvals("Time"), np.linspace(0, 1.5, 300))
+
+    def test_repack(self, tmp_path, sample_metaarray):
+        fn = str(tmp_path / "meta.ma")
+        info = sample_metaarray.infoCopy()
+        info[0]["big"] = np.random.normal(size=200000)
+        MetaArray(sample_metaarray.asarray(), info=info).write(fn)
+        del info[0]["big"]
+        MetaArray(sample_metaarray.asarray(), info=info).writeMeta(fn)
+        before = os.path.getsize(fn)
+        MetaArray(sample_metaarray.asarray(), info=info).writeMeta(fn, repack=True)
+        assert os.path.getsize(fn) < before / 4
+        assert not os.path.exists(fn + ".repack")
+        read = MetaArray(file=fn)
+        assert "big" not in read._info[0]
+        np.testing.assert_array_equal(read.asarray(), sample_metaarray.asarray())
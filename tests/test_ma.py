@@ -0,0 +1,176 @@
+"""
+Tests for reading and writing legacy .ma files.
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray, axis
+
+from .helpers import make_metaarray
+
+
+@pytest.fixture
+def dynamic_file(tmp_path):
+    """Write a dynamic-axis .ma file from 5 appended blocks of 10 frames."""
+    fn = str(tmp_path / "dynamic.ma")
+    for i in range(5):
+        make_metaarray(n=10, block=i, extra={"rig": 3}).writeMa(fn, appendAxis="Time")
+    return fn
+
+
+class TestDynamicRead:
+    """Test reading .ma files written with an appendable axis."""
+
+    def test_read_all(self, dynamic_file):
+        ma = MetaArray(file=dynamic_file)
+        assert ma.shape == (50, 3)
+        assert np.all(ma.asarray().ravel() == np.arange(150))
+        assert np.allclose(ma.xvals("Time"), np.arange(50) * 1e-3)
+        assert ma.listColumns("Signal") == ["Vm", "Im", "Cmd"]
+
+    def test_subset(self, dynamic_file):
+        """Only the frames in the subset are returned, with matching axis info."""
+        ma = MetaArray(file=dynamic_file, subset=(slice(15, 32), slice(1, 3)))
+        expected = np.arange(150).reshape(50, 3)[15:32, 1:3]
+        assert np.all(ma.asarray() == expected)
+        assert np.allclose(ma.xvals("Time"), np.arange(15, 32) * 1e-3)
+        assert ma.listColumns("Signal") == ["Im", "Cmd"]
+
+    def test_subset_reads_overlapping_blocks(self, dynamic_file, monkeypatch):
+        read = []
+        orig = MetaArray._readFrameBlock
+
+        def readFrameBlock(fd, meta, dynAxis, index, i, mmap=False):
+            read.append(i)
+            return orig(fd, meta, dynAxis, index, i, mmap)
+
+        monkeypatch.setattr(MetaArray, "_readFrameBlock", staticmethod(readFrameBlock))
+        MetaArray(file=dynamic_file, subset=(slice(15, 32),))
+        assert read == [1, 2, 3]
+
+    def test_mmap(self, dynamic_file):
+        """A subset within a single block is memory-mapped without copying."""
+        ma = MetaArray(file=dynamic_file, mmap=True, subset=(slice(12, 18),))
+        assert isinstance(ma.asarray(), np.memmap)
+        assert np.all(ma.asarray() == np.arange(150).reshape(50, 3)[12:18])
+        ma = MetaArray(file=dynamic_file, mmap=True)
+        assert np.all(ma.asarray().ravel() == np.arange(150))
+
+    def test_shape_without_data(self, dynamic_file):
+        ma = MetaArray(file=dynamic_file, readAllData=False)
+        assert ma.shape == (50, 3)
+        assert len(ma.xvals("Time")) == 50
+
+    def test_iter_frames(self, dynamic_file):
+        blocks = list(MetaArray.iterFrames(dynamic_file))
+        assert len(blocks) == 5
+        for i, block in enumerate(blocks):
+            expected = make_metaarray(n=10, block=i)
+            assert np.all(block.asarray() == expected.asarray())
+            assert np.allclose(block.xvals("Time"), expected.xvals("Time"))
+
+    def test_cached_index(self, dynamic_file):
+        """The frame index is stored in a sidecar file and rebuilt when the file changes."""
+        ma = MetaArray(file=dynamic_file, cacheIndex=True)
+        assert os.path.exists(dynamic_file + ".idx.npz")
+        assert np.all(MetaArray(file=dynamic_file, cacheIndex=True).asarray() == ma.asarray())
+        make_metaarray(n=10, block=5).writeMa(dynamic_file, appendAxis="Time")
+        ma = MetaArray(file=dynamic_file, cacheIndex=True)
+        assert ma.shape == (60, 3)
+        assert np.all(ma.asarray().ravel() == np.arange(180))
+
+
+class TestStreamingWrite:
+    """Test that .ma files are written without copying the array."""
+
+    def test_no_copy(self, tmp_path):
+        """Writing a contiguous array allocates far less than the array size."""
+        import tracemalloc
+
+        ma = MetaArray(np.random.normal(size=(1000000,)), info=[axis("Time", values=np.arange(1000000.0))])
+        fn = str(tmp_path / "big.ma")
+        tracemalloc.start()
+        try:
+            ma.writeMa(fn)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert peak < 1e6
+        ma2 = MetaArray(file=fn)
+        assert np.all(ma2.asarray() == ma.asarray())
+        assert np.all(ma2.xvals("Time") == ma.xvals("Time"))
+
+    def test_non_contiguous(self, tmp_path, monkeypatch):
+        """Non-contiguous arrays are written in blocks."""
+        monkeypatch.setattr(MetaArray, "writeBlockSize", 100)
+        data = np.arange(600.0).reshape(20, 30)[::2, 1::3]
+        ma = MetaArray(data, info=[axis("x"), axis("y")])
+        fn = str(tmp_path / "strided.ma")
+        ma.writeMa(fn)
+        assert np.all(MetaArray(file=fn).asarray() == data)
+
+    def test_dynamic_non_contiguous(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(MetaArray, "writeBlockSize", 100)
+        fn = str(tmp_path / "strided.ma")
+        full = np.arange(600.0).reshape(30, 20)
+        for i in range(3):
+            MetaArray(full[i * 10 : (i + 1) * 10, ::2], info=[axis("Time"), axis("y")]).writeMa(fn, appendAxis="Time")
+        assert np.all(MetaArray(file=fn).asarray() == full[:, ::2])
+
+    def test_lazy_hdf5_source(self, tmp_path, monkeypatch):
+        """Lazily read HDF5 arrays are copied to the .ma file block by block."""
+        pytest.importorskip("h5py")
+        monkeypatch.setattr(MetaArray, "writeBlockSize", 1000)
+        ma = make_metaarray(n=500)
+        h5 = str(tmp_path / "source.ma")
+        ma.write(h5)
+        lazy = MetaArray(file=h5, readAllData=False)
+        fn = str(tmp_path / "copy.ma")
+        lazy.writeMa(fn)
+        lazy._openFile.close()
+        ma2 = MetaArray(file=fn)
+        assert np.all(ma2.asarray() == ma.asarray())
+        assert np.allclose(ma2.xvals("Time"), ma.xvals("Time"))
+
+
+class TestCreate:
+    """Test preallocated, file-backed arrays."""
+
+    @pytest.mark.parametrize("format", ["hdf5", "ma"])
+    def test_create_and_fill(self, tmp_path, format):
+        if format == "hdf5":
+            pytest.importorskip("h5py")
+        fn = str(tmp_path / "prealloc.ma")
+        info = [axis("Time", values=np.arange(100) * 1e-3, units="s"), axis("Signal", cols=["Vm", "Im"])]
+        ma = MetaArray.create(fn, (100, 2), dtype=np.float32, info=info, format=format)
+        assert isinstance(ma.asarray(), np.memmap)
+        assert ma.shape == (100, 2)
+        ma[:50] = 1
+        ma[50:, "Im"] = 2
+        ma[50:, 0] = 3
+        ma.asarray().flush()
+        del ma
+
+        ma = MetaArray(file=fn, mmap=True)
+        assert isinstance(ma.asarray(), np.memmap)
+        assert ma.dtype == np.float32
+        assert np.all(ma[:50].asarray() == 1)
+        assert np.all(ma[50:, "Im"].asarray() == 2)
+        assert np.all(ma[50:, "Vm"].asarray() == 3)
+        assert np.allclose(ma.xvals("Time"), np.arange(100) * 1e-3)
+        assert ma.listColumns("Signal") == ["Vm", "Im"]
+
+    def test_bad_info(self, tmp_path):
+        with pytest.raises(ValueError):
+            MetaArray.create(str(tmp_path / "bad.ma"), (10, 2), info=[axis("Time", values=np.arange(5))], format="ma")
+
+    def test_mmap_offset(self, tmp_path):
+        """Memory-mapped .ma files start after the header and axis values."""
+        fn = str(tmp_path / "mapped.ma")
+        ma = make_metaarray(n=10)
+        ma.writeMa(fn)
+        ma2 = MetaArray(file=fn, mmap=True)
+        assert np.all(ma2.asarray() == ma.asarray())
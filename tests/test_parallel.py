@@ -0,0 +1,106 @@
+"""
+Tests for parallel compression of MetaArray HDF5 chunks.
+"""
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+
+h5py = pytest.importorskip("h5py")
+from MetaArray import parallel  # noqa: E402
+
+# a shape that is not a multiple of the chunk shape
+pytestmark = pytest.mark.sample(n=10007, dt=1e-4, cols=["a", "b", "c", "d", "e"])
+
+
+class TestParallelWrite:
+    """Test writing gzip chunks from a thread pool."""
+
+    def test_write(self, tmp_path, sample_metaarray):
+        """Chunks compressed in parallel are read back by HDF5's own gzip filter."""
+        fn = str(tmp_path / "parallel.ma")
+        sample_metaarray.write(fn, compression="gzip", chunkBytes=8000, workers=4)
+        with h5py.File(fn, "r") as f:
+            assert f["data"].compression == "gzip"
+            assert f["data"].chunks == (1000, 1)
+            assert np.all(f["data"][:] == sample_metaarray.asarray())
+        ma = MetaArray(file=fn)
+        assert np.all(ma.asarray() == sample_metaarray.asarray())
+        assert np.all(ma.xvals("Time") == sample_metaarray.xvals("Time"))
+
+    def test_compression_level(self, tmp_path, sample_metaarray, monkeypatch):
+        """The gzip level is taken from MetaArray.defaultCompression."""
+        monkeypatch.setattr(MetaArray, "defaultCompression", ("gzip", 9))
+        fn = str(tmp_path / "parallel.ma")
+        sample_metaarray.write(fn, workers=2)
+        with h5py.File(fn, "r") as f:
+            assert f["data"].compression_opts == 9
+            assert np.all(f["data"][:] == sample_metaarray.asarray())
+
+    def test_unsupported_filter(self, tmp_path, sample_metaarray):
+        """Data sets with other filters are written by HDF5 as usual."""
+        with h5py.File(str(tmp_path / "shuffle.h5"), "w") as f:
+            ds = f.create_dataset("data", shape=(10, 10), dtype=float, chunks=(5, 5), compression="gzip", shuffle=True)
+            assert not parallel.canCompressChunks(ds)
+            with pytest.raises(ValueError):
+                parallel.writeChunks(ds, np.zeros((10, 10)))
+
+    def test_chunk_offsets(self):
+        offsets = list(parallel.chunkOffsets((5, 3), (2, 2)))
+        assert offsets == [(0, 0), (0, 2), (2, 0), (2, 2), (4, 0), (4, 2)]
+
+
+class TestParallelRead:
+    """Test reading gzip chunks with decompression in a thread pool."""
+
+    @pytest.fixture
+    def gzip_file(self, tmp_path, sample_metaarray):
+        fn = str(tmp_path / "gzip.ma")
+        sample_metaarray.write(fn, compression="gzip", chunkBytes=8000)
+        return fn
+
+    def test_read_all(self, gzip_file, sample_metaarray):
+        ma = MetaArray(file=gzip_file, workers=4)
+        assert np.all(ma.asarray() == sample_metaarray.asarray())
+
+    def test_lazy_slices(self, gzip_file, sample_metaarray):
+        """Slices of lazily read arrays are decompressed in parallel."""
+        ma = MetaArray(file=gzip_file, readAllData=False, workers=4)
+        assert ma._readWorkers == 4
+        expected = sample_metaarray.asarray()
+        assert np.all(ma[1500:7321].asarray() == expected[1500:7321])
+        assert np.all(ma[:, "c"].asarray() == expected[:, 2])
+        assert np.all(ma[-5:, 1:3].asarray() == expected[-5:, 1:3])
+        assert ma[3, 4] == expected[3, 4]
+        assert np.all(ma.asarray() == expected)
+        # fancy indexing falls back to h5py
+        assert np.all(ma[[1, 5, 9]].asarray() == expected[[1, 5, 9]])
+        ma._openFile.close()
+
+    def test_read_into(self, gzip_file, sample_metaarray):
+        """Chunks can be assembled into a region of a preallocated array."""
+        out = np.zeros((3, 12000, 7))
+        with h5py.File(gzip_file, "r") as f:
+            parallel.readChunks(f["data"], (slice(100, 9100), 3), workers=3, out=out[1, 1000:10000, 2])
+        assert np.all(out[1, 1000:10000, 2] == sample_metaarray.asarray()[100:9100, 3])
+        assert np.all(out[1, :1000] == 0)
+        assert np.all(out[0] == 0)
+
+    def test_unwritten_chunks(self, tmp_path):
+        """Chunks that were never written are filled with the fill value."""
+        with h5py.File(str(tmp_path / "sparse.h5"), "w") as f:
+            ds = f.create_dataset("data", shape=(10, 10), dtype=float, chunks=(5, 5), compression="gzip", fillvalue=3)
+            ds[:5, :5] = 1
+            data = parallel.readChunks(ds, workers=2)
+        assert np.all(data[:5, :5] == 1)
+        assert np.all(data[5:] == 3)
+
+    def test_unsupported_filter(self, tmp_path, sample_metaarray):
+        """Data sets with filters we can't decode are read through h5py."""
+        fn = str(tmp_path / "lzf.ma")
+        sample_metaarray.write(fn, compression="lzf")
+        ma = MetaArray(file=fn, readAllData=False, workers=4)
+        assert ma._readWorkers is None
+        assert np.all(ma.asarray() == sample_metaarray.asarray())
+        ma._openFile.close()
@@ -0,0 +1,103 @@
+"""
+Tests for pickling MetaArrays.
+"""
+
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+
+
+def assert_same(ma, ma2):
+    assert np.all(ma2.asarray() == ma.asarray())
+    assert np.all(ma2.xvals("Time") == ma.xvals("Time"))
+    assert ma2.listColumns("Signal") == ma.listColumns("Signal")
+    assert ma2.infoCopy()[-1] == ma.infoCopy()[-1]
+
+
+class TestPickle:
+    """Test pickling of in-memory and file-backed MetaArrays."""
+
+    @pytest.mark.parametrize("protocol", [2, 4, 5])
+    def test_roundtrip(self, sample_metaarray, protocol):
+        ma2 = pickle.loads(pickle.dumps(sample_metaarray, protocol=protocol))
+        assert_same(sample_metaarray, ma2)
+
+    def test_out_of_band(self, sample_metaarray):
+        """With protocol 5, the data and axis values are passed as buffers without copying."""
+        buffers = []
+        s = pickle.dumps(sample_metaarray, protocol=5, buffer_callback=buffers.append)
+        assert len(buffers) == 2
+        assert len(s) < 1000
+        ma2 = pickle.loads(s, buffers=buffers)
+        assert_same(sample_metaarray, ma2)
+        assert np.shares_memory(ma2.asarray(), sample_metaarray.asarray())
+        assert np.shares_memory(ma2.xvals("Time"), sample_metaarray.xvals("Time"))
+
+    def test_non_contiguous(self, sample_metaarray):
+        ma = sample_metaarray[::2]
+        buffers = []
+        s = pickle.dumps(ma, protocol=5, buffer_callback=buffers.append)
+        ma2 = pickle.loads(s, buffers=buffers)
+        assert np.all(ma2.asarray() == ma.asarray())
+
+    def test_memmap_reference(self, tmp_path, sample_metaarray):
+        """Memory-mapped arrays and their contiguous slices are pickled as a reference to the file."""
+        fn = str(tmp_path / "test.ma")
+        sample_metaarray.writeMa(fn)
+        ma = MetaArray(file=fn, mmap=True)
+        for sub in (ma, ma[20:50], ma[7]):
+            s = pickle.dumps(sub, protocol=5)
+            assert b"_unpickleMemmap" in s
+            ma2 = pickle.loads(s)
+            assert np.all(ma2.asarray() == sub.asarray())
+            assert isinstance(ma2.asarray().base, np.memmap)
+        assert pickle.loads(pickle.dumps(ma[20:50])).xvals("Time")[0] == sample_metaarray.xvals("Time")[20]
+
+    def test_hdf5_reference(self, tmp_path, sample_metaarray):
+        """Lazily read HDF5 arrays are pickled as a reference and reopened when unpickled."""
+        pytest.importorskip("h5py")
+        fn = str(tmp_path / "test.ma")
+        sample_metaarray.write(fn)
+        ma = MetaArray(file=fn, readAllData=False)
+        s = pickle.dumps(ma, protocol=5)
+        assert len(s) < 1000
+        ma2 = pickle.loads(s)
+        assert_same(sample_metaarray, ma2)
+        ma._openFile.close()
+        ma2._openFile.close()
+
+    def test_copy_memmap(self, tmp_path, sample_metaarray):
+        """Deep copies of a writable memory-mapped array hold their own data."""
+        fn = str(tmp_path / "test.ma")
+        ma = MetaArray.create(fn, (10, 3), info=sample_metaarray[:10].infoCopy())
+        ma[:] = 1
+        c = copy.deepcopy(ma)
+        assert not isinstance(c.asarray(), np.memmap)
+        c[:] = 5
+        assert np.all(ma.asarray() == 1)
+        assert np.all(MetaArray(file=fn).asarray() == 1)
+        assert c.listColumns("Signal") == ma.listColumns("Signal")
+        assert c._info is not ma._info
+        # shallow copies share the data, as before
+        s = copy.copy(ma)
+        s[0] = 2
+        assert np.all(ma[0].asarray() == 2)
+
+    def test_baseline_pickle(self, sample_metaarray, monkeypatch):
+        """Pickles made before file-backed arrays were pickled by reference still load and work."""
+        # the previous release pickled the instance __dict__, which only held these attributes
+        old = MetaArray.__new__(MetaArray)
+        old.__dict__.update(_isHDF=False, _data=sample_metaarray.asarray(), _info=sample_metaarray._info)
+        with monkeypatch.context() as m:
+            m.setattr(MetaArray, "__reduce_ex__", object.__reduce_ex__)
+            s = pickle.dumps(old, protocol=2)
+
+        ma = pickle.loads(s)
+        assert_same(sample_metaarray, ma)
+        assert np.all(ma[10:20, "Voltage 1"].asarray() == sample_metaarray[10:20, "Voltage 1"].asarray())
+        assert ma.dtype == sample_metaarray.dtype
+        assert_same(sample_metaarray, pickle.loads(pickle.dumps(ma)))
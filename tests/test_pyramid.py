@@ -0,0 +1,149 @@
+"""
+Tests for multi-resolution pyramid levels stored in HDF5 files.
+"""
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray, axis
+from MetaArray import pyramid
+
+from .helpers import make_metaarray
+
+h5py = pytest.importorskip("h5py")
+
+
+def sine_and_ramp(frames):
+    return np.stack([np.sin(frames * 0.01), frames * 1.0], axis=1)
+
+
+SAMPLE = {"data": sine_and_ramp, "dt": 1e-3, "cols": [("Vm", "V"), ("Ramp", "V")], "extra": {"note": "pyramid"}}
+pytestmark = pytest.mark.sample(n=10000, **SAMPLE)
+
+
+def expected_level(data, factor):
+    n = data.shape[0]
+    bins = [data[i : i + factor] for i in range(0, n, factor)]
+    return {
+        "min": np.array([b.min(axis=0) for b in bins]),
+        "max": np.array([b.max(axis=0) for b in bins]),
+        "mean": np.array([b.mean(axis=0) for b in bins]),
+    }
+
+
+def check_levels(fn, ma, factors):
+    data = ma.asarray()
+    with h5py.File(fn, "r") as f:
+        for factor in factors:
+            lg = f["pyramid"][str(factor)]
+            exp = expected_level(data, factor)
+            for stat in ("min", "max", "mean"):
+                np.testing.assert_allclose(lg[stat][:], exp[stat])
+            np.testing.assert_array_equal(lg["values"][:], ma.xvals("Time")[::factor])
+
+
+class TestReduceBins:
+    def test_bins(self):
+        data = np.arange(20.0).reshape(10, 2)
+        bins = pyramid.reduceBins(data, 0, 4)
+        exp = expected_level(data, 4)
+        for stat in exp:
+            np.testing.assert_array_equal(bins[stat], exp[stat])
+
+    def test_other_axis_and_nan(self):
+        data = np.array([[1.0, np.nan, 3.0, 4.0, 5.0]])
+        bins = pyramid.reduceBins(data, 1, 2)
+        np.testing.assert_array_equal(bins["min"], [[1.0, 3.0, 5.0]])
+        np.testing.assert_array_equal(bins["max"], [[1.0, 4.0, 5.0]])
+
+
+class TestPyramidFile:
+    def test_write(self, tmp_path, sample_metaarray):
+        fn = str(tmp_path / "pyr.ma")
+        ma = sample_metaarray
+        ma.write(fn, pyramid=True)
+        assert pyramid.levels(fn) == [16, 256, 4096]
+        check_levels(fn, ma, [16, 256, 4096])
+        # the file reads as before
+        np.testing.assert_array_equal(MetaArray(file=fn).asarray(), ma.asarray())
+
+    def test_append(self, tmp_path):
+        fn = str(tmp_path / "pyr.ma")
+        make_metaarray(n=1000, **SAMPLE).write(fn, pyramid=(10, 64), appendAxis="Time")
+        # blocks that do not line up with the bins
+        for start, n in [(1000, 7), (1007, 150), (1157, 3), (1160, 843)]:
+            make_metaarray(n=n, start=start, **SAMPLE).write(fn, appendAxis="Time")
+        check_levels(fn, make_metaarray(n=2003, **SAMPLE), [10, 64])
+
+    def test_writer(self, tmp_path):
+        from MetaArray.writer import MetaArrayWriter
+
+        fn = str(tmp_path / "pyr.ma")
+        with MetaArrayWriter(fn, appendAxis="Time", pyramid=[8, 100]) as writer:
+            for i in range(9):
+                writer.write(make_metaarray(n=111, start=111 * i, **SAMPLE))
+                writer.flush()
+        check_levels(fn, make_metaarray(n=999, **SAMPLE), [8, 100])
+
+    def test_append_other_axis(self, tmp_path):
+        fn = str(tmp_path / "pyr.ma")
+
+        def block(chans):
+            info = [axis("Time", values=np.arange(100) * 1e-3), axis("Chan", values=chans), {}]
+            return MetaArray(np.zeros((100, len(chans))), info=info)
+
+        block([0, 1]).write(fn, pyramid=[10], stats=True)
+        with pytest.raises(ValueError):
+            block([2]).write(fn, appendAxis="Chan")
+        # the rejected block left the file as it was
+        ma = MetaArray(file=fn)
+        assert ma.shape == (100, 2)
+        np.testing.assert_array_equal(ma.xvals("Chan"), [0, 1])
+        assert ma.summaryStats()["count"] == 200
+        check_levels(fn, block([0, 1]), [10])
+
+    def test_read_overview(self, tmp_path):
+        fn = str(tmp_path / "pyr.ma")
+        ma = make_metaarray(n=100000, **SAMPLE)
+        ma.write(fn, pyramid=True)
+
+        factor, ov = MetaArray.readOverview(fn)
+        assert factor == 4096
+        assert ov["min"].shape == (25, 2)
+        assert ov["max"]._info[-1]["pyramidStat"] == "max"
+        assert ov["mean"].listColumns()["Signal"] == ["Vm", "Ramp"]
+        np.testing.assert_array_equal(ov["min"].xvals("Time"), ma.xvals("Time")[::4096])
+
+        # bins no wider than 0.5 s -> 256 samples per bin
+        factor, ov = MetaArray.readOverview(fn, start=10.0, stop=20.0, resolution=0.5)
+        assert factor == 256
+        t = ov["mean"].xvals("Time")
+        assert t[0] <= 10.0 < t[1] and t[-1] < 20.0
+        exp = expected_level(ma.asarray(), 256)
+        i0 = int(np.searchsorted(ma.xvals("Time")[::256], 10.0, side="right")) - 1
+        np.testing.assert_allclose(ov["max"].asarray(), exp["max"][i0 : i0 + len(t)])
+
+        # at least 1000 points in a 20 s range -> 16 samples per bin
+        factor, ov = MetaArray.readOverview(fn, start=0, stop=20.0, minPoints=1000)
+        assert factor == 16
+        assert ov["min"].shape[0] == 1250
+
+        # nothing fine enough: full resolution
+        factor, ov = MetaArray.readOverview(fn, start=1.0, stop=1.1, minPoints=50)
+        assert factor == 1
+        np.testing.assert_array_equal(ov["min"].asarray(), ma["Time":1.0:1.1].asarray())
+
+    def test_with_quantize_and_stats(self, tmp_path):
+        fn = str(tmp_path / "pyr.ma")
+        ma = make_metaarray(n=1000, **SAMPLE)
+        ma.write(fn, pyramid=[10], quantize="int16", stats=True)
+        # levels are computed from the values before they are quantized
+        check_levels(fn, ma, [10])
+        assert MetaArray(file=fn, readAllData=False).summaryStats()["Ramp"]["max"] == 999.0
+
+    def test_no_pyramid(self, tmp_path):
+        fn = str(tmp_path / "plain.ma")
+        make_metaarray(n=100, **SAMPLE).write(fn)
+        assert pyramid.levels(fn) == []
+        with pytest.raises(Exception):
+            MetaArray.readOverview(fn)
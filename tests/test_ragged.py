@@ -0,0 +1,109 @@
+"""
+Tests for ragged collections of variable-length MetaArrays.
+"""
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray, axis
+from MetaArray.ragged import RaggedMetaArray
+
+from .helpers import SIGNALS, make_metaarray
+
+
+@pytest.fixture
+def trials():
+    return [make_metaarray(n=n, seed=i, cols=SIGNALS[:2], extra={"trial": i}) for i, n in enumerate([5, 3, 0, 7])]
+
+
+class TestRaggedMetaArray:
+    def test_from_list(self, trials):
+        rag = RaggedMetaArray.fromList(trials, axis="Time")
+        assert len(rag) == 4
+        np.testing.assert_array_equal(rag.offsets, [0, 5, 8, 8, 15])
+        np.testing.assert_array_equal(rag.lengths(), [5, 3, 0, 7])
+        assert rag.data.shape == (15, 2)
+        for orig, trial in zip(trials, rag):
+            np.testing.assert_array_equal(trial.asarray(), orig.asarray())
+            np.testing.assert_array_equal(trial.xvals("Time"), orig.xvals("Time"))
+            assert trial.listColumns() == orig.listColumns()
+            assert trial._info[-1] == orig._info[-1]
+        assert rag[-1]._info[-1]["trial"] == 3
+
+    def test_zero_copy(self, trials):
+        rag = RaggedMetaArray.fromList(trials)
+        trial = rag[1]
+        assert np.shares_memory(trial.asarray(), rag.data.asarray())
+        assert np.shares_memory(trial.xvals("Time"), rag.data.xvals("Time"))
+        with pytest.raises(IndexError):
+            rag[4]
+
+    def test_slice(self, trials):
+        sub = RaggedMetaArray.fromList(trials)[1:3]
+        assert len(sub) == 2
+        np.testing.assert_array_equal(sub.offsets, [0, 3, 3])
+        np.testing.assert_array_equal(sub[0].asarray(), trials[1].asarray())
+        assert sub[0]._info[-1] == {"trial": 1}
+
+    def test_reductions(self, trials):
+        rag = RaggedMetaArray.fromList(trials)
+        sums = rag.sum()
+        assert sums.shape == (4, 2)
+        assert sums.axisName(0) == "Trial"
+        assert sums.listColumns()["Signal"] == ["Vm", "Im"]
+        for i, orig in enumerate(trials):
+            np.testing.assert_allclose(sums[i].asarray(), orig.asarray().sum(axis=0))
+        means = rag.mean().asarray()
+        mins = rag.min().asarray()
+        np.testing.assert_allclose(means[3], trials[3].asarray().mean(axis=0))
+        np.testing.assert_allclose(mins[0], trials[0].asarray().min(axis=0))
+        assert np.isnan(means[2]).all() and np.isnan(mins[2]).all()
+        np.testing.assert_array_equal(rag.reduce(np.maximum).asarray()[1], trials[1].asarray().max(axis=0))
+
+    def test_other_axis(self):
+        arrays = [MetaArray(np.ones((2, n)), info=[axis("Channel"), axis("Time")]) for n in (3, 4)]
+        rag = RaggedMetaArray.fromList(arrays, axis="Time")
+        assert rag.axis == 1
+        assert rag[1].shape == (2, 4)
+        np.testing.assert_array_equal(rag.sum().asarray(), [[3, 4], [3, 4]])
+
+    def test_mismatched_shapes(self):
+        with pytest.raises(ValueError):
+            RaggedMetaArray.fromList([MetaArray(np.ones((3, 2))), MetaArray(np.ones((3, 3)))])
+        with pytest.raises(ValueError):
+            RaggedMetaArray(MetaArray(np.ones((5, 2))), [0, 2, 4])
+
+
+class TestRaggedFile:
+    @pytest.fixture(autouse=True)
+    def require_hdf5(self):
+        pytest.importorskip("h5py")
+
+    def test_roundtrip(self, tmp_path, trials):
+        path = str(tmp_path / "ragged.ma")
+        RaggedMetaArray.fromList(trials).write(path, compression="gzip")
+        rag = RaggedMetaArray.readFile(path)
+        assert len(rag) == 4
+        np.testing.assert_array_equal(rag.offsets, [0, 5, 8, 8, 15])
+        for orig, trial in zip(trials, rag):
+            np.testing.assert_array_equal(trial.asarray(), orig.asarray())
+            np.testing.assert_array_equal(trial.xvals("Time"), orig.xvals("Time"))
+            assert trial._info[-1] == orig._info[-1]
+        # a plain reader sees all trials concatenated
+        plain = MetaArray(file=path)
+        assert plain.shape == (15, 2)
+
+    def test_lazy(self, tmp_path, trials):
+        path = str(tmp_path / "ragged.ma")
+        RaggedMetaArray.fromList(trials).write(path)
+        rag = RaggedMetaArray.readFile(path, readAllData=False)
+        with rag.data:
+            assert not isinstance(rag.data._data, np.ndarray)
+            np.testing.assert_array_equal(rag[3].asarray(), trials[3].asarray())
+            np.testing.assert_allclose(rag.sum()[0].asarray(), trials[0].asarray().sum(axis=0))
+
+    def test_not_ragged(self, tmp_path):
+        path = str(tmp_path / "plain.ma")
+        make_metaarray(n=3, cols=SIGNALS[:2]).write(path)
+        with pytest.raises(Exception):
+            RaggedMetaArray.readFile(path)
@@ -0,0 +1,72 @@
+"""
+Tests for reading files in parallel worker processes.
+"""
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+from MetaArray.readpool import ReaderPool
+
+from .helpers import make_metaarray
+
+
+@pytest.fixture
+def sample_files(tmp_path):
+    """Write 6 files, alternating between HDF5 (when available) and legacy .ma formats."""
+    try:
+        import h5py  # noqa: F401
+
+        formats = ["hdf5", "ma"]
+    except ImportError:
+        formats = ["ma"]
+    files = []
+    arrays = []
+    for i in range(6):
+        ma = make_metaarray(n=200, seed=i, cols=[("Voltage 0", "V"), ("Current 0", "A")], extra={"index": i})
+        fn = str(tmp_path / f"{i}.ma")
+        if formats[i % len(formats)] == "hdf5":
+            ma.write(fn, compression="gzip")
+        else:
+            ma.writeMa(fn)
+        files.append(fn)
+        arrays.append(ma)
+    return files, arrays
+
+
+class TestReaderPool:
+    """Test ReaderPool and MetaArray.readMany()."""
+
+    def test_read_many(self, sample_files):
+        files, arrays = sample_files
+        with ReaderPool(workers=2) as pool:
+            results = pool.readMany(files)
+        for ma, res in zip(arrays, results):
+            assert np.all(res.asarray() == ma.asarray())
+            assert np.all(res.xvals("Time") == ma.xvals("Time"))
+            assert res.infoCopy()[-1] == ma.infoCopy()[-1]
+
+    def test_subset(self, sample_files):
+        files, arrays = sample_files
+        with ReaderPool(workers=2) as pool:
+            results = pool.readMany(files, subset=(slice(50, 80), "Current 0"))
+            # the pool is reused between calls
+            results2 = pool.readMany(files[:2])
+        for ma, res in zip(arrays, results):
+            assert res.shape == (30,)
+            assert np.all(res.asarray() == ma[50:80, "Current 0"].asarray())
+            assert np.all(res.xvals("Time") == ma.xvals("Time")[50:80])
+        assert np.all(results2[1].asarray() == arrays[1].asarray())
+
+    def test_missing_file(self, sample_files, tmp_path):
+        files, arrays = sample_files
+        with ReaderPool(workers=2) as pool:
+            with pytest.raises(FileNotFoundError):
+                pool.readMany(files + [str(tmp_path / "missing.ma")])
+
+    def test_metaarray_read_many(self, sample_files):
+        files, arrays = sample_files
+        results = MetaArray.readMany(files, workers=2)
+        assert [r.infoCopy(-1)["index"] for r in results] == list(range(6))
+        for r, ma in zip(results, arrays):
+            assert np.all(r.asarray() == ma.asarray())
@@ -0,0 +1,152 @@
+"""
+Tests for scaled-integer (quantized) storage.
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray, axis
+from MetaArray import scaled
+
+from .helpers import SIGNALS, make_metaarray
+
+h5py = pytest.importorskip("h5py")
+
+
+def signals(frames):
+    # columns spanning very different ranges, and a constant one
+    t = frames * 1e-4
+    return np.stack([np.sin(t * 50) * 0.1, np.cos(t * 30) * 1e-9, np.full(len(t), 2.5)], axis=1)
+
+
+SAMPLE = {"data": signals, "dt": 1e-4, "cols": SIGNALS, "extra": {"note": "scaled"}}
+pytestmark = pytest.mark.sample(n=1000, **SAMPLE)
+
+
+def with_gain(ma):
+    # columns with a fixed scale, as given by a digitizer's gain
+    for col, gain in zip(ma._info[1]["cols"], [1e-5, 1e-13, 1e-3]):
+        col["scale"] = gain
+    return ma
+
+
+def max_error(ma, col):
+    # half of one quantization step
+    return ma._info[1]["cols"][col]["scale"] / 2 * 1.0001
+
+
+class TestEncode:
+    def test_encode_decode(self, sample_metaarray):
+        ma = sample_metaarray
+        enc = scaled.encode(ma, "int16")
+        assert enc.dtype == np.int16
+        assert enc._info[1]["encoding"] == "scaleOffset"
+        dec = scaled.decode(enc)
+        assert dec.dtype == np.float64
+        for j in range(3):
+            err = np.abs(dec.asarray()[:, j] - ma.asarray()[:, j]).max()
+            assert err <= max_error(enc, j)
+        np.testing.assert_array_equal(dec.asarray()[:, 2], 2.5)
+
+    def test_given_scale(self):
+        raw = np.array([[0, 10], [-5, 20]], dtype=np.int16)
+        cols = [{"name": "a", "scale": 0.5, "offset": 1.0}, {"name": "b", "scale": 2.0}]
+        ma = MetaArray(raw, info=[axis("Time"), {"name": "Signal", "cols": cols}])
+        enc = scaled.encode(ma, "int16")
+        np.testing.assert_array_equal(enc.asarray(), raw)
+        np.testing.assert_array_equal(scaled.decode(enc).asarray(), [[1.0, 20.0], [-1.5, 40.0]])
+
+        # float data with a given scale is encoded with that scale
+        enc = scaled.encode(scaled.decode(enc), "int16")
+        np.testing.assert_array_equal(enc.asarray(), raw)
+
+    def test_errors(self, sample_metaarray):
+        with pytest.raises(ValueError):
+            scaled.encode(MetaArray(np.zeros((3, 2))), "int16")
+        with pytest.raises(ValueError):
+            scaled.encode(sample_metaarray, "float32")
+        ma = sample_metaarray
+        ma.asarray()[0, 0] = np.nan
+        with pytest.raises(ValueError):
+            scaled.encode(ma, "int16")
+
+
+class TestScaledFile:
+    def test_roundtrip(self, tmp_path, sample_metaarray):
+        path = str(tmp_path / "scaled.ma")
+        ma = sample_metaarray
+        ma.write(path, quantize="int16")
+        with h5py.File(path, "r") as f:
+            assert f["data"].dtype == np.int16
+
+        read = MetaArray(file=path)
+        assert read.dtype == np.float64
+        assert read.listColumns() == ma.listColumns()
+        np.testing.assert_array_equal(read.xvals("Time"), ma.xvals("Time"))
+        for j in range(3):
+            assert np.abs(read.asarray()[:, j] - ma.asarray()[:, j]).max() <= max_error(read, j)
+
+        raw = MetaArray(file=path, raw=True)
+        assert raw.dtype == np.int16
+        np.testing.assert_array_equal(scaled.decode(raw).asarray(), read.asarray())
+
+    def test_lazy_decode(self, tmp_path, sample_metaarray):
+        path = str(tmp_path / "scaled.ma")
+        sample_metaarray.write(path, quantize="int16", compression="gzip")
+        full = MetaArray(file=path)
+        with MetaArray(file=path, readAllData=False) as lazy:
+            assert lazy.dtype == np.float64
+            np.testing.assert_array_equal(lazy[100:200].asarray(), full[100:200].asarray())
+            np.testing.assert_array_equal(lazy[:, "Im"].asarray(), full[:, "Im"].asarray())
+            np.testing.assert_array_equal(lazy[5, 1], full[5, 1])
+            np.testing.assert_array_equal(lazy.asarray(), full.asarray())
+            restored = pickle.loads(pickle.dumps(lazy))
+            np.testing.assert_array_equal(restored.asarray(), full.asarray())
+            transposed = lazy.transpose(1, 0)
+            assert transposed.dtype == np.float64
+            np.testing.assert_array_equal(transposed.asarray(), full.asarray().T)
+
+    def test_mmap_and_select(self, tmp_path, sample_metaarray):
+        path = str(tmp_path / "scaled.ma")
+        sample_metaarray.write(path, quantize="int16", mappable=True)
+        full = MetaArray(file=path)
+        mapped = MetaArray(file=path, mmap=True)
+        np.testing.assert_array_equal(mapped[10:20, "Vm"].asarray(), full[10:20, "Vm"].asarray())
+        np.testing.assert_allclose(mapped.mean(), full.asarray().mean())
+        np.testing.assert_array_equal(pickle.loads(pickle.dumps(mapped)).asarray(), full.asarray())
+
+        part = MetaArray(file=path, select={"Signal": ["Cmd", "Vm"], "Time": (0.001, 0.002)})
+        np.testing.assert_array_equal(part.asarray(), full["Time":0.001:0.002].asarray()[:, [2, 0]])
+        with pytest.raises(ValueError):
+            MetaArray(file=path, writable=True)
+
+    def test_append(self, tmp_path, sample_metaarray):
+        path = str(tmp_path / "scaled.ma")
+        with_gain(make_metaarray(n=500, **SAMPLE)).write(path, quantize="int16", appendAxis="Time")
+        make_metaarray(n=500, start=500, **SAMPLE).write(path, appendAxis="Time")
+        read = MetaArray(file=path)
+        ma = sample_metaarray
+        assert read.shape == (1000, 3)
+        for j in range(3):
+            assert np.abs(read.asarray()[:, j] - ma.asarray()[:, j]).max() <= max_error(read, j)
+
+        # values beyond the range of the stored integers are clipped
+        block = make_metaarray(n=10, start=1000, **SAMPLE)
+        block.asarray()[:, 0] = 1.0
+        block.write(path, appendAxis="Time")
+        np.testing.assert_allclose(MetaArray(file=path)[1000:, "Vm"].asarray(), 32767 * 1e-5)
+
+    def test_writer(self, tmp_path, sample_metaarray):
+        from MetaArray.writer import MetaArrayWriter
+
+        path = str(tmp_path / "scaled.ma")
+        with MetaArrayWriter(path, appendAxis="Time", quantize="int16") as writer:
+            for i in range(4):
+                writer.write(with_gain(make_metaarray(n=250, start=250 * i, **SAMPLE)))
+                writer.flush()
+        read = MetaArray(file=path)
+        with h5py.File(path, "r") as f:
+            assert f["data"].dtype == np.int16
+        np.testing.assert_allclose(read.asarray(), sample_metaarray.asarray(), atol=max_error(read, 0))
@@ -0,0 +1,73 @@
+"""
+Tests for reading part of a file with MetaArray(file=..., select=...).
+"""
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+
+from .helpers import channels
+
+# sequential values in 16 named channels
+pytestmark = pytest.mark.sample(seed=None, n=1000, dt=1e-3, cols=channels(16))
+
+
+def write_file(ma, fn, fmt):
+    if fmt == "hdf5":
+        pytest.importorskip("h5py")
+        ma.write(fn, access="column", compression="gzip")
+    elif fmt == "hdf5-contiguous":
+        pytest.importorskip("h5py")
+        ma.write(fn, mappable=True)
+    elif fmt == "ma":
+        ma.writeMa(fn)
+    elif fmt == "ma-dynamic":
+        for i in range(0, ma.shape[0], 250):
+            ma[i : i + 250].writeMa(fn, appendAxis="Time")
+    return fn
+
+
+@pytest.mark.parametrize("fmt", ["hdf5", "hdf5-contiguous", "ma", "ma-dynamic"])
+class TestSelect:
+    """Test named-axis selections at open time for each file format."""
+
+    def test_names_and_ranges(self, tmp_path, sample_metaarray, fmt):
+        fn = write_file(sample_metaarray, str(tmp_path / "test.ma"), fmt)
+        ma = MetaArray(file=fn, select={"Time": (0.5, 0.6), "Signal": ["ch9", "ch2"]})
+        assert ma.shape == (100, 2)
+        assert np.all(ma.asarray() == sample_metaarray.asarray()[500:600][:, [9, 2]])
+        assert np.allclose(ma.xvals("Time"), np.arange(500, 600) * 1e-3)
+        assert ma.listColumns("Signal") == ["ch9", "ch2"]
+        assert ma.columnUnits("Signal", "ch2") == "V"
+        assert ma.infoCopy()[-1]["note"] == "test data"
+
+    def test_single_column(self, tmp_path, sample_metaarray, fmt):
+        """Selecting one column by name removes the axis, as indexing does."""
+        fn = write_file(sample_metaarray, str(tmp_path / "test.ma"), fmt)
+        ma = MetaArray(file=fn, select={"Signal": "ch3", "Time": (None, 0.01)})
+        expected = sample_metaarray[:10, "ch3"]
+        assert ma.shape == (10,)
+        assert np.all(ma.asarray() == expected.asarray())
+        assert ma.infoCopy()[-1]["cols"] == expected.infoCopy()[-1]["cols"]
+
+    def test_indexes(self, tmp_path, sample_metaarray, fmt):
+        fn = write_file(sample_metaarray, str(tmp_path / "test.ma"), fmt)
+        ma = MetaArray(file=fn, select={0: [700, 5, 260], 1: slice(3, 9, 2)})
+        assert np.all(ma.asarray() == sample_metaarray.asarray()[[700, 5, 260]][:, 3:9:2])
+        assert np.allclose(ma.xvals(0), [0.7, 0.005, 0.26])
+        assert ma.listColumns(1) == ["ch3", "ch5", "ch7"]
+
+    def test_mmap(self, tmp_path, sample_metaarray, fmt):
+        fn = write_file(sample_metaarray, str(tmp_path / "test.ma"), fmt)
+        ma = MetaArray(file=fn, select={"Time": (0.25, 0.75)}, mmap=True)
+        assert np.all(ma.asarray() == sample_metaarray.asarray()[250:750])
+
+    def test_errors(self, tmp_path, sample_metaarray, fmt):
+        fn = write_file(sample_metaarray, str(tmp_path / "test.ma"), fmt)
+        with pytest.raises(Exception):
+            MetaArray(file=fn, select={"Signal": "missing"})
+        with pytest.raises(Exception):
+            MetaArray(file=fn, select={"Signal": (0.0, 1.0)})
+        with pytest.raises(ValueError):
+            MetaArray(file=fn, select={"Signal": "ch1"}, writable=True)
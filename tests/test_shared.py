@@ -0,0 +1,91 @@
+"""
+Tests for placing MetaArrays in shared memory.
+"""
+
+import gc
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+
+
+def sum_window(handle):
+    """Worker: attach to a shared array, modify it, and return the sum of a slice."""
+    ma = MetaArray.fromShared(handle)
+    ma[0, 0] = -1.0
+    return float(ma[50:, "Voltage 1"].asarray().sum())
+
+
+class TestShared:
+    """Test MetaArray.toShared() / MetaArray.fromShared()."""
+
+    def test_roundtrip(self, sample_metaarray):
+        with sample_metaarray.toShared() as handle:
+            ma = MetaArray.fromShared(handle)
+            assert np.all(ma.asarray() == sample_metaarray.asarray())
+            assert np.all(ma.xvals("Time") == sample_metaarray.xvals("Time"))
+            assert ma.listColumns("Signal") == sample_metaarray.listColumns("Signal")
+            assert ma.infoCopy()[-1] == {"note": "test data"}
+
+    def test_shared_views(self, sample_metaarray):
+        """Arrays attached to the same segment share their data, and slices outlive their parent."""
+        with sample_metaarray.toShared() as handle:
+            ma1 = MetaArray.fromShared(handle)
+            ma2 = MetaArray.fromShared(handle.name)
+            sub = ma1[10:20]
+            del ma1
+            gc.collect()
+            ma2[15, 1] = 123.0
+            assert sub[5, 1] == 123.0
+            assert sample_metaarray[15, 1] != 123.0
+
+    def test_pickle_handle(self, sample_metaarray):
+        """Only the name of the segment is pickled, and only the owner can unlink it."""
+        handle = sample_metaarray.toShared()
+        handle2 = pickle.loads(pickle.dumps(handle))
+        assert handle2.name == handle.name
+        with pytest.raises(Exception):
+            handle2.unlink()
+        assert np.all(MetaArray.fromShared(handle2).asarray() == sample_metaarray.asarray())
+        handle.unlink()
+        with pytest.raises(FileNotFoundError):
+            MetaArray.fromShared(handle2)
+
+    def test_processes(self, sample_metaarray):
+        expected = sample_metaarray[50:, "Voltage 1"].asarray().sum()
+        ctx = multiprocessing.get_context("spawn")
+        with sample_metaarray.toShared() as handle:
+            with ctx.Pool(2) as pool:
+                results = pool.map(sum_window, [handle] * 4)
+            assert np.allclose(results, expected)
+            assert MetaArray.fromShared(handle)[0, 0] == -1.0
+
+    def test_attach_from_unrelated_process(self, sample_metaarray):
+        """A process that attaches by name and exits does not remove the owner's segment."""
+        import MetaArray as package
+
+        handle = sample_metaarray.toShared()
+        code = (
+            "import sys; from MetaArray import MetaArray; "
+            "print(float(MetaArray.fromShared(sys.argv[1]).asarray().sum()))"
+        )
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(package.__file__)))
+        out = subprocess.run(
+            [sys.executable, "-c", code, handle.name], env=env, capture_output=True, text=True, check=True
+        )
+        assert float(out.stdout) == pytest.approx(sample_metaarray.asarray().sum())
+        assert "leaked" not in out.stderr
+        assert np.all(MetaArray.fromShared(handle.name).asarray() == sample_metaarray.asarray())
+        handle.unlink()
+
+    def test_unlink_removed_segment(self, sample_metaarray):
+        handle = sample_metaarray.toShared()
+        ma = pickle.loads(pickle.dumps(handle)).attach(unlink=True)
+        handle.unlink()
+        assert np.all(ma.asarray() == sample_metaarray.asarray())
@@ -0,0 +1,143 @@
+"""
+Tests for summary statistics stored at write time.
+"""
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+from MetaArray import stats
+
+from .helpers import make_metaarray
+
+h5py = pytest.importorskip("h5py")
+
+
+def ramps(frames):
+    # rising and falling ramps, and a ramp with a NaN every 10 frames
+    return np.stack([frames * 1.0, -frames * 2.0, np.where(frames % 10 == 0, np.nan, frames)], axis=1)
+
+
+SAMPLE = {"data": ramps, "dt": 1e-3, "cols": [("a", "V"), ("b", "A"), ("c", "V")], "extra": None}
+pytestmark = pytest.mark.sample(**SAMPLE)
+
+
+def expected(data):
+    return {
+        "min": float(np.nanmin(data)),
+        "max": float(np.nanmax(data)),
+        "mean": float(np.nanmean(data)),
+        "count": int(np.sum(~np.isnan(data))),
+        "nanCount": int(np.sum(np.isnan(data))),
+    }
+
+
+def assert_stats(actual, data):
+    exp = expected(data)
+    assert actual["count"] == exp["count"]
+    assert actual["nanCount"] == exp["nanCount"]
+    for k in ("min", "max", "mean"):
+        assert actual[k] == pytest.approx(exp[k])
+
+
+class TestComputeStats:
+    def test_columns(self, sample_metaarray):
+        ma = sample_metaarray
+        result = stats.computeStats(ma.asarray(), axis=1)
+        for j in range(3):
+            assert_stats(result[j], ma.asarray()[:, j])
+
+    def test_whole_array_and_ints(self):
+        data = np.arange(12).reshape(3, 4)
+        assert_stats(stats.computeStats(data), data.astype(float))
+
+    def test_empty_and_all_nan(self):
+        s = stats.computeStats(np.full((3, 2), np.nan), axis=1)[0]
+        assert s["count"] == 0 and s["nanCount"] == 3 and np.isnan(s["min"]) and np.isnan(s["mean"])
+        s = stats.computeStats(np.zeros((0, 2)), axis=1)[1]
+        assert s["count"] == 0 and s["nanCount"] == 0
+
+    def test_merge(self):
+        a = np.array([1.0, np.nan, 5.0])
+        b = np.array([-2.0, 7.0])
+        merged = stats.mergeStats(stats.computeStats(a), stats.computeStats(b))
+        assert_stats(merged, np.concatenate([a, b]))
+        empty = stats.computeStats(np.array([np.nan]))
+        assert stats.mergeStats(empty, stats.computeStats(b))["mean"] == pytest.approx(2.5)
+
+
+class TestStoredStats:
+    def test_write_and_read_header(self, tmp_path, sample_metaarray):
+        path = str(tmp_path / "stats.ma")
+        ma = sample_metaarray
+        ma.write(path, stats=True)
+        with MetaArray(file=path, readAllData=False) as lazy:
+            result = lazy.summaryStats()
+        assert list(result) == ["a", "b", "c"]
+        for j, name in enumerate("abc"):
+            assert_stats(result[name], ma.asarray()[:, j])
+        assert ma.summaryStats() is None
+        assert "stats" not in ma._info[1]["cols"][0]
+
+    def test_no_columns(self, tmp_path):
+        path = str(tmp_path / "stats.ma")
+        data = np.random.normal(size=(20, 5))
+        MetaArray(data).write(path, stats=True)
+        assert_stats(MetaArray(file=path).summaryStats(), data)
+
+    def test_append(self, tmp_path):
+        path = str(tmp_path / "stats.ma")
+        make_metaarray(n=100, **SAMPLE).write(path, stats=True, appendAxis="Time")
+        make_metaarray(n=50, start=100, **SAMPLE).write(path, appendAxis="Time")
+        read = MetaArray(file=path)
+        assert read.shape == (150, 3)
+        full = make_metaarray(n=150, **SAMPLE).asarray()
+        for j, name in enumerate("abc"):
+            assert_stats(read.summaryStats()[name], full[:, j])
+
+    def test_writer(self, tmp_path):
+        from MetaArray.writer import MetaArrayWriter
+
+        path = str(tmp_path / "stats.ma")
+        with MetaArrayWriter(path, appendAxis="Time", stats=True) as writer:
+            for i in range(5):
+                writer.write(make_metaarray(n=40, start=40 * i, **SAMPLE))
+                writer.flush()
+        full = make_metaarray(n=200, **SAMPLE).asarray()
+        result = MetaArray(file=path, readAllData=False).summaryStats()
+        for j, name in enumerate("abc"):
+            assert_stats(result[name], full[:, j])
+
+    def test_swmr_writer(self, tmp_path):
+        from MetaArray.writer import MetaArrayWriter
+
+        path = str(tmp_path / "stats.ma")
+        with MetaArrayWriter(path, appendAxis="Time", stats=True, swmr=True) as writer:
+            for i in range(3):
+                writer.write(make_metaarray(n=40, start=40 * i, **SAMPLE))
+                writer.flush()
+        assert_stats(MetaArray(file=path).summaryStats()["b"], make_metaarray(n=120, **SAMPLE).asarray()[:, 1])
+
+    def test_quantized(self, tmp_path, sample_metaarray):
+        # statistics describe the values written, not the stored integers
+        path = str(tmp_path / "stats.ma")
+        ma = sample_metaarray
+        ma.asarray()[:, 2] = 0.5
+        ma.write(path, stats=True, quantize="int16")
+        result = MetaArray(file=path, raw=True).summaryStats()
+        assert_stats(result["b"], ma.asarray()[:, 1])
+        assert result["c"]["max"] == 0.5
+
+    def test_quantized_raw_append(self, tmp_path, sample_metaarray):
+        # raw integers appended to a scaled file are decoded before their statistics are merged
+        path = str(tmp_path / "stats.ma")
+        ma = sample_metaarray
+        ma.asarray()[:, 2] = 0.5
+        ma.write(path, stats=True, quantize="int16", appendAxis="Time")
+        raw = MetaArray(file=path, raw=True)
+        raw.write(path, appendAxis="Time")
+        result = MetaArray(file=path, readAllData=False).summaryStats()
+        decoded = MetaArray(file=path).asarray()
+        assert decoded.shape == (200, 3)
+        assert_stats(result["a"], decoded[:, 0])
+        assert_stats(result["b"], decoded[:, 1])
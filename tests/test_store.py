@@ -0,0 +1,158 @@
+"""
+Tests for storing many MetaArrays in one HDF5 file.
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+
+h5py = pytest.importorskip("h5py")
+
+from MetaArray.store import MetaArrayStore, metaDigest  # noqa: E402
+
+from .helpers import make_metaarray  # noqa: E402
+
+
+def assert_same(a, b):
+    np.testing.assert_array_equal(a.asarray(), b.asarray())
+    assert a.listColumns() == b.listColumns()
+    np.testing.assert_array_equal(a.xvals("Time"), b.xvals("Time"))
+    assert a.infoCopy()[-1] == b.infoCopy()[-1]
+
+
+class TestMetaArrayStore:
+    def test_roundtrip(self, tmp_path):
+        path = tmp_path / "store.h5"
+        trials = [make_metaarray(seed=i, extra={"trial": i}) for i in range(5)]
+        with MetaArrayStore(path) as store:
+            for i, trial in enumerate(trials):
+                store[f"trial{i}"] = trial
+        with MetaArrayStore(path, mode="r") as store:
+            assert len(store) == 5
+            assert store.keys() == [f"trial{i}" for i in range(5)]
+            assert "trial3" in store and "trial9" not in store
+            for i in (3, 0, 4):
+                assert_same(store[f"trial{i}"], trials[i])
+            assert store.shape("trial2") == (100, 3)
+            assert store.dtype("trial2") == np.float64
+
+    def test_shared_meta_stored_once(self, tmp_path):
+        path = tmp_path / "store.h5"
+        with MetaArrayStore(path) as store:
+            for i in range(20):
+                store[f"t{i}"] = make_metaarray(seed=i, extra={"trial": i})
+            # one Time axis, one Signal axis, one column table and 20 extra info dicts
+            assert store.numMeta() == 23
+            store["other"] = make_metaarray(n=50, seed=0, extra={"trial": 0})
+            assert store.numMeta() == 24
+        with h5py.File(path, "r") as f:
+            assert len(f["meta"]) == 24
+
+    def test_metadata_does_not_read_data(self, tmp_path, monkeypatch):
+        path = tmp_path / "store.h5"
+        with MetaArrayStore(path) as store:
+            for i in range(3):
+                store[f"t{i}"] = make_metaarray(seed=i, extra={"trial": i})
+
+        reads = []
+        orig = h5py.Dataset.__getitem__
+
+        def getitem(self, sel):
+            reads.append(self.name)
+            return orig(self, sel)
+
+        monkeypatch.setattr(h5py.Dataset, "__getitem__", getitem)
+        with MetaArrayStore(path, mode="r") as store:
+            for key in store:
+                info = store.info(key)
+                assert info[-1]["trial"] == int(key[1:])
+                assert [c["name"] for c in info[1]["cols"]] == ["Vm", "Im", "Cmd"]
+                store.shape(key)
+            assert not any(name.endswith("/data") for name in reads)
+            store["t1"]
+            assert "/arrays/t1/data" in reads
+
+    def test_info_is_a_copy(self, tmp_path):
+        with MetaArrayStore(tmp_path / "store.h5") as store:
+            store["a"] = make_metaarray(seed=0, extra={"trial": 0})
+            store["b"] = make_metaarray(seed=1, extra={"trial": 1})
+            store.info("a")[1]["cols"][0]["name"] = "changed"
+            assert store.info("b")[1]["cols"][0]["name"] == "Vm"
+
+    def test_replace_and_delete(self, tmp_path):
+        with MetaArrayStore(tmp_path / "store.h5") as store:
+            store["a"] = make_metaarray(seed=0, extra={"trial": 0})
+            store["b"] = make_metaarray(seed=1, extra={"trial": 1})
+            n = store.numMeta()
+            store["b"] = make_metaarray(n=10, seed=2, extra={"trial": 2})
+            assert store.shape("b") == (10, 3)
+            assert store.info("b")[-1]["trial"] == 2
+            # adds a 10-sample Time axis and the new extra info; the old extra info of "b" is removed
+            assert store.numMeta() == n + 1
+            del store["a"]
+            assert store.keys() == ["b"]
+            assert store.numMeta() == 4
+            with pytest.raises(KeyError):
+                store["a"]
+            with pytest.raises(KeyError):
+                del store["a"]
+
+    def test_delete_reads_only_its_refs(self, tmp_path, monkeypatch):
+        import MetaArray.store as store_module
+
+        with MetaArrayStore(tmp_path / "store.h5") as store:
+            for i in range(30):
+                store[f"t{i}"] = make_metaarray(seed=i, extra={"trial": i})
+            calls = []
+            orig = store_module.ast.literal_eval
+            monkeypatch.setattr(store_module.ast, "literal_eval", lambda s: calls.append(s) or orig(s))
+            del store["t3"]
+            store["t4"] = make_metaarray(seed=40, extra={"trial": 40})
+            assert len(calls) == 2
+            monkeypatch.undo()
+            # the shared axes are kept, the extra info of t3 and the old t4 removed
+            assert store.numMeta() == 3 + 29
+            assert store.info("t5")[-1]["trial"] == 5
+
+    def test_lazy_and_select(self, tmp_path):
+        trial = make_metaarray(seed=0, extra={"trial": 0})
+        with MetaArrayStore(tmp_path / "store.h5") as store:
+            store.write("a", trial, compression="gzip")
+            lazy = store.read("a", readAllData=False)
+            assert_same(lazy["Time":0.01:0.02], trial["Time":0.01:0.02])
+            part = store.read("a", select={"Signal": ["Im", "Vm"], "Time": (0.01, 0.02)})
+            assert part.shape == (10, 2)
+            assert part.listColumns()["Signal"] == ["Im", "Vm"]
+            np.testing.assert_array_equal(part.asarray(), trial["Time":0.01:0.02]["Signal":["Im", "Vm"]].asarray())
+
+    def test_pickle_lazy(self, tmp_path):
+        trial = make_metaarray(seed=0, extra={"trial": 0})
+        with MetaArrayStore(tmp_path / "store.h5") as store:
+            store["a"] = trial
+            store["b"] = make_metaarray(seed=1, extra={"trial": 1})
+            lazy = store.read("a", readAllData=False)
+            s = pickle.dumps(lazy, protocol=5)
+            assert len(s) < 10000
+            with pickle.loads(s) as ma:
+                assert_same(ma, trial)
+                assert isinstance(ma._data, h5py.Dataset)
+
+    def test_invalid(self, tmp_path):
+        path = tmp_path / "plain.ma"
+        make_metaarray(seed=0, extra={"trial": 0}).write(str(path))
+        with pytest.raises(Exception):
+            MetaArrayStore(path, mode="r")
+        with MetaArrayStore(tmp_path / "store.h5") as store:
+            with pytest.raises(ValueError):
+                store["a/b"] = make_metaarray(seed=0, extra={"trial": 0})
+
+    def test_digest(self):
+        a = make_metaarray(seed=0, extra={"trial": 0})._info
+        b = make_metaarray(seed=1, extra={"trial": 1})._info
+        assert metaDigest(a[0]) == metaDigest(b[0])
+        assert metaDigest(a[1]["cols"]) == metaDigest(b[1]["cols"])
+        assert metaDigest(a[2]) != metaDigest(b[2])
+        assert metaDigest({"values": np.arange(3)}) != metaDigest({"values": np.arange(3.0)})
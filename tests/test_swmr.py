@@ -0,0 +1,128 @@
+"""
+Tests for reading a file while it is being appended to (HDF5 SWMR mode).
+"""
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+
+from .helpers import SIGNALS, make_metaarray
+
+h5py = pytest.importorskip("h5py")
+
+
+def swmr_writer(fileName, commands, done, **opts):
+    """Runs in a child process: append one block to the file for each command received."""
+    from MetaArray.writer import MetaArrayWriter
+
+    with MetaArrayWriter(fileName, appendAxis="Time", swmr=True, flushInterval=0, **opts) as writer:
+        i = 0
+        while True:
+            n = commands.get(timeout=30)
+            if n is None:
+                break
+            for _ in range(n):
+                writer.write(make_metaarray(block=i, cols=SIGNALS[:2]))
+                i += 1
+            writer.flush()
+            done.put(i)
+
+
+class TestSWMR:
+    """Test MetaArrayWriter(swmr=True) with MetaArray(file=..., swmr=True).refresh()."""
+
+    def test_refresh(self, tmp_path):
+        fn = str(tmp_path / "live.ma")
+        ctx = multiprocessing.get_context("spawn")
+        commands = ctx.Queue()
+        done = ctx.Queue()
+        proc = ctx.Process(target=swmr_writer, args=(fn, commands, done))
+        proc.start()
+        try:
+            commands.put(1)
+            assert done.get(timeout=30) == 1
+
+            ma = MetaArray(file=fn, swmr=True)
+            assert ma.shape == (100, 2)
+            assert ma.listColumns("Signal") == ["Vm", "Im"]
+            assert ma.refresh() == 0
+
+            commands.put(2)
+            assert done.get(timeout=30) == 3
+            # new frames are not seen until refresh()
+            assert ma.shape == (100, 2)
+            assert ma.refresh() == 200
+            assert ma.shape == (300, 2)
+            assert len(ma.xvals("Time")) == 300
+            assert np.allclose(ma.xvals("Time"), np.arange(300) * 1e-3)
+            assert np.all(ma[150:250].asarray() == np.arange(300, 500).reshape(100, 2))
+            ma.close()
+        finally:
+            commands.put(None)
+            proc.join(30)
+        assert proc.exitcode == 0
+        final = MetaArray(file=fn)
+        assert final.shape == (300, 2)
+
+    def test_refresh_chunk_cache(self, tmp_path):
+        """Chunks cached before refresh() are not reused once the writer has extended them."""
+        from MetaArray import chunkcache
+
+        fn = str(tmp_path / "live.ma")
+        ctx = multiprocessing.get_context("spawn")
+        commands = ctx.Queue()
+        done = ctx.Queue()
+        proc = ctx.Process(target=swmr_writer, args=(fn, commands, done))
+        proc.start()
+        try:
+            commands.put(1)
+            assert done.get(timeout=30) == 1
+            ma = MetaArray(file=fn, swmr=True, chunkCache=True)
+            assert np.all(ma[0:100].asarray() == np.arange(200).reshape(100, 2))
+            commands.put(1)
+            assert done.get(timeout=30) == 2
+            assert ma.refresh() == 100
+            assert np.all(ma[0:200].asarray() == np.arange(400).reshape(200, 2))
+            ma.close()
+        finally:
+            commands.put(None)
+            proc.join(30)
+            chunkcache.clearCache()
+        assert proc.exitcode == 0
+
+    def test_select_and_overview(self, tmp_path):
+        """Selections and full-resolution overviews can be read while the file is being written."""
+        fn = str(tmp_path / "live.ma")
+        ctx = multiprocessing.get_context("spawn")
+        commands = ctx.Queue()
+        done = ctx.Queue()
+        proc = ctx.Process(target=swmr_writer, args=(fn, commands, done), kwargs={"pyramid": [10]})
+        proc.start()
+        try:
+            commands.put(3)
+            assert done.get(timeout=30) == 3
+            part = MetaArray(file=fn, swmr=True, select={"Time": (0.0995, 0.1995), "Signal": ["Im"]})
+            np.testing.assert_array_equal(part.asarray()[:, 0], np.arange(201, 400, 2))
+            np.testing.assert_allclose(part.xvals("Time"), np.arange(100, 200) * 1e-3)
+            with pytest.raises(Exception):
+                part.refresh()
+
+            # no pyramid level is this fine, so the range is read at full resolution
+            factor, ov = MetaArray.readOverview(fn, 0.0995, 0.1995, resolution=1e-3, swmr=True)
+            assert factor == 1
+            np.testing.assert_array_equal(ov["mean"].asarray(), np.arange(200, 400).reshape(100, 2))
+        finally:
+            commands.put(None)
+            proc.join(30)
+        assert proc.exitcode == 0
+
+    def test_not_swmr(self, tmp_path):
+        fn = str(tmp_path / "test.ma")
+        make_metaarray(cols=SIGNALS[:2]).write(fn)
+        ma = MetaArray(file=fn, readAllData=False)
+        with pytest.raises(Exception):
+            ma.refresh()
+        ma.close()
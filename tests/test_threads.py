@@ -0,0 +1,91 @@
+"""
+Tests for reading lazily opened arrays from many threads.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray
+
+from .helpers import channels
+
+h5py = pytest.importorskip("h5py")
+
+pytestmark = pytest.mark.sample(n=20000, dt=1e-3, cols=channels(4))
+
+
+def read_windows(ma, orig, seed, n=50):
+    rng = np.random.default_rng(seed)
+    for start in rng.integers(0, 19000, size=n):
+        part = ma[start : start + 1000, 1:3]
+        assert np.all(part.asarray() == orig.asarray()[start : start + 1000, 1:3])
+    return threading.get_ident()
+
+
+class TestThreadSafe:
+    """Test MetaArray(file=..., threadSafe=True) and close()."""
+
+    def test_chunked(self, tmp_path, sample_metaarray):
+        fn = str(tmp_path / "test.ma")
+        sample_metaarray.write(fn, compression="gzip")
+        ma = MetaArray(file=fn, threadSafe=True)
+        with ThreadPoolExecutor(4) as pool:
+            threads = set(pool.map(read_windows, [ma] * 8, [sample_metaarray] * 8, range(8)))
+        # one handle per thread that read, plus the one used to open the file
+        assert ma._handles.numHandles() == len(threads | {threading.get_ident()})
+        ma.close()
+        assert ma._handles.closed
+        with pytest.raises(Exception):
+            ma[:10]
+
+    def test_contiguous(self, tmp_path, sample_metaarray):
+        """Contiguous data sets are memory-mapped, so no file handles are needed."""
+        fn = str(tmp_path / "test.ma")
+        sample_metaarray.write(fn, mappable=True)
+        ma = MetaArray(file=fn, threadSafe=True)
+        assert isinstance(ma.asarray(), np.memmap)
+        assert ma._handles is None
+        with ThreadPoolExecutor(4) as pool:
+            list(pool.map(read_windows, [ma] * 4, [sample_metaarray] * 4, range(4)))
+        ma.close()
+
+    def test_close_waits(self, tmp_path, sample_metaarray):
+        """close() waits for reads in progress on other threads to finish."""
+        fn = str(tmp_path / "test.ma")
+        sample_metaarray.write(fn, compression="gzip")
+        ma = MetaArray(file=fn, threadSafe=True)
+        reading = threading.Event()
+        release = threading.Event()
+        result = []
+
+        def slowRead():
+            with ma._handles.dataset() as data:
+                reading.set()
+                release.wait(5)
+                result.append(data[:10, 0])
+
+        reader = threading.Thread(target=slowRead)
+        reader.start()
+        reading.wait(5)
+        closer = threading.Thread(target=ma.close)
+        closer.start()
+        closer.join(0.2)
+        assert closer.is_alive()
+        release.set()
+        reader.join(5)
+        closer.join(5)
+        assert not closer.is_alive()
+        assert np.all(result[0] == sample_metaarray.asarray()[:10, 0])
+
+    def test_context_manager(self, tmp_path, sample_metaarray):
+        fn = str(tmp_path / "test.ma")
+        sample_metaarray.write(fn, compression="gzip")
+        with MetaArray(file=fn, readAllData=False) as ma:
+            part = ma[100:200]
+        assert ma._openFile is None
+        assert np.all(part.asarray() == sample_metaarray.asarray()[100:200])
+        # closing an in-memory array does nothing
+        sample_metaarray.close()
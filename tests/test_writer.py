@@ -0,0 +1,150 @@
+"""
+Tests for incremental MetaArray file writers.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from MetaArray import MetaArray, axis
+
+h5py = pytest.importorskip("h5py")
+from MetaArray.writer import MetaArrayWriter, ThreadedMetaArrayWriter  # noqa: E402
+
+from .helpers import SIGNALS, make_metaarray  # noqa: E402
+
+
+class TestMetaArrayWriter:
+    """Test the buffered MetaArrayWriter."""
+
+    def test_append_sweeps(self, tmp_path):
+        """Blocks written through the writer read back as one array."""
+        fn = str(tmp_path / "sweeps.ma")
+        with MetaArrayWriter(fn, appendAxis="Time") as w:
+            for i in range(5):
+                w.write(make_metaarray(n=10, block=i, cols=SIGNALS[:2], extra={"rig": 3}))
+        ma = MetaArray(file=fn)
+        assert ma.shape == (50, 2)
+        assert np.all(ma.asarray().ravel() == np.arange(100))
+        assert np.allclose(ma.xvals("Time"), np.arange(50) * 1e-3)
+        assert ma.listColumns("Signal") == ["Vm", "Im"]
+        assert ma.infoCopy(-1)["rig"] == 3
+
+    def test_buffered_flush(self, tmp_path):
+        """Data stays in memory until the buffer threshold is reached."""
+        fn = str(tmp_path / "sweeps.ma")
+        w = MetaArrayWriter(fn, appendAxis="Time", bufferSize=500, flushInterval=1e9)
+        w.write(make_metaarray(n=10, block=0, cols=SIGNALS[:2]))
+        w.write(make_metaarray(n=10, block=1, cols=SIGNALS[:2]))
+        assert "data" not in w._file
+        for i in range(2, 4):
+            w.write(make_metaarray(n=10, block=i, cols=SIGNALS[:2]))
+        assert w._file["data"].shape == (40, 2)
+        w.write(make_metaarray(n=10, block=4, cols=SIGNALS[:2]))
+        assert w._file["data"].shape == (40, 2)
+        w.close()
+        assert w.closed
+        assert MetaArray(file=fn).shape == (50, 2)
+
+    def test_append_existing(self, tmp_path):
+        """The writer appends to files created by MetaArray.write()."""
+        fn = str(tmp_path / "sweeps.ma")
+        make_metaarray(n=10, block=0, cols=SIGNALS[:2]).write(fn, appendAxis="Time")
+        with MetaArrayWriter(fn, appendAxis="Time") as w:
+            w.write(make_metaarray(n=10, block=1, cols=SIGNALS[:2]))
+        ma = MetaArray(file=fn)
+        assert ma.shape == (20, 2)
+        assert np.allclose(ma.xvals("Time"), np.arange(20) * 1e-3)
+
+    def test_chunk_shape(self, tmp_path):
+        """Chunks span many frames along the append axis."""
+        fn = str(tmp_path / "sweeps.ma")
+        with MetaArrayWriter(fn, appendAxis="Time", chunkBytes=1600) as w:
+            w.write(make_metaarray(n=10, block=0, cols=SIGNALS[:2]))
+            w.flush()
+            assert w._file["data"].chunks == (100, 2)
+
+    def test_shape_mismatch(self, tmp_path):
+        """Blocks must agree in shape on all but the append axis."""
+        fn = str(tmp_path / "sweeps.ma")
+        with MetaArrayWriter(fn, appendAxis="Time") as w:
+            w.write(make_metaarray(n=10, block=0, cols=SIGNALS[:2]))
+            bad = MetaArray(np.zeros((10, 3)), info=[axis("Time"), axis("Signal")])
+            with pytest.raises(ValueError):
+                w.write(bad)
+
+
+class TestThreadedMetaArrayWriter:
+    """Test the background-thread writer."""
+
+    def test_ordered_writes(self, tmp_path):
+        """Blocks are written in the order they were queued."""
+        fn = str(tmp_path / "sweeps.ma")
+        with ThreadedMetaArrayWriter(fn, appendAxis="Time", bufferSize=100) as w:
+            for i in range(20):
+                w.write(make_metaarray(n=10, block=i, cols=SIGNALS[:2]))
+        stats = w.stats()
+        assert stats["blocksQueued"] == stats["blocksWritten"] == 20
+        assert stats["bytesWritten"] == 20 * 10 * 2 * 8
+        ma = MetaArray(file=fn)
+        assert np.all(ma.asarray().ravel() == np.arange(400))
+        assert np.allclose(ma.xvals("Time"), np.arange(200) * 1e-3)
+
+    def test_flush(self, tmp_path):
+        """flush() waits until queued blocks are on disk."""
+        fn = str(tmp_path / "sweeps.ma")
+        w = ThreadedMetaArrayWriter(fn, appendAxis="Time")
+        w.write(make_metaarray(n=10, block=0, cols=SIGNALS[:2]))
+        w.write(make_metaarray(n=10, block=1, cols=SIGNALS[:2]))
+        w.flush()
+        assert w._writer._file["data"].shape == (20, 2)
+        w.close()
+        assert w.closed
+
+    def test_flush_interval_when_idle(self, tmp_path):
+        """Buffered blocks reach the disk after flushInterval even if no more blocks are written."""
+        fn = str(tmp_path / "sweeps.ma")
+        with ThreadedMetaArrayWriter(fn, appendAxis="Time", flushInterval=0.1) as w:
+            w.write(make_metaarray(n=10, block=0, cols=SIGNALS[:2]))
+            w.write(make_metaarray(n=10, block=1, cols=SIGNALS[:2]))
+            deadline = time.perf_counter() + 5
+            while w.stats()["blocksWritten"] < 2 and time.perf_counter() < deadline:
+                time.sleep(0.02)
+            assert w.stats()["blocksWritten"] == 2
+            assert w.stats()["bytesWritten"] == 2 * 10 * 2 * 8
+            assert MetaArray(file=fn).shape == (20, 2)
+
+    def test_backpressure(self, tmp_path):
+        """A full queue blocks the producer and is reported in stats()."""
+        fn = str(tmp_path / "sweeps.ma")
+        w = ThreadedMetaArrayWriter(fn, appendAxis="Time", maxQueueSize=1)
+        release = threading.Event()
+        write = w._writer.write
+
+        def slowWrite(data):
+            release.wait()
+            write(data)
+
+        w._writer.write = slowWrite
+        threading.Timer(0.2, release.set).start()
+        for i in range(6):
+            w.write(make_metaarray(n=10, block=i, cols=SIGNALS[:2]))
+        w.close()
+        stats = w.stats()
+        assert stats["highWaterMark"] == 1
+        assert stats["blockedCount"] > 0
+        assert stats["blockedTime"] > 0
+        assert stats["blocksWritten"] == 6
+        assert MetaArray(file=fn).shape == (60, 2)
+
+    def test_worker_error(self, tmp_path):
+        """Errors in the worker thread are raised in the producer."""
+        fn = str(tmp_path / "sweeps.ma")
+        w = ThreadedMetaArrayWriter(fn, appendAxis="Time")
+        w.write(make_metaarray(n=10, block=0, cols=SIGNALS[:2]))
+        w.write(MetaArray(np.zeros((10, 3)), info=[axis("Time"), axis("Signal")]))
+        with pytest.raises(ValueError):
+            w.close()
+        assert MetaArray(file=fn).shape == (10, 2)